@@ -1,8 +1,13 @@
+import pandas as pd
 import streamlit as st
-from data_loader import load_data_from_mongodb
-from data_visualisation.data_preprocessor import preprocess_data
+from data_loader import IncrementalMongoLoader
+from dataset import create_dataset
+from data_visualisation.time_series import TransactionTimeSeries
+from data_visualisation.dashboard_sections import begin_rerun, end_rerun
+from data_visualisation.profiling import PROFILING_ENABLED
+from data_visualisation.diagnostics import display_diagnostics
 from data_visualisation.quick_statistics import display_quick_statistics
-from data_visualisation.temporal_trends import display_temporal_trends
+from data_visualisation.temporal_trends import display_temporal_trends, TRENDS_START, TRENDS_END
 from data_visualisation.monthly_statistics import display_monthly_statistics
 
 from data_visualisation.kpi_section import display_kpi_section
@@ -11,10 +16,11 @@ from data_visualisation.demographic_insights import display_demographic_insights
 from data_visualisation.member_birthdays import display_birthdays
 from data_visualisation.top_spenders import display_top_spenders
 from data_visualisation.membership_retention import display_retention_rate
-from data_visualisation.membership_spending import display_membership_spending
+from data_visualisation.membership_spending import display_membership_spending, TIER_ORDER
 from data_visualisation.transactions_scatter_plot import display_transaction_scatter
 from data_visualisation.transactions_line_graph import display_transaction_trends
 from data_visualisation.chatbot import chatbot
+from data_visualisation.query_engine import QueryEngine
 
 # Custom CSS for sidebar styling
 def inject_custom_css():
@@ -94,11 +100,27 @@ def inject_custom_css():
         unsafe_allow_html=True
     )
 
-# Cache data loading and preprocessing
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def load_all_data():
-    raw_clients, raw_memberships, raw_transactions = load_data_from_mongodb()
-    return preprocess_data(raw_clients, raw_memberships, raw_transactions)
+# Keep one incremental loader per process so refreshes only fetch changed documents
+@st.cache_resource
+def get_data_loader():
+    return IncrementalMongoLoader.from_env()
+
+# The time series engine lives for the whole process and is updated incrementally
+@st.cache_resource
+def get_time_series_engine():
+    return TransactionTimeSeries()
+
+# One lazy dataset per process: every frame, column and page structure is computed on
+# first access and shared across sessions. Refreshes run in the background while
+# sessions keep reading the previous data, so no session waits for one
+@st.cache_resource
+def get_dataset():
+    # Frames derived from the shared ones copy what they change instead of writing
+    # through to the data every session reads
+    pd.set_option("mode.copy_on_write", True)
+    data = create_dataset(get_data_loader, time_series=get_time_series_engine())
+    data.start_refresher()
+    return data
 
 def main():
     # Set page config
@@ -111,8 +133,11 @@ def main():
     # INJECT THE CSS - THIS WAS MISSING IN YOUR CODE
     inject_custom_css()
 
-    # Load all data (cached)
-    clients, memberships, transactions, merged_data = load_all_data()
+    # Time every section of this run
+    begin_rerun()
+
+    # Data is loaded lazily by the selected page
+    data = get_dataset()
     
 # Sidebar navigation with improved styling
     with st.sidebar:
@@ -150,6 +175,11 @@ def main():
     with col2:
         st.title("Customer Data Platform")
 
+    # Hidden diagnostics page, opened with ?diagnostics=1 while profiling is on
+    if PROFILING_ENABLED and st.query_params.get("diagnostics") == "1":
+        display_diagnostics()
+        end_rerun()
+        return
 
     # Create containers for all pages (initially hidden)
     overview = st.container()
@@ -163,42 +193,64 @@ def main():
     with overview:
         if page == "📊 Overview":
             st.header("Overview Dashboard")
-            display_quick_statistics(clients, merged_data, transactions)
-            display_monthly_statistics(clients, merged_data, transactions)
-            display_kpi_section(clients, memberships)
-            display_temporal_trends(clients, memberships)
+            cube = data['aggregate_cube']
+            display_quick_statistics(data['clients'], data['merged_data'], data['transactions'])
+            display_monthly_statistics(
+                data['clients'],
+                data['merged_data'],
+                data['transactions'],
+                clients_index=data['clients_index'],
+                memberships_index=data['merged_data_index']
+            )
+            display_kpi_section(data['clients'], data['memberships'], cube.tier_counts())
+            display_temporal_trends(
+                data['clients'],
+                data['memberships'],
+                cube.monthly_counts('clients', TRENDS_START, TRENDS_END, 'New Clients'),
+                cube.monthly_counts('memberships', TRENDS_START, TRENDS_END, 'New Memberships')
+            )
         else:
             st.empty()  # Hide when not selected
 
     with geographic:
         if page == "🌍 Geographic":
             st.header("Geographic Analysis")
-            display_global_distribution(clients)
+            display_global_distribution(data['clients'])
         else:
             st.empty()
 
     with demographic:
         if page == "👥 Demographic":
             st.header("Demographic Insights")
-            display_birthdays(clients)
-            display_demographic_insights(clients)
+            display_birthdays(data['clients'], data['birthday_index'])
+            display_demographic_insights(data['clients'])
         else:
             st.empty()
 
     with membership:
         if page == "💳 Membership":
             st.header("Membership Analytics")
-            display_retention_rate(memberships, merged_data)
-            display_membership_spending(memberships, transactions)
+            cube = data['aggregate_cube']
+            display_retention_rate(data['memberships'], data['merged_data'], cube.retention_by_tier())
+            display_membership_spending(
+                data['memberships'],
+                data['transactions'],
+                cube.average_spending_by_tier(TIER_ORDER)
+            )
         else:
             st.empty()
 
     with transactions_page:
         if page == "💸 Transaction":
             st.header("Transaction Patterns")
-            display_top_spenders(clients, transactions)
-            display_transaction_scatter(transactions)
-            display_transaction_trends(transactions)
+            display_top_spenders(
+                data['clients'],
+                data['transactions'],
+                transactions_index=data['transactions_index'],
+                spender_index=data['spender_index']
+            )
+            display_transaction_scatter(data['transactions'], transactions_index=data['transactions_index'])
+            display_transaction_trends(data['transactions'], time_series=data['transaction_time_series'])
         else:
             st.empty()
 
@@ -206,9 +258,18 @@ def main():
     with chatbot_page:
         if page == "🤖 Chatbot":
             st.header("AI Assistant")
-            chatbot()
+            try:
+                retriever = data['chat_retriever']
+                query_engine = QueryEngine(data)
+            except (ConnectionError, ValueError) as e:
+                st.warning(f"Answering from the static graph data: {str(e)}")
+                retriever = None
+                query_engine = None
+            chatbot(retriever, query_engine)
         else:
             st.empty()
 
+    end_rerun()
+
 if __name__ == "__main__":
     main()
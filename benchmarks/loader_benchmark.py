@@ -0,0 +1,141 @@
+"""
+Compares the one-client-per-load sequential fetch with the pooled, parallel fetch in data_loader.
+
+Seeds a local MongoDB with synthetic data and reaches it through a TCP proxy that
+delays every chunk the server sends, to mimic the round trips to a remote cluster.
+
+    python -m benchmarks.loader_benchmark --uri mongodb://localhost:27017 --latency-ms 20 --transactions 1000000
+"""
+import argparse
+import os
+import socket
+import threading
+import time
+
+from pymongo import MongoClient
+
+import data_loader
+from benchmarks.synthetic_data import generate_clients, generate_memberships, generate_transactions, insert_frame
+
+
+class LatencyProxy:
+    """
+    Forwards TCP connections to a server, delaying each chunk the server sends.
+
+    Parameters:
+        target_host (str): Server host
+        target_port (int): Server port
+        latency (float): Seconds added before each chunk is passed back to the client
+    """
+
+    def __init__(self, target_host, target_port, latency):
+        self.target = (target_host, target_port)
+        self.latency = latency
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(('127.0.0.1', 0))
+        self.listener.listen()
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            client, _ = self.listener.accept()
+            server = socket.create_connection(self.target)
+            threading.Thread(target=self._pipe, args=(client, server, 0), daemon=True).start()
+            threading.Thread(target=self._pipe, args=(server, client, self.latency), daemon=True).start()
+
+    @staticmethod
+    def _pipe(source, destination, latency):
+        try:
+            while True:
+                data = source.recv(65536)
+                if not data:
+                    break
+                if latency:
+                    time.sleep(latency)
+                destination.sendall(data)
+        except OSError:
+            pass
+        finally:
+            source.close()
+            destination.close()
+
+
+def load_sequential(uri, db_name):
+    """
+    The fetch as it was before pooling: a new client per load, one collection after another.
+    """
+    client = MongoClient(uri)
+    db = client[db_name]
+    frames = tuple(
+        list(db[name].find({}, data_loader.get_projection(name)))
+        for name in data_loader.COLLECTIONS
+    )
+    client.close()
+    return frames
+
+
+# Modes compared, from the old behaviour to the fully parallel fetch
+MODES = {
+    'sequential, new client': lambda args: load_sequential(os.environ['MONGO_URI'], args.db),
+    'sequential, pooled': lambda args: data_loader.load_data_from_mongodb(
+        batch_size=args.batch_size, workers=1, partitions=1
+    ),
+    'parallel collections': lambda args: data_loader.load_data_from_mongodb(
+        batch_size=args.batch_size, workers=args.workers, partitions=1
+    ),
+    'parallel + _id ranges': lambda args: data_loader.load_data_from_mongodb(
+        batch_size=args.batch_size, workers=args.workers, partitions=args.partitions
+    ),
+}
+
+
+def main():
+    settings = data_loader.get_fetch_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--uri', default='mongodb://localhost:27017')
+    parser.add_argument('--db', default='benchmark')
+    parser.add_argument('--transactions', type=int, default=1_000_000)
+    parser.add_argument('--clients', type=int, default=100_000)
+    parser.add_argument('--latency-ms', type=float, default=20, help="Delay added to every server response chunk")
+    parser.add_argument('--batch-size', type=int, default=settings['batch_size'])
+    parser.add_argument('--workers', type=int, default=settings['workers'])
+    parser.add_argument('--partitions', type=int, default=settings['partitions'])
+    parser.add_argument('--repeats', type=int, default=3, help="Loads per mode; the pool is reused after the first")
+    parser.add_argument('--skip-seed', action='store_true', help="Reuse the data already in the database")
+    args = parser.parse_args()
+
+    if not args.skip_seed:
+        print(f"Seeding {args.clients:,} clients and {args.transactions:,} transactions...")
+        client = MongoClient(args.uri)
+        db = client[args.db]
+        insert_frame(db.clients, generate_clients(args.clients))
+        insert_frame(db.memberships, generate_memberships(args.clients))
+        insert_frame(db.transactions, generate_transactions(args.transactions, args.clients))
+        client.close()
+
+    # Route every connection through the proxy
+    host, _, port = args.uri.split('//', 1)[1].split('/', 1)[0].partition(':')
+    proxy = LatencyProxy(host, int(port or 27017), args.latency_ms / 1000)
+    os.environ['MONGO_URI'] = f"mongodb://127.0.0.1:{proxy.port}/?directConnection=true"
+    os.environ['DB_NAME'] = args.db
+
+    # Split the transactions even though the defaults are tuned for larger collections
+    os.environ['MONGO_PARTITION_MIN_DOCUMENTS'] = str(min(settings['partition_min_documents'], args.transactions // 2))
+
+    print(f"Latency {args.latency_ms:.0f} ms per response chunk, batch size {args.batch_size:,}, "
+          f"{args.workers} workers, {args.partitions} ranges")
+    for mode, load in MODES.items():
+        data_loader.close_mongo_clients()
+        times = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            load(args)
+            times.append(time.perf_counter() - start)
+        print(f"{mode:>24}: first {times[0]:.2f}s, best {min(times):.2f}s")
+    data_loader.close_mongo_clients()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Measures how the multi-process preprocessing scales from 1 to N workers against preprocess_data.
+
+The worker pool is started and warmed up before each timing, as in the dashboard,
+where it is kept between refreshes.
+
+    python -m benchmarks.parallel_benchmark --transactions 10000000 --workers 1,2,4,8,16 --dirty
+"""
+import argparse
+import os
+import time
+
+from benchmarks.synthetic_data import generate_clients, generate_memberships, generate_transactions
+from data_visualisation import parallel_preprocessor
+from data_visualisation.data_preprocessor import preprocess_data
+
+
+def best_time(run, repeats):
+    """
+    Best wall time of a few runs.
+
+    Returns:
+        float: Seconds
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--transactions', type=int, default=2_000_000)
+    parser.add_argument('--clients', type=int, default=500_000)
+    parser.add_argument('--workers', default=None, help="Comma-separated worker counts, 1 to the CPU count by default")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--dirty', action='store_true', help="Use inconsistently formatted client ids")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    workers = (
+        [int(count) for count in args.workers.split(',')]
+        if args.workers else sorted({1, 2, 4, 8, 16, cpus} & set(range(1, cpus + 1)))
+    )
+    raw = (
+        generate_clients(args.clients, dirty=args.dirty),
+        generate_memberships(args.clients, dirty=args.dirty),
+        generate_transactions(args.transactions, args.clients, dirty=args.dirty),
+    )
+    print(f"{args.clients:,} clients, {args.transactions:,} transactions, {cpus} CPUs")
+
+    # Parallelise every frame whatever its size
+    parallel_preprocessor.PARALLEL_MIN_ROWS = 0
+
+    serial = best_time(lambda: preprocess_data(*raw), args.repeats)
+    print(f"{'preprocess_data':>18}: {serial:.2f}s")
+    for count in workers:
+        parallel_preprocessor.get_process_pool(count)
+        parallel_preprocessor.parallel_preprocess_data(*raw, workers=count)  # Warm-up: imports in the workers
+        elapsed = best_time(lambda: parallel_preprocessor.parallel_preprocess_data(*raw, workers=count), args.repeats)
+        print(f"{f'{count} workers':>18}: {elapsed:.2f}s, {serial / elapsed:.2f}x")
+    parallel_preprocessor.close_process_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Times the data pipeline and every dashboard section headless, at several data scales.
+
+Runs offline on synthetic data with Streamlit stubbed out, so only the computation
+inside each step is measured. Reports time, throughput (transactions per second) and
+peak traced memory per step and scale, and can save the results to compare them with
+a run on another commit.
+
+    python -m benchmarks.pipeline_benchmark --scales 10000,100000,1000000 --dirty --output after.json
+    python -m benchmarks.pipeline_benchmark --scales 10000,100000,1000000 --dirty --compare before.json
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+
+from benchmarks.streamlit_stub import install_streamlit_stub
+
+# Synthetic transactions span 2024-01-01 to 2025-02-04; point the date pickers at that range
+WIDGET_VALUES = {
+    'Start Date': datetime.date(2024, 1, 1),
+    'End Date': datetime.date(2025, 2, 4),
+    'Start Date for Scatter Plot': datetime.date(2024, 1, 1),
+    'End Date for Scatter Plot': datetime.date(2025, 2, 4),
+}
+
+install_streamlit_stub(WIDGET_VALUES)
+
+import pandas as pd
+
+from benchmarks.synthetic_data import generate_clients, generate_memberships, generate_transactions
+from data_visualisation.aggregate_cube import build_aggregate_cube
+from data_visualisation.birthday_index import BirthdayIndex
+from data_visualisation.data_preprocessor import preprocess_data
+from data_visualisation.date_index import build_date_indexes
+from data_visualisation.demographic_insights import display_demographic_insights
+from data_visualisation.global_distribution import display_global_distribution
+from data_visualisation.kpi_section import display_kpi_section
+from data_visualisation.member_birthdays import display_birthdays
+from data_visualisation.membership_retention import display_retention_rate
+from data_visualisation.membership_spending import TIER_ORDER, display_membership_spending
+from data_visualisation.monthly_statistics import display_monthly_statistics
+from data_visualisation.quick_statistics import display_quick_statistics
+from data_visualisation.spender_index import build_spender_index
+from data_visualisation.temporal_trends import TRENDS_END, TRENDS_START, display_temporal_trends
+from data_visualisation.time_series import TransactionTimeSeries
+from data_visualisation.top_spenders import display_top_spenders
+from data_visualisation.transactions_line_graph import display_transaction_trends
+from data_visualisation.transactions_scatter_plot import display_transaction_scatter
+
+# Transactions per client in the generated data
+TRANSACTIONS_PER_CLIENT = 10
+
+
+def build_time_series(transactions):
+    """
+    Builds the transaction time series from scratch.
+    """
+    time_series = TransactionTimeSeries()
+    time_series.update(transactions)
+    return time_series
+
+
+# Pipeline steps, in the order the dashboard builds them; each reads and extends the context
+PIPELINE_STEPS = [
+    ('preprocess_data', 'data', lambda ctx: preprocess_data(*ctx['raw'])),
+    ('build_aggregate_cube', 'cube', lambda ctx: build_aggregate_cube(*ctx['data'][:3])),
+    ('build_date_indexes', 'indexes', lambda ctx: build_date_indexes(*ctx['data'])),
+    ('build_spender_index', 'spender_index', lambda ctx: build_spender_index(*ctx['data'][:3])),
+    ('BirthdayIndex', 'birthday_index', lambda ctx: BirthdayIndex(ctx['data'][0])),
+    ('TransactionTimeSeries.update', 'time_series', lambda ctx: build_time_series(ctx['data'][2])),
+]
+
+# Sections with the inputs app.main passes them
+SECTIONS = [
+    ('display_quick_statistics', lambda c, m, t, g, ctx: display_quick_statistics(c, g, t)),
+    ('display_monthly_statistics', lambda c, m, t, g, ctx: display_monthly_statistics(
+        c, g, t, ctx['indexes']['clients'], ctx['indexes'].get('merged_data'))),
+    ('display_kpi_section', lambda c, m, t, g, ctx: display_kpi_section(c, m, ctx['cube'].tier_counts())),
+    ('display_temporal_trends', lambda c, m, t, g, ctx: display_temporal_trends(
+        c, m,
+        ctx['cube'].monthly_counts('clients', TRENDS_START, TRENDS_END, 'New Clients'),
+        ctx['cube'].monthly_counts('memberships', TRENDS_START, TRENDS_END, 'New Memberships'))),
+    ('display_global_distribution', lambda c, m, t, g, ctx: display_global_distribution(c)),
+    ('display_birthdays', lambda c, m, t, g, ctx: display_birthdays(c, ctx['birthday_index'])),
+    ('display_demographic_insights', lambda c, m, t, g, ctx: display_demographic_insights(c)),
+    ('display_retention_rate', lambda c, m, t, g, ctx: display_retention_rate(
+        m, g, ctx['cube'].retention_by_tier())),
+    ('display_membership_spending', lambda c, m, t, g, ctx: display_membership_spending(
+        m, t, ctx['cube'].average_spending_by_tier(TIER_ORDER))),
+    ('display_top_spenders', lambda c, m, t, g, ctx: display_top_spenders(
+        c, t, transactions_index=ctx['indexes']['transactions'], spender_index=ctx['spender_index'])),
+    ('display_transaction_scatter', lambda c, m, t, g, ctx: display_transaction_scatter(
+        t, transactions_index=ctx['indexes']['transactions'])),
+    ('display_transaction_trends', lambda c, m, t, g, ctx: display_transaction_trends(
+        t, time_series=ctx['time_series'])),
+]
+
+# The same sections computing everything from the frames, as without precomputed inputs
+STANDALONE_SECTIONS = [
+    ('display_quick_statistics', lambda c, m, t, g: display_quick_statistics(c, g, t)),
+    ('display_monthly_statistics', lambda c, m, t, g: display_monthly_statistics(c, g, t)),
+    ('display_kpi_section', lambda c, m, t, g: display_kpi_section(c, m)),
+    ('display_temporal_trends', lambda c, m, t, g: display_temporal_trends(c.copy(), m.copy())),
+    ('display_global_distribution', lambda c, m, t, g: display_global_distribution(c)),
+    ('display_birthdays', lambda c, m, t, g: display_birthdays(c)),
+    ('display_demographic_insights', lambda c, m, t, g: display_demographic_insights(c)),
+    ('display_retention_rate', lambda c, m, t, g: display_retention_rate(m, g)),
+    ('display_membership_spending', lambda c, m, t, g: display_membership_spending(m, t)),
+    ('display_top_spenders', lambda c, m, t, g: display_top_spenders(c, t, memberships=m)),
+    ('display_transaction_scatter', lambda c, m, t, g: display_transaction_scatter(t)),
+    ('display_transaction_trends', lambda c, m, t, g: display_transaction_trends(t)),
+]
+
+
+def measure(function, repeats, trace_memory):
+    """
+    Times a function and, optionally, records its peak traced allocation in a separate run.
+
+    Parameters:
+        function (callable): Step to measure, called without arguments
+        repeats (int): Timed runs; the fastest is reported
+        trace_memory (bool): Also run once under tracemalloc
+
+    Returns:
+        tuple: Result of the last run, best seconds and peak MiB (None if not traced)
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+
+    peak = None
+    if trace_memory:
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return result, best, peak
+
+
+def run_scale(n_transactions, dirty, repeats, trace_memory, standalone):
+    """
+    Generates data at one scale and measures every pipeline step and section.
+
+    Returns:
+        list: One result dict per step
+    """
+    n_clients = max(1, n_transactions // TRANSACTIONS_PER_CLIENT)
+    ctx = {'raw': (
+        generate_clients(n_clients, dirty=dirty),
+        generate_memberships(n_clients, dirty=dirty),
+        generate_transactions(n_transactions, n_clients, dirty=dirty),
+    )}
+
+    results = []
+
+    def record(kind, name, seconds, peak):
+        results.append({
+            'kind': kind,
+            'name': name,
+            'transactions': n_transactions,
+            'clients': n_clients,
+            'seconds': seconds,
+            'throughput': n_transactions / seconds if seconds > 0 else None,
+            'peak_mib': peak,
+        })
+
+    for name, key, step in PIPELINE_STEPS:
+        ctx[key], seconds, peak = measure(lambda: step(ctx), repeats, trace_memory)
+        record('pipeline', name, seconds, peak)
+
+    frames = ctx['data']
+    for name, section in SECTIONS:
+        _, seconds, peak = measure(lambda: section(*frames, ctx), repeats, trace_memory)
+        record('section', name, seconds, peak)
+
+    if standalone:
+        for name, section in STANDALONE_SECTIONS:
+            _, seconds, peak = measure(lambda: section(*frames), repeats, trace_memory)
+            record('standalone', name, seconds, peak)
+
+    return results
+
+
+def current_commit():
+    """
+    Returns the short hash of the checked-out commit, marked if the tree has changes.
+    """
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        changed = subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True
+        ).stdout.strip()
+        return f"{commit}+dirty" if changed else commit
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_results(results, baseline=None):
+    """
+    Prints one line per step and scale, with the speedup over a baseline run if given.
+    """
+    frame = pd.DataFrame(results)
+    frame['ms'] = frame['seconds'] * 1000
+
+    if baseline is not None:
+        before = pd.DataFrame(baseline['results'])[['kind', 'name', 'transactions', 'seconds']]
+        frame = frame.merge(before, on=['kind', 'name', 'transactions'], how='left', suffixes=('', '_before'))
+        frame['speedup'] = frame['seconds_before'] / frame['seconds']
+
+    columns = ['kind', 'name', 'transactions', 'ms', 'throughput', 'peak_mib']
+    if baseline is not None:
+        columns.append('speedup')
+
+    with pd.option_context('display.max_rows', None, 'display.width', 160, 'display.float_format', '{:,.2f}'.format):
+        print(frame[columns].to_string(index=False))
+
+        # Scaling curves: one column per scale
+        for measure_name, label in [('ms', 'Time (ms)'), ('peak_mib', 'Peak memory (MiB)')]:
+            if frame[measure_name].notna().any():
+                print(f"\n{label} by number of transactions")
+                print(frame.pivot_table(index=['kind', 'name'], columns='transactions',
+                                        values=measure_name, sort=False).to_string())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', default='10000,100000,1000000',
+                        help="Comma-separated transaction counts, e.g. 10000,1000000,50000000")
+    parser.add_argument('--dirty', action='store_true', help="Use dirty client ids and messy nationalities")
+    parser.add_argument('--repeats', type=int, default=3, help="Timed runs per step; the fastest is reported")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc run of each step")
+    parser.add_argument('--standalone', action='store_true',
+                        help="Also time the sections without precomputed inputs")
+    parser.add_argument('--output', help="Write the results to this JSON file")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = []
+    for scale in [int(value) for value in args.scales.split(',')]:
+        print(f"Running {scale:,} transactions...")
+        results.extend(run_scale(scale, args.dirty, args.repeats, not args.no_memory, args.standalone))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        print(f"Compared with {baseline['commit']} ({baseline['created_at']})")
+    print_results(results, baseline)
+
+    if args.output:
+        report = {
+            'commit': current_commit(),
+            'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'dirty': args.dirty,
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Reports per-step time and memory of the preprocess_data dtype plan against the
+conversions it replaced (regex client_id cleaning on every frame, object-dtype labels).
+
+    python -m benchmarks.preprocess_benchmark --transactions 10000000
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.synthetic_data import generate_clients, generate_memberships, generate_transactions
+from data_visualisation.data_preprocessor import DTYPE_PLAN, coerce_column
+
+
+def legacy_coerce_column(series, kind):
+    """
+    The per-column conversions preprocess_data used before DTYPE_PLAN.
+
+    Parameters:
+        series (pd.Series): Raw column
+        kind (str): Kind from DTYPE_PLAN
+
+    Returns:
+        pd.Series: Converted column
+    """
+    import pandas as pd
+
+    if kind == 'id':
+        return (
+            series
+            .astype(str)
+            .str.replace('[^0-9]', '', regex=True)
+            .replace('', '0')
+            .astype(int)
+        )
+    if kind == 'datetime':
+        return pd.to_datetime(series, errors='coerce')
+    # Labels and amounts were left as loaded
+    return series
+
+
+def measure(convert, series, kind):
+    """
+    Times one column conversion and records its peak allocation and result size.
+
+    Returns:
+        tuple: Seconds, peak traced MiB and result MiB
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = convert(series, kind)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20, result.memory_usage(deep=True) / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--transactions', type=int, default=1_000_000)
+    parser.add_argument('--clients', type=int, default=100_000)
+    parser.add_argument('--string-ids', action='store_true', help="Store client_id as strings like 'C0001'")
+    args = parser.parse_args()
+
+    frames = {
+        'clients': generate_clients(args.clients),
+        'memberships': generate_memberships(args.clients),
+        'transactions': generate_transactions(args.transactions, args.clients),
+    }
+    if args.string_ids:
+        for frame in frames.values():
+            frame['client_id'] = 'C' + frame['client_id'].astype(str)
+
+    header = f"{'step':<28}{'before s':>10}{'after s':>10}{'before peak':>13}{'after peak':>12}{'before MiB':>12}{'after MiB':>11}"
+    print(header)
+    print('-' * len(header))
+
+    for name, plan in DTYPE_PLAN.items():
+        for col, kind in plan.items():
+            series = frames[name][col]
+            before = measure(legacy_coerce_column, series, kind)
+            after = measure(coerce_column, series, kind)
+            print(f"{name + '.' + col:<28}{before[0]:>10.3f}{after[0]:>10.3f}"
+                  f"{before[1]:>13.1f}{after[1]:>12.1f}{before[2]:>12.1f}{after[2]:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Simulates many concurrent dashboard sessions reading the shared dataset while its snapshot is refreshed.
+
+Each session is a thread that keeps reading the items of a random page and records
+how long each page read takes. A third of the way in, the snapshot expires: the
+background refresher reloads the source once and swaps the new data in. The
+'blocking' mode drops the items instead of refreshing them, as the dataset did
+before, so the sessions that read them next wait for the reload.
+
+    python -m benchmarks.session_benchmark --sessions 50 --transactions 500000 --load-seconds 2
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import dataset
+import snapshot_cache
+from benchmarks.synthetic_data import generate_clients, generate_memberships, generate_transactions
+
+# Items read by each simulated page
+PAGES = {
+    'overview': ('clients', 'merged_data', 'transactions', 'aggregate_cube', 'clients_index', 'merged_data_index'),
+    'geographic': ('clients',),
+    'demographic': ('clients', 'birthday_index'),
+    'membership': ('memberships', 'merged_data', 'transactions', 'aggregate_cube'),
+    'transaction': ('clients', 'transactions', 'spender_index', 'transactions_index'),
+    'chatbot': ('chat_retriever',),
+}
+
+
+class SlowLoader:
+    """
+    Returns the same synthetic documents on every sync, after a delay standing in for
+    the MongoDB round trips, and counts the syncs.
+    """
+
+    def __init__(self, frames, delay):
+        self.frames = frames
+        self.delay = delay
+        self.syncs = 0
+
+    def sync(self):
+        self.syncs += 1
+        time.sleep(self.delay)
+        return self.frames
+
+
+def age_snapshot(seconds):
+    """
+    Backdates the snapshot on disk so the next manifest check finds it stale.
+    """
+    path = os.path.join(snapshot_cache.get_snapshot_dir(), 'manifest.json')
+    with open(path, 'r', encoding='utf-8') as file:
+        manifest = json.load(file)
+    manifest['created_at'] -= seconds
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file)
+
+
+def run_sessions(data, sessions, duration):
+    """
+    Reads random pages from many threads for a while.
+
+    Returns:
+        tuple: Page read latencies in seconds, and the ids of the clients frames seen
+    """
+    latencies, seen = [], set()
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def session(seed):
+        rng = random.Random(seed)
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            for name in PAGES[rng.choice(list(PAGES))]:
+                data[name]
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                seen.add(id(data['clients']))
+            time.sleep(rng.uniform(0.01, 0.05))
+
+    threads = [threading.Thread(target=session, args=(seed,)) for seed in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.array(latencies), seen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--transactions', type=int, default=200_000)
+    parser.add_argument('--clients', type=int, default=20_000)
+    parser.add_argument('--load-seconds', type=float, default=1.0, help="Delay of each source sync")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds of simulated traffic per mode")
+    args = parser.parse_args()
+
+    frames = (
+        generate_clients(args.clients),
+        generate_memberships(args.clients),
+        generate_transactions(args.transactions, args.clients),
+    )
+    # Expire the snapshot a few seconds into the traffic and check for it often
+    dataset.SNAPSHOT_MAX_AGE = args.duration / 3
+    # Share the frames as the app does
+    pd.set_option("mode.copy_on_write", True)
+
+    print(f"{args.sessions} sessions, {args.transactions:,} transactions, {args.load_seconds:g}s per source sync")
+    for mode in ('refresh', 'blocking'):
+        os.environ['SNAPSHOT_DIR'] = os.path.join(tempfile.mkdtemp(), 'snapshot')
+        loader = SlowLoader(frames, args.load_seconds)
+        data = dataset.create_dataset(lambda: loader)
+        if mode == 'blocking':
+            data.refresh = lambda *names, wait=False: data.invalidate(*names) or True
+
+        # Cold start, then wait for the first snapshot and serve from it
+        for items in PAGES.values():
+            for name in items:
+                data[name]
+        while snapshot_cache._refresh_lock.locked():
+            time.sleep(0.05)
+        data.invalidate('snapshot_manifest')
+        for items in PAGES.values():
+            for name in items:
+                data[name]
+        age_snapshot(2 * snapshot_cache.SNAPSHOT_MAX_AGE)
+        loader.syncs = 0
+
+        data.start_refresher(interval=0.2)
+        latencies, seen = run_sessions(data, args.sessions, args.duration)
+        data.stop_refresher()
+        while snapshot_cache._refresh_lock.locked():
+            time.sleep(0.05)
+
+        if snapshot_cache.is_stale(data['snapshot_manifest']):
+            raise ValueError("The refreshed snapshot was not swapped in")
+
+        print(f"{mode:>9}: {len(latencies):,} page reads, p50 {np.percentile(latencies, 50) * 1000:.1f} ms, "
+              f"p99 {np.percentile(latencies, 99) * 1000:.1f} ms, max {latencies.max() * 1000:.0f} ms, "
+              f"{loader.syncs} source syncs, {len(seen)} distinct clients frames served")
+
+
+if __name__ == "__main__":
+    main()
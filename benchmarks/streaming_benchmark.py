@@ -0,0 +1,93 @@
+"""
+Compares the peak memory of preprocessing transactions in one piece with the chunked streaming pipeline.
+
+Writes synthetic transactions to a Parquet file, then preprocesses it both ways and
+checks that the running aggregates match the totals of the in-memory table.
+
+    python -m benchmarks.streaming_benchmark --transactions 5000000 --budget-mb 64
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from benchmarks.synthetic_data import generate_transactions
+from data_visualisation.data_preprocessor import prepare_transactions
+from data_visualisation.streaming_preprocessor import CHUNK_ROWS, iter_parquet_chunks, stream_preprocess_transactions
+
+
+def measure(run):
+    """
+    Runs a step and records its time and peak traced allocation.
+
+    Returns:
+        tuple: Result, seconds and peak traced MiB
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def in_memory(path):
+    """
+    The whole table read and prepared at once, as preprocess_data does.
+    """
+    transactions = prepare_transactions(pq.read_table(path).to_pandas())
+    return len(transactions), float(transactions['amount'].sum())
+
+
+def streamed(path, directory, memory_budget):
+    """
+    The same table preprocessed in batches into monthly partitions.
+    """
+    aggregates, _ = stream_preprocess_transactions(
+        iter_parquet_chunks(path, memory_budget=memory_budget), directory=directory, memory_budget=memory_budget
+    )
+    return aggregates.transactions, aggregates.total_amount
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--transactions', type=int, default=2_000_000)
+    parser.add_argument('--clients', type=int, default=100_000)
+    parser.add_argument('--budget-mb', type=float, default=32, help="Memory budget of the bounded mode")
+    parser.add_argument('--dirty', action='store_true', help="Use inconsistently formatted client ids")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'transactions.parquet')
+        raw = generate_transactions(args.transactions, args.clients, dirty=args.dirty)
+        pq.write_table(pa.Table.from_pandas(raw, preserve_index=False), path, row_group_size=CHUNK_ROWS)
+        del raw
+        print(f"{args.transactions:,} transactions, {os.path.getsize(path) / 2**20:.0f} MiB on disk")
+
+        modes = {
+            'in memory': lambda: in_memory(path),
+            f'streamed, {CHUNK_ROWS:,} rows': lambda: streamed(path, os.path.join(workdir, 'chunks'), None),
+            # Reads sized from the budget
+            f'streamed, {args.budget_mb:g} MiB budget': lambda: streamed(
+                path, os.path.join(workdir, 'bounded'), int(args.budget_mb * 2**20)
+            ),
+        }
+        results = {}
+        for mode, run in modes.items():
+            results[mode], elapsed, peak = measure(run)
+            print(f"{mode:>28}: {elapsed:.2f}s, peak {peak:.1f} MiB")
+
+        counts = {count for count, _ in results.values()}
+        totals = [total for _, total in results.values()]
+        if len(counts) != 1 or not np.allclose(totals, totals[0]):
+            raise ValueError(f"Streaming aggregates differ from the in-memory totals: {results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Stand-in for the streamlit module so dashboard sections can be timed headless.
+
+Widgets return their default value, or the value configured for their label; every
+other call does nothing. Caching and fragment decorators return the function as is,
+so each call does the full computation.
+"""
+import sys
+
+
+class _Null:
+    """
+    Absorbs any call, attribute access or `with` block.
+    """
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __getattr__(self, name):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def _passthrough_decorator(function=None, **kwargs):
+    """
+    Supports both `@decorator` and `@decorator(...)` by returning the function unchanged.
+    """
+    if function is None:
+        return lambda function: function
+    return function
+
+
+class StreamlitStub:
+    """
+    Replaces `import streamlit as st` for the headless benchmarks.
+
+    Parameters:
+        widget_values (dict, optional): Value returned by the widget with this label
+    """
+
+    def __init__(self, widget_values=None):
+        self.widget_values = widget_values or {}
+        self.session_state = {}
+        self.query_params = {}
+        self.sidebar = _Null()
+        self.column_config = _Null()
+        self.fragment = _passthrough_decorator
+        self.cache_data = _passthrough_decorator
+        self.cache_resource = _passthrough_decorator
+
+    def _value(self, label, default):
+        return self.widget_values.get(label, default)
+
+    def columns(self, spec, **kwargs):
+        return [_Null() for _ in range(spec if isinstance(spec, int) else len(spec))]
+
+    def tabs(self, labels):
+        return [_Null() for _ in labels]
+
+    def selectbox(self, label, options, index=0, **kwargs):
+        options = list(options)
+        return self._value(label, options[index] if options else None)
+
+    radio = selectbox
+
+    def multiselect(self, label, options, default=None, **kwargs):
+        return self._value(label, list(default or []))
+
+    def date_input(self, label, value=None, **kwargs):
+        return self._value(label, value)
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        return self._value(label, value if value is not None else min_value)
+
+    def slider(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        return self._value(label, value if value is not None else min_value)
+
+    def __getattr__(self, name):
+        # Output calls: markdown, subheader, metric, dataframe, plotly_chart, ...
+        return _Null()
+
+
+def install_streamlit_stub(widget_values=None):
+    """
+    Makes `import streamlit` return a StreamlitStub. Must run before any dashboard
+    module is imported.
+
+    Parameters:
+        widget_values (dict, optional): Value returned by the widget with this label
+
+    Returns:
+        StreamlitStub: The installed stub
+    """
+    stub = StreamlitStub(widget_values)
+    sys.modules['streamlit'] = stub
+    return stub
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+TIERS = ['No Membership', 'Bronze', 'Silver', 'Gold', 'Platinum']
+STATUSES = ['ACTIVE', 'EXPIRED', 'CANCELLED']
+NATIONALITIES = [
+    'Canada', 'Germany', 'India', 'Australia', 'United Arab Emirates',
+    'United Kingdom', 'United States', 'Italy', 'France', 'China'
+]
+
+# Spellings the nationality field holds in practice: codes, aliases, odd casing and padding
+MESSY_NATIONALITIES = NATIONALITIES + [
+    'canada', 'CA', 'CAN',
+    'germany ', 'DE', 'Deutschland',
+    'INDIA', 'IN', 'IND',
+    'AU', 'Aussie', 'australia',
+    'UAE', 'U.A.E.', 'AE',
+    'UK', 'GB', 'Great Britain', 'united kingdom',
+    'USA', 'US', 'U.S.A.', ' United States ',
+    'IT', 'Italia', 'FR', 'france', 'CN', "People's Republic of China",
+    'Unknown', 'N/A', '',
+]
+
+# Share of ids and nationalities left empty in dirty data
+MISSING_RATE = 0.001
+
+
+def dirty_client_ids(client_ids, rng, missing_rate=MISSING_RATE):
+    """
+    Formats integer client ids the inconsistent ways they appear in the source data:
+    plain, 'C0001', padded with spaces, 'client-1' and '#1', with a few missing.
+    Cleaning keeps the digits, so every form maps back to the original id.
+
+    Parameters:
+        client_ids (np.ndarray): Integer client ids
+        rng (np.random.Generator): Random generator
+        missing_rate (float): Share of ids left empty
+
+    Returns:
+        pd.Series: String client ids
+    """
+    ids = pd.Series(client_ids).astype(str)
+    dirty = ids.astype(object)
+    style = rng.integers(0, 5, len(ids))
+
+    dirty[style == 1] = 'C' + ids[style == 1].str.zfill(4)
+    dirty[style == 2] = ' ' + ids[style == 2] + ' '
+    dirty[style == 3] = 'client-' + ids[style == 3]
+    dirty[style == 4] = '#' + ids[style == 4]
+    dirty[rng.random(len(ids)) < missing_rate] = None
+    return dirty
+
+
+def generate_clients(n_clients, seed=0, dirty=False):
+    """
+    Generates raw client documents shaped like the `clients` collection.
+
+    Parameters:
+        n_clients (int): Number of clients
+        seed (int): Random seed
+        dirty (bool): Use inconsistently formatted client ids and nationalities
+
+    Returns:
+        pd.DataFrame: Raw clients data
+    """
+    rng = np.random.default_rng(seed)
+    client_ids = np.arange(1, n_clients + 1)
+
+    clients = pd.DataFrame({
+        'client_id': client_ids,
+        'name': 'Client ' + pd.Series(client_ids).astype(str),
+        'birthdate': pd.Timestamp('1960-01-01') + pd.to_timedelta(rng.integers(0, 365 * 47, n_clients), unit='D'),
+        'date_joined': pd.Timestamp('2023-02-01') + pd.to_timedelta(rng.integers(0, 730, n_clients), unit='D'),
+        'nationality': rng.choice(MESSY_NATIONALITIES if dirty else NATIONALITIES, n_clients),
+    })
+
+    if dirty:
+        clients['client_id'] = dirty_client_ids(client_ids, rng)
+        clients['nationality'] = clients['nationality'].mask(rng.random(n_clients) < MISSING_RATE)
+    return clients
+
+
+def generate_memberships(n_clients, seed=0, dirty=False):
+    """
+    Generates one raw membership document per client, shaped like the `memberships` collection.
+
+    Parameters:
+        n_clients (int): Number of clients
+        seed (int): Random seed
+        dirty (bool): Use inconsistently formatted client ids; none are missing, as
+            preprocessing requires one membership per client
+
+    Returns:
+        pd.DataFrame: Raw memberships data
+    """
+    rng = np.random.default_rng(seed + 1)
+    start_dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 395, n_clients), unit='D')
+    client_ids = np.arange(1, n_clients + 1)
+
+    return pd.DataFrame({
+        'membership_id': 'M' + pd.Series(client_ids).astype(str),
+        'client_id': dirty_client_ids(client_ids, rng, missing_rate=0) if dirty else client_ids,
+        'tier': rng.choice(TIERS, n_clients),
+        'status': rng.choice(STATUSES, n_clients, p=[0.9, 0.07, 0.03]),
+        'start_date': start_dates,
+        'end_date': start_dates + pd.Timedelta(days=365),
+    })
+
+
+def generate_transactions(n_transactions, n_clients, seed=0, dirty=False):
+    """
+    Generates raw transaction documents shaped like the `transactions` collection.
+
+    Parameters:
+        n_transactions (int): Number of transactions
+        n_clients (int): Number of clients the transactions are spread over
+        seed (int): Random seed
+        dirty (bool): Use inconsistently formatted client ids
+
+    Returns:
+        pd.DataFrame: Raw transactions data
+    """
+    rng = np.random.default_rng(seed + 2)
+    client_ids = rng.integers(1, n_clients + 1, n_transactions)
+
+    return pd.DataFrame({
+        'transaction_id': 'T' + pd.Series(np.arange(1, n_transactions + 1)).astype(str),
+        'client_id': dirty_client_ids(client_ids, rng) if dirty else client_ids,
+        'amount': rng.uniform(1, 10_000, n_transactions).round(2),
+        'date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 400 * 86_400, n_transactions), unit='s'),
+    })
+
+
+def insert_frame(collection, frame, chunk_size=100_000):
+    """
+    Replaces the contents of a collection with the rows of a frame.
+
+    Parameters:
+        collection (pymongo.collection.Collection): Target collection
+        frame (pd.DataFrame): Rows to insert
+        chunk_size (int): Rows per insert_many call
+    """
+    collection.drop()
+    for start in range(0, len(frame), chunk_size):
+        chunk = frame.iloc[start:start + chunk_size]
+        collection.insert_many(chunk.to_dict('records'), ordered=False)
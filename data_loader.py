@@ -1,12 +1,55 @@
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import pandas as pd
 from pymongo import MongoClient
+from pymongo.errors import OperationFailure, PyMongoError
+from data_visualisation.profiling import profiled
 
-def load_data_from_mongodb():
+# Collections fetched for the dashboard, in the order they are returned
+COLLECTIONS = ('clients', 'memberships', 'transactions')
+
+# Change stream events after which a collection must be reloaded from scratch
+RESYNC_EVENTS = {'drop', 'rename', 'dropDatabase', 'invalidate'}
+
+# Fields the dashboard views read from each collection (`_id` is always returned)
+VIEW_FIELDS = {
+    'clients': ['client_id', 'name', 'birthdate', 'date_joined', 'nationality'],
+    'memberships': ['membership_id', 'client_id', 'tier', 'status', 'start_date', 'end_date'],
+    'transactions': ['transaction_id', 'client_id', 'amount', 'date'],
+}
+
+# Connection pool and fetch tuning defaults; the variables named in get_fetch_settings
+# override them from the environment or the .env file
+MONGO_MAX_POOL_SIZE = 20
+FETCH_BATCH_SIZE = 10000
+FETCH_WORKERS = 6
+
+# Collections with more documents than this are fetched as `_id`-range partitions
+PARTITION_MIN_DOCUMENTS = 200000
+FETCH_PARTITIONS = 4
+
+# Sampled `_id` values per range when choosing the range bounds
+PARTITION_SAMPLE_PER_RANGE = 100
+
+# Seconds between pings of the pooled client
+HEALTH_CHECK_INTERVAL = 30
+
+# Most `_id` values per $in query when polling fetches changed documents
+POLL_FETCH_IDS = 10_000
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_connection_settings():
     """
-    Connects to MongoDB Atlas using credentials from the .env file and fetches data from the `key_task` database.
-    Returns three DataFrames: clients, memberships, transactions.
+    Reads the MongoDB connection details from the .env file.
+
+    Returns:
+        tuple: MongoDB URI and database name
     """
     # Load environment variables from the .env file
     load_dotenv()
@@ -18,21 +61,501 @@ def load_data_from_mongodb():
     if not MONGO_URI or not DB_NAME:
         raise ValueError("MongoDB URI or Database name not found in the .env file.")
 
+    return MONGO_URI, DB_NAME
+
+
+def get_fetch_settings():
+    """
+    Reads the connection pool and fetch tuning from the .env file, when it is used
+    rather than when this module is imported, so a .env loaded later still applies.
+
+    Returns:
+        dict: max_pool_size, batch_size, workers, partitions and partition_min_documents
+    """
+    # Load environment variables from the .env file
+    load_dotenv()
+
+    return {
+        'max_pool_size': int(os.getenv("MONGO_MAX_POOL_SIZE", MONGO_MAX_POOL_SIZE)),
+        'batch_size': int(os.getenv("MONGO_BATCH_SIZE", FETCH_BATCH_SIZE)),
+        'workers': int(os.getenv("MONGO_FETCH_WORKERS", FETCH_WORKERS)),
+        'partitions': int(os.getenv("MONGO_FETCH_PARTITIONS", FETCH_PARTITIONS)),
+        'partition_min_documents': int(os.getenv("MONGO_PARTITION_MIN_DOCUMENTS", PARTITION_MIN_DOCUMENTS)),
+    }
+
+
+def get_projection(collection, fields=VIEW_FIELDS):
+    """
+    Builds the find() projection for a collection.
+
+    Parameters:
+        collection (str): Collection name
+        fields (dict): Fields to fetch per collection, or None for every field
+
+    Returns:
+        dict: Projection document, or None when the whole document is needed
+    """
+    if not fields or collection not in fields:
+        return None
+    return {field: 1 for field in fields[collection]}
+
+
+def get_mongo_client(uri, max_pool_size=None):
+    """
+    Returns the process-wide pooled client for a URI, creating it on first use.
+
+    The client is pinged at most every HEALTH_CHECK_INTERVAL seconds; a client that
+    fails the ping is closed and replaced once before giving up.
+
+    Parameters:
+        uri (str): MongoDB URI
+        max_pool_size (int, optional): Most connections the pool keeps open; read with
+            get_fetch_settings when a client is created by default
+
+    Returns:
+        MongoClient: Healthy pooled client
+
+    Raises:
+        ConnectionError: If no healthy client can be created
+    """
+    with _clients_lock:
+        entry = _clients.get(uri)
+        if entry is not None and time.monotonic() - entry['checked_at'] < HEALTH_CHECK_INTERVAL:
+            return entry['client']
+
+        for attempt in range(2):
+            if entry is None:
+                if max_pool_size is None:
+                    max_pool_size = get_fetch_settings()['max_pool_size']
+                entry = {'client': MongoClient(uri, maxPoolSize=max_pool_size), 'checked_at': 0.0}
+            try:
+                entry['client'].admin.command('ping')
+            except PyMongoError as e:
+                entry['client'].close()
+                _clients.pop(uri, None)
+                entry = None
+                if attempt == 1:
+                    raise ConnectionError(f"Failed to connect to MongoDB: {str(e)}")
+                continue
+            entry['checked_at'] = time.monotonic()
+            _clients[uri] = entry
+            return entry['client']
+
+
+def close_mongo_clients():
+    """
+    Closes every pooled client, e.g. before the process exits.
+    """
+    with _clients_lock:
+        for entry in _clients.values():
+            entry['client'].close()
+        _clients.clear()
+
+
+def id_range_partitions(collection, partitions, min_documents=None):
+    """
+    Splits a large collection into `_id` ranges that can be fetched concurrently.
+
+    Range bounds are quantiles of a random sample of `_id` values, so ranges hold
+    about the same number of documents. The first and last ranges are open-ended, so
+    together the ranges cover every document whatever its `_id`.
+
+    Parameters:
+        collection (pymongo.collection.Collection): Collection to split
+        partitions (int): Number of ranges
+        min_documents (int, optional): Smaller collections are fetched as a single
+            range; read with get_fetch_settings by default
+
+    Returns:
+        list: Query filters, one per range, in `_id` order
+    """
+    if min_documents is None:
+        min_documents = get_fetch_settings()['partition_min_documents']
+    if partitions <= 1 or collection.estimated_document_count() <= min_documents:
+        return [{}]
+
+    sample = collection.aggregate([
+        {'$sample': {'size': partitions * PARTITION_SAMPLE_PER_RANGE}},
+        {'$project': {'_id': 1}},
+    ])
     try:
-        # Connect to MongoDB
-        client = MongoClient(MONGO_URI)
-        db = client[DB_NAME]
+        ids = sorted(document['_id'] for document in sample)
+    except TypeError:
+        # Mixed `_id` types do not sort in Python
+        return [{}]
 
-        # Fetch collections
-        clients = pd.DataFrame(list(db.clients.find()))
-        memberships = pd.DataFrame(list(db.memberships.find()))
-        transactions = pd.DataFrame(list(db.transactions.find()))
+    bounds = []
+    for i in range(1, partitions):
+        bound = ids[len(ids) * i // partitions] if ids else None
+        if bound is not None and (not bounds or bound > bounds[-1]):
+            bounds.append(bound)
+    if not bounds:
+        return [{}]
+
+    filters = [{'_id': {'$lt': bounds[0]}}]
+    filters += [{'_id': {'$gte': low, '$lt': high}} for low, high in zip(bounds, bounds[1:])]
+    filters.append({'_id': {'$gte': bounds[-1]}})
+    return filters
+
+
+def fetch_collections(db, names, fetch, workers, partitions=None):
+    """
+    Fetches several collections concurrently on a thread pool sharing the pooled
+    client, splitting large collections into `_id` ranges fetched in parallel too.
+
+    Parameters:
+        db (pymongo.database.Database): Database holding the collections
+        names (list): Collection names
+        fetch (callable): fetch(collection, name, query) returning one range's result
+        workers (int): Most ranges fetched at the same time
+        partitions (int, optional): Ranges per large collection; read with
+            get_fetch_settings by default
+
+    Returns:
+        list: Per collection, in `names` order, the results of its ranges in `_id` order
+    """
+    if partitions is None:
+        partitions = get_fetch_settings()['partitions']
+    tasks = [
+        (name, query)
+        for name in names
+        for query in id_range_partitions(db[name], partitions)
+    ]
+    if workers <= 1 or len(tasks) == 1:
+        results = [fetch(db[name], name, query) for name, query in tasks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(tasks)), thread_name_prefix='mongo-fetch') as pool:
+            results = list(pool.map(lambda task: fetch(db[task[0]], task[0], task[1]), tasks))
 
-        # Close the connection
-        client.close()
+    # Reassemble the ranges of each collection in order
+    grouped = {name: [] for name in names}
+    for (name, _), result in zip(tasks, results):
+        grouped[name].append(result)
+    return [grouped[name] for name in names]
 
+
+@profiled('load_data_from_mongodb', 'load')
+def load_data_from_mongodb(fields=VIEW_FIELDS, batch_size=None, workers=None, partitions=None):
+    """
+    Connects to MongoDB Atlas using credentials from the .env file and fetches data from the `key_task` database.
+    Returns three DataFrames: clients, memberships, transactions.
+
+    The collections, and `_id` ranges of large ones, are fetched concurrently over
+    the process-wide connection pool.
+
+    Parameters:
+        fields (dict): Fields to fetch per collection, or None for every field
+        batch_size (int, optional): Documents per server batch
+        workers (int, optional): Most ranges fetched at the same time
+        partitions (int, optional): Ranges per large collection
+
+    Settings not given are read with get_fetch_settings.
+    """
+    MONGO_URI, DB_NAME = get_connection_settings()
+    settings = get_fetch_settings()
+    batch_size = settings['batch_size'] if batch_size is None else batch_size
+    workers = settings['workers'] if workers is None else workers
+    partitions = settings['partitions'] if partitions is None else partitions
+
+    try:
+        # Connect to MongoDB through the shared pool
+        db = get_mongo_client(MONGO_URI)[DB_NAME]
+
+        # Fetch collections
+        documents = fetch_collections(
+            db, COLLECTIONS,
+            lambda collection, name, query: list(
+                collection.find(query, get_projection(name, fields), batch_size=batch_size)
+            ),
+            workers=workers, partitions=partitions
+        )
+        clients, memberships, transactions = (
+            pd.DataFrame([document for part in parts for document in part]) for parts in documents
+        )
         return clients, memberships, transactions
 
     except Exception as e:
         raise ConnectionError(f"Failed to connect to MongoDB: {str(e)}")
 
+
+class IncrementalMongoLoader:
+    """
+    Keeps the raw collections in memory and only fetches what changed since the last sync.
+
+    Each collection is first loaded in full. After that, `sync` resumes the collection's
+    change stream from the stored resume token and patches inserted, updated and deleted
+    documents into the cached frame. An invalid or expired resume token triggers a full
+    reload.
+
+    Servers without change streams (standalone mongod, mongomock) are polled instead.
+    With a `version_field`, e.g. an update timestamp, each poll reads the `_id` and
+    version of every document, fetches only the documents whose version changed and
+    drops the ones that are gone, so inserts, updates and deletes are all patched in.
+    Without one, each poll only fetches documents above the `_id` high-water mark:
+    inserts are picked up, but updates and deletes are not detected until the next
+    full reload.
+
+    Parameters:
+        db (pymongo.database.Database): Database holding the dashboard collections
+        collections (tuple): Names of the collections to keep in sync
+        fields (dict): Fields to keep per collection, or None for every field
+        batch_size (int, optional): Documents per server batch; read with
+            get_fetch_settings by default
+        workers (int, optional): Most collections or `_id` ranges fetched at the same
+            time; read with get_fetch_settings by default
+        version_field (str, optional): Field changed on every update of a document;
+            lets polling detect updates and deletes
+    """
+
+    def __init__(self, db, collections=COLLECTIONS, fields=VIEW_FIELDS, batch_size=None,
+                 workers=None, version_field=None):
+        settings = get_fetch_settings()
+        self.db = db
+        self.collections = tuple(collections)
+        self.fields = fields
+        self.batch_size = settings['batch_size'] if batch_size is None else batch_size
+        self.workers = settings['workers'] if workers is None else workers
+        self.version_field = version_field
+        self._connection = None
+        self._state = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Creates a loader connected to the database configured in the .env file.
+
+        Returns:
+            IncrementalMongoLoader: Loader bound to the process-wide pooled client
+        """
+        MONGO_URI, DB_NAME = get_connection_settings()
+
+        try:
+            # Polling reads only this field of each document when it is set
+            loader = cls(
+                get_mongo_client(MONGO_URI)[DB_NAME],
+                version_field=os.getenv("MONGO_VERSION_FIELD") or None
+            )
+            loader._connection = (MONGO_URI, DB_NAME)
+            return loader
+        except PyMongoError as e:
+            raise ConnectionError(f"Failed to connect to MongoDB: {str(e)}")
+
+    @profiled('IncrementalMongoLoader.sync', 'load')
+    def sync(self):
+        """
+        Brings every collection up to date and returns the raw frames.
+
+        Returns:
+            tuple: Raw DataFrames in the order of `self.collections`
+        """
+        with self._lock:
+            try:
+                if self._connection is not None:
+                    # Re-check the pooled client, which is replaced if it stops answering
+                    uri, db_name = self._connection
+                    self.db = get_mongo_client(uri)[db_name]
+
+                # Collections seen for the first time are fetched together
+                new = [name for name in self.collections if name not in self._state]
+                if new:
+                    self._full_reload(*new)
+                for name in self.collections:
+                    if name not in new:
+                        self._sync_collection(name)
+            except PyMongoError as e:
+                raise ConnectionError(f"Failed to connect to MongoDB: {str(e)}")
+
+            # Hand out frames with a plain index, as load_data_from_mongodb does
+            return tuple(
+                self._state[name]['frame'].reset_index(drop=True)
+                for name in self.collections
+            )
+
+    def _full_reload(self, *names):
+        """
+        Fetches whole collections, concurrently, and records where incremental syncing
+        of each should resume.
+
+        Parameters:
+            *names (str): Collection names
+        """
+        # Take the resume tokens before reading so no change between the two is lost
+        starts = {}
+        for name in names:
+            try:
+                with self.db[name].watch(full_document='updateLookup') as stream:
+                    starts[name] = ('change_stream', stream.resume_token)
+            except (OperationFailure, NotImplementedError, TypeError):
+                # Change streams need a replica set; mongomock does not implement them at all
+                starts[name] = ('polling', None)
+
+        fetched = fetch_collections(
+            self.db, names,
+            lambda collection, name, query: list(
+                collection.find(query, self._projection(name), batch_size=self.batch_size)
+            ),
+            workers=self.workers
+        )
+
+        for name, parts in zip(names, fetched):
+            documents = [document for part in parts for document in part]
+            mode, resume_token = starts[name]
+            self._state[name] = {
+                'frame': self._to_frame(documents, name),
+                'mode': mode,
+                'resume_token': resume_token,
+                'versions': (
+                    {document['_id']: document.get(self.version_field) for document in documents}
+                    if mode == 'polling' and self.version_field is not None else None
+                ),
+                'high_water_id': max((document['_id'] for document in documents), default=None),
+            }
+
+    def _sync_collection(self, name):
+        """
+        Applies the changes made to a collection since its last sync.
+
+        Parameters:
+            name (str): Collection name
+        """
+        state = self._state[name]
+        collection = self.db[name]
+
+        if state['mode'] == 'polling':
+            self._poll_collection(name, state)
+            return
+
+        upserts, deletes = {}, set()
+        try:
+            with collection.watch(
+                full_document='updateLookup',
+                resume_after=state['resume_token']
+            ) as stream:
+                while stream.alive:
+                    change = stream.try_next()
+                    if change is None:
+                        break
+
+                    operation = change['operationType']
+                    if operation in RESYNC_EVENTS:
+                        self._full_reload(name)
+                        return
+
+                    key = change['documentKey']['_id']
+                    document = change.get('fullDocument')
+                    if operation == 'delete' or document is None:
+                        # A missing full document means it was deleted after the update
+                        upserts.pop(key, None)
+                        deletes.add(key)
+                    else:
+                        deletes.discard(key)
+                        upserts[key] = document
+
+                resume_token = stream.resume_token
+        except OperationFailure:
+            # The resume token is invalid or has fallen off the oplog
+            self._full_reload(name)
+            return
+
+        self._apply_changes(name, state, upserts, deletes)
+        state['resume_token'] = resume_token
+
+    def _poll_collection(self, name, state):
+        """
+        Patches in the documents changed since the last poll: those whose version
+        changed or that are gone with a version field, otherwise those inserted above
+        the `_id` high-water mark.
+
+        Parameters:
+            name (str): Collection name
+            state (dict): Sync state of the collection
+        """
+        collection = self.db[name]
+
+        if self.version_field is None:
+            query = {}
+            if state['high_water_id'] is not None:
+                query = {'_id': {'$gt': state['high_water_id']}}
+            upserts = {
+                document['_id']: document
+                for document in collection.find(query, self._projection(name), batch_size=self.batch_size)
+            }
+            self._apply_changes(name, state, upserts, set())
+            return
+
+        # Read the versions only, then fetch the documents whose version moved
+        previous = state['versions']
+        versions = {
+            document['_id']: document.get(self.version_field)
+            for document in collection.find({}, {self.version_field: 1}, batch_size=self.batch_size)
+        }
+        changed = [key for key, version in versions.items() if key not in previous or previous[key] != version]
+        upserts = {}
+        for start in range(0, len(changed), POLL_FETCH_IDS):
+            query = {'_id': {'$in': changed[start:start + POLL_FETCH_IDS]}}
+            for document in collection.find(query, get_projection(name, self.fields)):
+                upserts[document['_id']] = document
+
+        self._apply_changes(name, state, upserts, set(previous) - set(versions))
+        state['versions'] = versions
+
+    def _projection(self, name):
+        """
+        Projection of the fetched documents: the kept fields and the version field.
+        """
+        projection = get_projection(name, self.fields)
+        if projection is not None and self.version_field is not None:
+            projection[self.version_field] = 1
+        return projection
+
+    def _apply_changes(self, name, state, upserts, deletes):
+        """
+        Patches upserted and deleted documents into a cached frame.
+
+        Parameters:
+            name (str): Collection name
+            state (dict): Sync state of the collection
+            upserts (dict): Documents to insert or replace, keyed by `_id`
+            deletes (set): `_id` values to remove
+        """
+        if not upserts and not deletes:
+            return
+
+        frame = state['frame']
+
+        # Drop deleted documents and the old versions of updated ones
+        stale = frame.index.intersection(list(deletes) + list(upserts))
+        if len(stale):
+            frame = frame.drop(index=stale)
+
+        if upserts:
+            frame = pd.concat([frame, self._to_frame(list(upserts.values()), name)])
+            state['high_water_id'] = max(
+                key for key in [state['high_water_id'], *upserts] if key is not None
+            )
+
+        state['frame'] = frame
+
+    def _to_frame(self, documents, name):
+        """
+        Builds a frame indexed by `_id`, keeping `_id` as a column for preprocessing.
+
+        Parameters:
+            documents (list): Raw MongoDB documents
+            name (str): Collection the documents belong to
+
+        Returns:
+            pd.DataFrame: Documents indexed by `_id`
+        """
+        frame = pd.DataFrame(documents)
+
+        # Change stream documents carry every field, so apply the projection here too
+        projection = get_projection(name, self.fields)
+        if projection is not None:
+            frame = frame[[col for col in frame.columns if col == '_id' or col in projection]]
+
+        if '_id' in frame.columns:
+            frame = frame.set_index('_id', drop=False)
+            frame.index.name = None
+        return frame
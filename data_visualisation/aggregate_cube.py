@@ -0,0 +1,229 @@
+import pandas as pd
+
+# Age bands of the demographic section, the cube and the chatbot answers
+AGE_BINS = [0, 18, 25, 35, 45, 55, 65, 100]
+AGE_LABELS = ['0-18', '19-25', '26-35', '36-45', '46-55', '56-65', '65+']
+
+# Dimensions of each fact table in the cube
+FACT_DIMENSIONS = {
+    'transactions': ['day', 'tier', 'country_code', 'age_band'],
+    'clients': ['day', 'tier', 'country_code', 'age_band'],
+    'memberships': ['day', 'tier', 'status', 'country_code', 'age_band'],
+}
+
+
+class AggregateCube:
+    """
+    Pre-aggregated daily × tier × country × age-band counts and sums.
+
+    Built once per data refresh by build_aggregate_cube. Every chart query is a
+    roll-up over one of the fact tables, so it touches a few thousand cube cells
+    instead of the raw rows.
+
+    Fact tables:
+        transactions: `amount_sum` and `amount_count` per transaction day
+        clients: `count` of clients per day joined
+        memberships: `count` of memberships per start day, also split by status, and
+            `merged_rows`, the rows each membership gives in the clients × memberships
+            merge (one per matching client row, none for memberships without a client)
+
+    Parameters:
+        facts (dict): Aggregated frame per fact table name
+    """
+
+    def __init__(self, facts):
+        self.facts = facts
+
+    def rollup(self, fact, by=(), filters=None):
+        """
+        Sums the measures of a fact table over every dimension not in `by`.
+
+        Parameters:
+            fact (str): Fact table name
+            by (list): Dimensions to keep
+            filters (dict, optional): Dimension to required value, list of values, or
+                (start, end) tuple for an inclusive `day` range
+
+        Returns:
+            pd.DataFrame: One row per combination of `by`, missing values dropped
+        """
+        cells = self.facts[fact]
+
+        for dimension, condition in (filters or {}).items():
+            if isinstance(condition, tuple):
+                start, end = condition
+                cells = cells[(cells[dimension] >= start) & (cells[dimension] <= end)]
+            elif isinstance(condition, list):
+                cells = cells[cells[dimension].isin(condition)]
+            else:
+                cells = cells[cells[dimension] == condition]
+
+        measures = [col for col in cells.columns if col not in FACT_DIMENSIONS[fact]]
+        if not by:
+            return cells[measures].sum().to_frame().T
+
+        return cells.groupby(list(by), observed=True)[measures].sum().reset_index()
+
+    def daily_totals(self):
+        """
+        Total transaction amount per day, as in the transaction trends section.
+
+        Returns:
+            pd.DataFrame: `period` and `total_amount`
+        """
+        totals = self.rollup('transactions', by=['day'])
+        totals['day'] = totals['day'].dt.date
+        return totals[['day', 'amount_sum']].rename(columns={'day': 'period', 'amount_sum': 'total_amount'})
+
+    def tier_counts(self):
+        """
+        Memberships per tier, most common first, as in the KPI section.
+
+        Returns:
+            pd.DataFrame: `tier` and `count`
+        """
+        counts = self.rollup('memberships', by=['tier'])[['tier', 'count']]
+        counts['tier'] = counts['tier'].astype(str)
+        return counts.sort_values('count', ascending=False, kind='stable').reset_index(drop=True)
+
+    def average_spending_by_tier(self, tier_order):
+        """
+        Average transaction amount per membership tier, as in the spending section.
+        Tiers come from the memberships, so clients missing from the clients data
+        still count towards their tier.
+
+        Parameters:
+            tier_order (list): Tiers to report, in display order
+
+        Returns:
+            pd.DataFrame: `tier` (ordered categorical) and `amount`
+        """
+        spending = self.rollup('transactions', by=['tier'], filters={'tier': tier_order})
+        spending['amount'] = spending['amount_sum'] / spending['amount_count']
+        spending['tier'] = pd.Categorical(spending['tier'].astype(str), categories=tier_order, ordered=True)
+
+        # Keep every tier in the chart, like a groupby with observed=False
+        averages = pd.DataFrame({'tier': pd.Categorical(tier_order, categories=tier_order, ordered=True)})
+        return averages.merge(spending[['tier', 'amount']], on='tier', how='left')
+
+    def retention_by_tier(self):
+        """
+        Share of active rows per tier in the clients × memberships merge, as in the
+        retention section: a client listed twice counts its membership twice, and
+        memberships without a client are left out.
+
+        Returns:
+            pd.DataFrame: `Tier` and `Retention Rate` in percent
+        """
+        totals = self.rollup('memberships', by=['tier'])
+        active = self.rollup('memberships', by=['tier'], filters={'status': 'ACTIVE'})
+
+        retention = totals.merge(active, on='tier', how='left', suffixes=('_total', '_active'))
+        retention = retention[retention['merged_rows_total'] > 0]
+        retention['Retention Rate'] = (
+            retention['merged_rows_active'].fillna(0) / retention['merged_rows_total'] * 100
+        )
+        retention['Tier'] = retention['tier'].astype(str)
+        return retention[['Tier', 'Retention Rate']]
+
+    def monthly_counts(self, fact, start_date, end_date, name):
+        """
+        Monthly row counts of a fact table within an inclusive date range, as in the
+        temporal trends section.
+
+        Parameters:
+            fact (str): 'clients' or 'memberships'
+            start_date (pd.Timestamp): First day of the range
+            end_date (pd.Timestamp): Last day of the range
+            name (str): Name of the count column
+
+        Returns:
+            pd.DataFrame: `Month` (month-end dates) and the count column
+        """
+        daily = self.rollup(fact, by=['day'], filters={'day': (start_date, end_date)})
+        monthly = daily.set_index('day')['count'].resample('ME').sum()
+        monthly.index.name = 'Month'
+        return monthly.reset_index(name=name)
+
+
+def _client_attributes(clients, memberships):
+    """
+    Looks up the cube dimensions that belong to a client.
+
+    Parameters:
+        clients (pd.DataFrame): Processed clients data
+        memberships (pd.DataFrame): Processed memberships data
+
+    Returns:
+        pd.DataFrame: `tier`, `country_code` and `age_band` indexed by client_id, for
+        the clients of both frames; clients with only a membership have no country
+        or age band
+    """
+    client_ids = pd.concat([clients['client_id'], memberships['client_id']], ignore_index=True)
+    attributes = pd.DataFrame(index=pd.Index(client_ids.drop_duplicates(), name='client_id'))
+    clients_by_id = clients.drop_duplicates('client_id').set_index('client_id')
+
+    attributes['country_code'] = clients_by_id['country_code'] if 'country_code' in clients_by_id else None
+    if 'age' in clients_by_id:
+        attributes['age_band'] = pd.cut(clients_by_id['age'], bins=AGE_BINS, labels=AGE_LABELS)
+    else:
+        attributes['age_band'] = None
+
+    tiers = memberships.drop_duplicates('client_id').set_index('client_id')['tier']
+    attributes['tier'] = tiers.reindex(attributes.index)
+    return attributes
+
+
+def _aggregate(facts, dimensions, measures):
+    """
+    Groups fact rows into cube cells, keeping cells with missing dimensions.
+    """
+    return facts.groupby(dimensions, observed=True, dropna=False).agg(**measures).reset_index()
+
+
+def build_aggregate_cube(clients, memberships, transactions):
+    """
+    Builds the aggregate cube from the processed frames.
+
+    Parameters:
+        clients (pd.DataFrame): Processed clients data
+        memberships (pd.DataFrame): Processed memberships data
+        transactions (pd.DataFrame): Processed transactions data
+
+    Returns:
+        AggregateCube: Cube answering the dashboard's summary queries
+    """
+    attributes = _client_attributes(clients, memberships)
+
+    # Transactions: spend per day and client segment
+    transaction_facts = transactions[['client_id', 'amount']].join(attributes, on='client_id')
+    transaction_facts['day'] = transactions['date'].dt.normalize()
+    transaction_facts = _aggregate(
+        transaction_facts,
+        FACT_DIMENSIONS['transactions'],
+        {'amount_sum': ('amount', 'sum'), 'amount_count': ('amount', 'count')}
+    )
+
+    # Clients: signups per day and segment
+    client_facts = attributes.reindex(clients['client_id']).reset_index(drop=True)
+    client_facts['day'] = clients['date_joined'].dt.normalize().to_numpy()
+    client_facts = _aggregate(client_facts, FACT_DIMENSIONS['clients'], {'count': ('day', 'size')})
+
+    # Memberships: starts per day, tier and status, with the member's segment
+    membership_facts = memberships[['client_id', 'tier', 'status']].join(
+        attributes[['country_code', 'age_band']], on='client_id'
+    )
+    client_rows = clients['client_id'].value_counts()
+    membership_facts['merged_rows'] = memberships['client_id'].map(client_rows).fillna(0).astype('int64')
+    membership_facts['day'] = memberships['start_date'].dt.normalize()
+    membership_facts = _aggregate(
+        membership_facts,
+        FACT_DIMENSIONS['memberships'],
+        {'count': ('client_id', 'size'), 'merged_rows': ('merged_rows', 'sum')}
+    )
+
+    return AggregateCube({
+        'transactions': transaction_facts,
+        'clients': client_facts,
+        'memberships': membership_facts,
+    })
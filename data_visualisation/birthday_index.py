@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+# Days before each month in a leap year, so every (month, day) gets its own slot
+LEAP_MONTH_OFFSETS = np.array([0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335])
+
+# Slot of February 29
+LEAP_DAY = 60
+
+
+def birthday_slots(dates):
+    """
+    Maps dates to their day of the year in a leap-year calendar (1-366).
+
+    Parameters:
+        dates (pd.Series): Datetime values without missing entries
+
+    Returns:
+        np.ndarray: Slot per date
+    """
+    return LEAP_MONTH_OFFSETS[dates.dt.month.to_numpy() - 1] + dates.dt.day.to_numpy()
+
+
+class BirthdayIndex:
+    """
+    Clients sorted by the calendar day of their birthday.
+
+    Built once per data refresh. Listing the birthdays of the next N days is one
+    binary search per day in the window instead of computing every client's next
+    birthday. Clients born on February 29 celebrate on February 28 in non-leap years.
+
+    Parameters:
+        clients (pd.DataFrame): Processed clients data with birthdate information
+    """
+
+    def __init__(self, clients):
+        clients = clients[clients['birthdate'].notna()]
+        slots = birthday_slots(clients['birthdate'])
+        order = np.argsort(slots, kind='stable')
+
+        self.slots = slots[order]
+        self.clients = clients[['client_id', 'name', 'birthdate']].iloc[order].reset_index(drop=True)
+
+    def upcoming(self, days, today=None):
+        """
+        Lists the clients whose birthday falls within the next `days` days.
+
+        Parameters:
+            days (int): Window length; 0 means today only
+            today (pd.Timestamp, optional): First day of the window, defaults to today
+
+        Returns:
+            pd.DataFrame: `client_id`, `name`, `birthdate` and `days_until_birthday`,
+                soonest first
+        """
+        today = pd.Timestamp.now().normalize() if today is None else pd.Timestamp(today).normalize()
+        window = pd.Series(pd.date_range(today, periods=min(days, 365) + 1, freq='D'))
+        window_slots = birthday_slots(window)
+
+        # Positions of each window day's clients in the sorted slots
+        starts = np.searchsorted(self.slots, window_slots, side='left')
+        stops = np.searchsorted(self.slots, window_slots, side='right')
+
+        # February 28 of a non-leap year also covers February 29 birthdays
+        covers_leap_day = (
+            (window.dt.month == 2) & (window.dt.day == 28) & ~window.dt.is_leap_year
+        ).to_numpy()
+        stops[covers_leap_day] = np.searchsorted(self.slots, LEAP_DAY, side='right')
+
+        counts = stops - starts
+        positions = np.concatenate(
+            [np.arange(start, stop) for start, stop in zip(starts, stops)]
+        ) if counts.sum() else np.array([], dtype='int64')
+
+        upcoming = self.clients.iloc[positions].reset_index(drop=True)
+        upcoming['days_until_birthday'] = np.repeat(np.arange(len(window)), counts)
+        return upcoming
+
+    def __len__(self):
+        return len(self.clients)
@@ -0,0 +1,137 @@
+import pandas as pd
+from data_visualisation.aggregate_cube import AGE_BINS, AGE_LABELS
+from data_visualisation.country_resolver import map_country_names
+from data_visualisation.membership_spending import TIER_ORDER
+
+
+def format_table(frame, float_format="{:.2f}"):
+    """
+    Renders a frame as a pipe-separated table: one header line, then one line per row.
+    Far fewer tokens than JSON records, which repeat every key on every row.
+
+    Parameters:
+        frame (pd.DataFrame): Table to render
+        float_format (str): Format of float values
+
+    Returns:
+        str: The table
+    """
+    def cell(value):
+        if isinstance(value, float):
+            return float_format.format(value)
+        return str(value)
+
+    lines = [" | ".join(str(column) for column in frame.columns)]
+    for row in frame.itertuples(index=False):
+        lines.append(" | ".join(cell(value) for value in row))
+    return "\n".join(lines)
+
+
+def _monthly_series(cube):
+    """
+    Client and membership signups and transaction totals per month, over all the data.
+    """
+    months = []
+    for fact, measure, name in [
+        ('clients', 'count', 'client_signups'),
+        ('memberships', 'count', 'membership_signups'),
+        ('transactions', 'amount_sum', 'transaction_amount'),
+    ]:
+        daily = cube.rollup(fact, by=['day'])
+        if daily.empty:
+            continue
+        monthly = daily.set_index('day')[measure].resample('ME').sum()
+        months.append(monthly.rename(name))
+    if not months:
+        return pd.DataFrame()
+
+    series = pd.concat(months, axis=1).fillna(0)
+    series.index = series.index.strftime('%Y-%m')
+    series.index.name = 'month'
+    for column in ['client_signups', 'membership_signups']:
+        if column in series:
+            series[column] = series[column].astype(int)
+    return series.reset_index()
+
+
+def build_chat_context(clients, memberships, merged_data, transactions, cube):
+    """
+    Summarises the dashboard data for the chatbot, one chunk per section.
+
+    The numbers come from the same frames and aggregates as the dashboard, so the
+    chatbot answers from the data currently shown. Chunks have the (heading, body)
+    form of chat_retrieval.chunk_graph_data and can be indexed the same way.
+
+    Parameters:
+        clients (pd.DataFrame): Processed clients data
+        memberships (pd.DataFrame): Processed memberships data
+        merged_data (pd.DataFrame): Merged clients and memberships data
+        transactions (pd.DataFrame): Processed transactions data
+        cube (AggregateCube): Aggregates behind the dashboard sections
+
+    Returns:
+        list: (heading, body) tuples
+    """
+    chunks = []
+
+    # Quick statistics
+    active_memberships = merged_data.loc[merged_data['status'] == 'ACTIVE', 'membership_id'].nunique()
+    total_clients = clients['client_id'].nunique()
+    chunks.append(("🚀 Quick Statistics / Overview", "\n".join([
+        f"Total Clients: {total_clients}",
+        f"Active Memberships: {active_memberships}",
+        f"Total Transactions: {transactions['transaction_id'].nunique()}",
+        f"Total Transaction Amount: ${transactions['amount'].sum():,.2f}",
+    ])))
+
+    # Membership tier distribution
+    tier_counts = cube.tier_counts()
+    chunks.append(("📊 Membership Tier Distribution", "\n".join([
+        f"Total Memberships: {int(tier_counts['count'].sum())}",
+        format_table(tier_counts),
+    ])))
+
+    # Geographic analysis
+    if 'country_code' in clients:
+        countries = clients['country_code'].value_counts().reset_index()
+        countries.columns = ['country_code', 'clients']
+        countries.insert(0, 'country', map_country_names(countries['country_code']))
+        chunks.append(("🌍 Geographic Analysis / Clients by Country", format_table(countries)))
+
+    # Demographics
+    if 'age' in clients:
+        ages = clients['age']
+        age_groups = pd.cut(ages, bins=AGE_BINS, labels=AGE_LABELS).value_counts(sort=False)
+        chunks.append(("📈 Demographic Insights / Age Statistics", "\n".join([
+            f"Average Age: {ages.mean():.1f} years",
+            f"Median Age: {ages.median():.1f} years",
+            f"Youngest Client: {ages.min()} years",
+            f"Oldest Client: {ages.max()} years",
+            format_table(age_groups.rename_axis('age_group').reset_index(name='clients')),
+        ])))
+
+    # Retention
+    retention = cube.retention_by_tier()
+    retention.columns = ['tier', 'retention_rate_percent']
+    total_memberships = memberships['membership_id'].nunique()
+    retention_rate = active_memberships / total_memberships * 100 if total_memberships else 0
+    chunks.append(("📊 Membership Retention Rate by Tier", "\n".join([
+        f"Overall Retention Rate: {retention_rate:.2f}%",
+        format_table(retention),
+    ])))
+
+    # Spending by tier
+    spending = cube.average_spending_by_tier(TIER_ORDER)
+    spending.columns = ['tier', 'average_transaction_amount']
+    chunks.append(("🏅 Average Spending by Membership Tier", format_table(spending)))
+
+    # Monthly series, one chunk per year so a question about one year gets one chunk
+    monthly = _monthly_series(cube)
+    if not monthly.empty:
+        for year, rows in monthly.groupby(monthly['month'].str[:4], sort=True):
+            chunks.append((
+                f"📅 Monthly Statistics {year} / Signups and Transaction Amount",
+                format_table(rows),
+            ))
+
+    return chunks
@@ -0,0 +1,234 @@
+import calendar
+import collections
+import json
+import math
+import re
+
+# Daily rows per chunk of a JSON array without a date column
+ROWS_PER_CHUNK = 31
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Chunks scoring below this share of the best chunk's score are left out
+MIN_RELATIVE_SCORE = 0.5
+
+# Words that say nothing about which section a question is about
+STOPWORDS = {
+    'a', 'about', 'an', 'and', 'are', 'by', 'can', 'do', 'does', 'for', 'from', 'had', 'has',
+    'have', 'how', 'i', 'in', 'is', 'it', 'me', 'much', 'of', 'on', 'or', 'per', 'show', 'tell',
+    'the', 'there', 'to', 'was', 'were', 'what', 'when', 'which', 'who', 'with', 'you',
+}
+
+# Question words and the section vocabulary they refer to
+SYNONYMS = {
+    'country': ['geographic'],
+    'nationality': ['geographic'],
+    'where': ['geographic'],
+    'member': ['membership'],
+    'old': ['age'],
+    'young': ['age', 'youngest'],
+    'spend': ['spending', 'amount'],
+    'spent': ['spending', 'amount'],
+    'revenue': ['amount', 'transaction'],
+    'sale': ['amount', 'transaction'],
+    'signup': ['signups'],
+    'churn': ['retention'],
+}
+
+MONTH_NAMES = {f"{number:02d}": name for number, name in enumerate(calendar.month_name) if name}
+
+
+def _stem(term):
+    """
+    Strips a plural 's' so 'clients' matches 'client' and 'countries' matches 'country'.
+    """
+    if len(term) > 4 and term.endswith('ies'):
+        return term[:-3] + 'y'
+    if len(term) > 3 and term.endswith('s') and not term.endswith('ss'):
+        return term[:-1]
+    return term
+
+
+def tokenize(text):
+    """
+    Splits text into lowercase search terms, without stopwords.
+
+    Parameters:
+        text (str): Question or chunk text
+
+    Returns:
+        list: Search terms in order
+    """
+    return [_stem(term) for term in re.findall(r"[a-z0-9]+", text.lower()) if term not in STOPWORDS]
+
+
+def question_terms(question):
+    """
+    Search terms of a question, with the section words its terms refer to added.
+
+    Parameters:
+        question (str): User question
+
+    Returns:
+        set: Search terms
+    """
+    terms = set(tokenize(question))
+    for term in list(terms):
+        terms.update(SYNONYMS.get(term, []))
+    return terms
+
+
+def _format_rows(records):
+    """
+    Renders JSON records as compact 'key: value' lines, without the index column.
+    """
+    lines = []
+    for record in records:
+        values = [f"{key}: {value}" for key, value in record.items() if key != 'index']
+        lines.append(", ".join(values))
+    return "\n".join(lines)
+
+
+def _split_records(heading, records):
+    """
+    Splits the records of a JSON array into chunks: by month when they have a date,
+    by year when they have a month, and in fixed-size runs otherwise. The period is
+    spelled out in the chunk heading so questions naming it find the chunk.
+    """
+    sample = records[0] if records else {}
+    if 'date' in sample:
+        period_of = lambda record: str(record['date'])[:7]
+    elif 'month_year' in sample:
+        period_of = lambda record: str(record['month_year'])[:4]
+    else:
+        period_of = None
+
+    if period_of is None:
+        return [
+            (heading, _format_rows(records[start:start + ROWS_PER_CHUNK]))
+            for start in range(0, len(records), ROWS_PER_CHUNK)
+        ]
+
+    groups = collections.defaultdict(list)
+    for record in records:
+        groups[period_of(record)].append(record)
+
+    chunks = []
+    for period, group in groups.items():
+        year, _, month = period.partition('-')
+        label = f"{MONTH_NAMES.get(month, month)} {year}" if month else year
+        chunks.append((f"{heading} ({label})", _format_rows(group)))
+    return chunks
+
+
+def chunk_graph_data(text):
+    """
+    Splits the graph data into sections at blank lines. A section's heading is its
+    lines without a value or number; a section without one continues the previous heading. JSON
+    arrays inside a section are split into smaller chunks that each repeat the heading.
+
+    Parameters:
+        text (str): Contents of training.txt
+
+    Returns:
+        list: (heading, body) tuples
+    """
+    chunks = []
+    heading = "Data"
+    for block in re.split(r"\n\s*\n", text):
+        lines = [line.strip() for line in block.strip().splitlines() if line.strip()]
+        heading_lines = [line for line in lines if not re.search(r"[:\d\[]", line)]
+        if heading_lines:
+            heading = " / ".join(heading_lines)
+
+        body_lines = []
+        for line in lines:
+            if line.startswith('['):
+                try:
+                    chunks.extend(_split_records(heading, json.loads(line)))
+                    continue
+                except json.JSONDecodeError:
+                    pass
+            if line not in heading_lines:
+                body_lines.append(line)
+
+        if body_lines:
+            chunks.append((heading, "\n".join(body_lines)))
+    return chunks
+
+
+class BM25Index:
+    """
+    BM25 ranking of text chunks, built once and queried per question.
+
+    Parameters:
+        chunks (list): (heading, body) tuples; headings are searched along with bodies
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.term_counts = [collections.Counter(tokenize(f"{heading}\n{body}")) for heading, body in chunks]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0
+
+        document_frequency = collections.Counter()
+        for counts in self.term_counts:
+            document_frequency.update(counts.keys())
+        n = len(chunks)
+        self.idf = {
+            term: math.log(1 + (n - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequency.items()
+        }
+
+    def scores(self, question):
+        """
+        BM25 score of every chunk for a question.
+
+        Parameters:
+            question (str): User question
+
+        Returns:
+            list: One score per chunk, 0 for chunks sharing no term with the question
+        """
+        terms = [term for term in question_terms(question) if term in self.idf]
+        scores = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            score = 0.0
+            for term in terms:
+                frequency = counts.get(term, 0)
+                if frequency:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / self.average_length)
+                    score += self.idf[term] * frequency * (BM25_K1 + 1) / (frequency + norm)
+            scores.append(score)
+        return scores
+
+    def search(self, question, top_k=4, max_chars=None):
+        """
+        The chunks most relevant to a question, best first.
+
+        Parameters:
+            question (str): User question
+            top_k (int): Most chunks to return
+            max_chars (int, optional): Stop adding chunks once their text exceeds this size
+
+        Returns:
+            list: (heading, body) tuples; empty if no chunk matches the question. Chunks
+                much weaker than the best match are left out.
+        """
+        scores = self.scores(question)
+        cutoff = max(scores, default=0) * MIN_RELATIVE_SCORE
+        ranked = sorted((i for i, score in enumerate(scores) if score > 0 and score >= cutoff),
+                        key=lambda i: -scores[i])
+
+        results = []
+        size = 0
+        for i in ranked[:top_k]:
+            heading, body = self.chunks[i]
+            chunk_size = len(heading) + len(body)
+            if max_chars is not None and results and size + chunk_size > max_chars:
+                break
+            results.append(self.chunks[i])
+            size += chunk_size
+        return results
@@ -1,68 +1,236 @@
-import os
-import streamlit as st
-import google.generativeai as gen_ai
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-if not GOOGLE_API_KEY:
-    st.error("Google API key not found. Set GOOGLE_API_KEY in environment variables.")
-    st.stop()
-
-# Configure Gemini
-gen_ai.configure(api_key=GOOGLE_API_KEY)
-model = gen_ai.GenerativeModel("gemini-1.5-flash")
-
-# Function to read graph data from training.txt
-def get_graph_data():
-    try:
-        with open("training.txt", "r", encoding="utf-8") as file:
-            return file.read()
-    except FileNotFoundError:
-        return "No training data found."
-
-def chatbot():
-    st.title("📊 Gemini Chatbot with Graph Data")
-
-    # Initialize session state variables
-    if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
-
-    if "graph_data" not in st.session_state:
-        st.session_state.graph_data = None  # Graph data will be stored here
-
-    # Read training data if not already stored
-    if st.session_state.graph_data is None:
-        st.session_state.graph_data = get_graph_data()
-
-    # Display chat history
-    for role, text in st.session_state.chat_history:
-        with st.chat_message(role):
-            st.markdown(text)
-
-    user_prompt = st.chat_input("Say 'hi' to start...")
-
-    if user_prompt:
-        st.chat_message("user").markdown(user_prompt)
-        st.session_state.chat_history.append(("user", user_prompt))
-
-        # Construct a prompt with graph data prepended
-        prompt = f"""
-        Here is important data extracted from various graphs:
-        {st.session_state.graph_data}
-
-        Based on this information, answer the following question:
-        {user_prompt}
-        """
-
-        # Send the prompt to Gemini
-        response = model.generate_content(prompt)
-
-        # Extract response text safely
-        ai_response = getattr(response, "text", "I couldn't process that.")
-
-        with st.chat_message("assistant"):
-            st.markdown(ai_response)
-        st.session_state.chat_history.append(("assistant", ai_response))
\ No newline at end of file
+import itertools
+import os
+import time
+import streamlit as st
+import pandas as pd
+from dotenv import load_dotenv
+from data_visualisation.chat_retrieval import BM25Index, chunk_graph_data
+from data_visualisation.dashboard_sections import dashboard_section
+from data_visualisation.llm_client import create_llm_client, stream_in_background
+from data_visualisation.query_engine import format_result, parse_tool_call, tool_instructions
+from data_visualisation.stub_models import StubToolModel
+from data_visualisation.response_cache import ResponseCache, data_version
+
+# Load environment variables
+load_dotenv()
+
+# Static graph data the chatbot falls back to when the dashboard data cannot be loaded
+TRAINING_DATA_PATH = os.getenv("TRAINING_DATA_PATH", "training.txt")
+
+# Most sections of graph data sent with a question, and their total size in characters
+CONTEXT_CHUNKS = 4
+CONTEXT_MAX_CHARS = 4000
+
+# Seconds to wait for the next piece of a streamed answer
+RESPONSE_TIMEOUT = 60
+
+# Set CHATBOT_TOOLS=0 to always answer from the data summaries instead of computing
+# answers with the query engine
+TOOLS_ENABLED = os.getenv("CHATBOT_TOOLS", "1") == "1"
+
+# Function to read graph data from training.txt
+def get_graph_data():
+    try:
+        with open(TRAINING_DATA_PATH, "r", encoding="utf-8") as file:
+            return file.read()
+    except FileNotFoundError:
+        return "No training data found."
+
+@st.cache_resource(show_spinner=False)
+def get_retriever():
+    """
+    Chunks the static graph data by section and indexes the chunks, once per process.
+
+    Returns:
+        BM25Index: Index over the graph data chunks
+    """
+    return BM25Index(chunk_graph_data(get_graph_data()))
+
+@st.cache_resource(show_spinner=False)
+def get_llm_client():
+    """
+    Creates the LLM client selected by CHATBOT_MODEL, once per process.
+
+    Returns:
+        GeminiClient | StubClient: Client with a generate(prompt) method
+    """
+    return create_llm_client()
+
+@st.cache_resource(show_spinner=False)
+def get_response_cache():
+    """
+    Creates the cache of chatbot answers shared by every session, once per process.
+
+    Returns:
+        ResponseCache: Answers by question and data version
+    """
+    return ResponseCache()
+
+def build_prompt(question, chunks, tools=None):
+    """
+    Builds the prompt from the question and the graph data chunks relevant to it.
+
+    Parameters:
+        question (str): User question
+        chunks (list): (heading, body) tuples from the retriever
+        tools (str, optional): Tool descriptions from query_engine.tool_instructions,
+            letting the model reply with a tool call instead of an answer
+
+    Returns:
+        str: Prompt for the LLM
+    """
+    tools = tools or ""
+    if not chunks:
+        return f"""
+No dashboard data matches this question. Answer it briefly, and say so if it
+needs data from the dashboard.
+{tools}
+Question: {question}
+"""
+
+    context = "\n\n".join(f"## {heading}\n{body}" for heading, body in chunks)
+    return f"""
+Here is important data extracted from various graphs:
+{context}
+
+Based on this information, answer the following question.
+{tools}
+Question: {question}
+"""
+
+def peek_tool_call(pieces):
+    """
+    Reads a response stream up to its first text, to tell a tool call from an answer
+    without waiting for the rest of it.
+
+    Parameters:
+        pieces (iterable): Response stream
+
+    Returns:
+        tuple: (is_call, pieces), where is_call is True if the response starts like a
+            JSON tool call and pieces yields the whole response, read pieces included
+    """
+    pieces = iter(pieces)
+    read = []
+    for piece in pieces:
+        read.append(piece)
+        text = "".join(read).lstrip()
+        if text:
+            return text.startswith(("{", "```")), itertools.chain(read, pieces)
+    return False, iter(read)
+
+def answer_tool_call(query_engine, text):
+    """
+    Runs the tool call of a model response locally.
+
+    Parameters:
+        query_engine (QueryEngine): Runs tool calls against the dashboard data
+        text (str): Model response holding a JSON tool call
+
+    Returns:
+        str: Markdown answer, or None if the call is invalid
+    """
+    call = parse_tool_call(text)
+    if call is None:
+        return None
+    try:
+        result = query_engine.execute(call)
+    except ValueError as e:
+        print(f"Warning: Could not run tool call {call}: {str(e)}")
+        return None
+    return format_result(call, result)
+
+@dashboard_section("Chatbot")
+def chatbot(retriever=None, query_engine=None):
+    """
+    Displays the chatbot page.
+
+    Questions a tool of the query engine can answer are computed from the data;
+    the others are answered by the model from the data summaries.
+
+    Parameters:
+        retriever (BM25Index, optional): Index over summaries of the live dashboard
+            data; the static graph data in training.txt is used without one
+        query_engine (QueryEngine, optional): Runs the model's tool calls against the
+            dashboard data
+    """
+    st.title("📊 Gemini Chatbot with Graph Data")
+
+    try:
+        model = get_llm_client()
+    except ValueError as e:
+        st.error(str(e))
+        return
+    if retriever is None:
+        retriever = get_retriever()
+
+    # Initialize session state variables
+    if "chat_history" not in st.session_state:
+        st.session_state.chat_history = []
+
+    # Display chat history
+    for role, text in st.session_state.chat_history:
+        with st.chat_message(role):
+            st.markdown(text)
+
+    user_prompt = st.chat_input("Say 'hi' to start...")
+
+    if user_prompt:
+        st.chat_message("user").markdown(user_prompt)
+        st.session_state.chat_history.append(("user", user_prompt))
+
+        # The same question about the same data on the same day is answered from the
+        # cache; the day is part of the key because questions may use relative dates
+        today = pd.Timestamp.now().normalize()
+        cache = get_response_cache()
+        cache_key = ResponseCache.key(
+            user_prompt, f"{data_version(retriever.chunks)}:{today.date()}", model.name
+        )
+        ai_response = cache.get(cache_key)
+
+        with st.chat_message("assistant"):
+            if ai_response is not None:
+                st.markdown(ai_response)
+                st.caption("Cached answer")
+            else:
+                # Construct a prompt with only the graph data relevant to the question,
+                # and the tools that compute answers from the data when one fits
+                chunks = retriever.search(user_prompt, top_k=CONTEXT_CHUNKS, max_chars=CONTEXT_MAX_CHARS)
+                tools = TOOLS_ENABLED and query_engine is not None
+                if tools and model.name == "stub":
+                    model = StubToolModel()
+                prompt = build_prompt(user_prompt, chunks, tool_instructions(today) if tools else None)
+
+                # Stream the answer as the model writes it, read on a worker thread; a
+                # reply starting with a tool call is run instead of shown
+                start = time.perf_counter()
+                try:
+                    is_call, pieces = peek_tool_call(
+                        stream_in_background(model.stream(prompt), timeout=RESPONSE_TIMEOUT)
+                    )
+                    if tools and is_call:
+                        with st.spinner("Computing..."):
+                            ai_response = answer_tool_call(query_engine, "".join(pieces))
+                        if ai_response is not None:
+                            st.markdown(ai_response)
+                    else:
+                        tools = False
+                        ai_response = st.write_stream(pieces)
+                except TimeoutError as e:
+                    st.error(str(e))
+                    return
+                except Exception as e:
+                    st.error(f"The model could not answer: {str(e)}")
+                    return
+                elapsed = time.perf_counter() - start
+
+                if not ai_response:
+                    ai_response = "I couldn't process that."
+                    st.markdown(ai_response)
+                else:
+                    cache.set(cache_key, ai_response)
+                if tools:
+                    st.caption(f"Computed from the data, {elapsed:.2f}s")
+                else:
+                    st.caption(f"{len(chunks)} data sections, {len(prompt):,} prompt characters, {elapsed:.2f}s")
+        st.session_state.chat_history.append(("assistant", ai_response))
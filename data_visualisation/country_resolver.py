@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+from functools import lru_cache
+
+import pandas as pd
+import pycountry
+import country_converter as coco
+
+# Unseen strings resolved by fuzzy search are remembered up to this many entries
+FUZZY_CACHE_SIZE = 1024
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def get_country_table_path():
+    """
+    Returns where the precomputed country table is stored, configurable with COUNTRY_TABLE_PATH.
+    """
+    return os.getenv("COUNTRY_TABLE_PATH", os.path.join(".cache", "country_table.json"))
+
+
+def build_country_table():
+    """
+    Precomputes the lookups that would otherwise run per row.
+
+    `alpha3` maps every exact key pycountry's lookup accepts (codes, names, official and
+    common names, all casefolded) to the ISO Alpha-3 code. `names` maps Alpha-2 codes to
+    pycountry's name and Alpha-3 codes to country_converter's short name, matching what
+    get_country_name returned for each kind of code.
+
+    Returns:
+        dict: The country table
+    """
+    alpha3, names = {}, {}
+    countries = list(pycountry.countries)
+
+    for country in countries:
+        for attribute in ('alpha_2', 'alpha_3', 'numeric', 'name', 'official_name', 'common_name'):
+            value = getattr(country, attribute, None)
+            if value:
+                alpha3.setdefault(value.casefold(), country.alpha_3)
+        names[country.alpha_2] = country.name
+
+    # One bulk conversion instead of one country_converter call per code
+    codes = [country.alpha_3 for country in countries]
+    short_names = coco.convert(names=codes, to='name_short', not_found=None)
+    for code, name in zip(codes, short_names):
+        names[code] = name if name else 'Unknown'
+
+    return {'pycountry_version': pycountry_version(), 'alpha3': alpha3, 'names': names}
+
+
+def pycountry_version():
+    """
+    Returns the installed pycountry version, used to invalidate the stored table.
+    """
+    try:
+        from importlib.metadata import version
+        return version('pycountry')
+    except Exception:
+        return 'unknown'
+
+
+def get_country_table():
+    """
+    Loads the country table from disk, building and storing it on first use.
+
+    Returns:
+        dict: The country table
+    """
+    global _table
+    if _table is not None:
+        return _table
+
+    with _table_lock:
+        if _table is not None:
+            return _table
+
+        path = get_country_table_path()
+        table = None
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                table = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+        if table is None or table.get('pycountry_version') != pycountry_version():
+            table = build_country_table()
+            try:
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as file:
+                    json.dump(table, file)
+            except OSError as e:
+                print(f"Warning: Could not store the country table at {path}: {str(e)}")
+
+        _table = table
+        return _table
+
+
+@lru_cache(maxsize=FUZZY_CACHE_SIZE)
+def _fuzzy_alpha3(country_name):
+    try:
+        country = pycountry.countries.search_fuzzy(country_name)
+        return country[0].alpha_3 if country else None
+    except (LookupError, AttributeError):
+        return None
+
+
+@lru_cache(maxsize=FUZZY_CACHE_SIZE)
+def _converted_name(country_code):
+    country_name = coco.convert(names=country_code, to='name_short')
+    return country_name if country_name != "not found" else 'Unknown'
+
+
+def alpha3_for(country_name):
+    """
+    Resolves a country name to its ISO Alpha-3 code.
+
+    Exact names and codes come from the precomputed table; anything else goes through
+    pycountry's fuzzy search once and is kept in a bounded LRU cache.
+
+    Parameters:
+        country_name (str): Name of the country
+
+    Returns:
+        str: ISO Alpha-3 code or None if not found
+    """
+    if not isinstance(country_name, str):
+        return None
+
+    code = get_country_table()['alpha3'].get(country_name.casefold())
+    if code is not None:
+        return code
+    return _fuzzy_alpha3(country_name)
+
+
+def country_name_for(country_code):
+    """
+    Resolves an Alpha-2 or Alpha-3 country code to a display name.
+
+    Parameters:
+        country_code (str): The country code
+
+    Returns:
+        str: The full country name, or 'Unknown' if not found
+    """
+    if not isinstance(country_code, str):
+        return 'Unknown'
+
+    name = get_country_table()['names'].get(country_code.upper())
+    if name is not None:
+        return name
+    return _converted_name(country_code)
+
+
+def _map_uniques(series, resolve):
+    """
+    Applies a resolver once per distinct value of a series.
+
+    Parameters:
+        series (pd.Series): Values to resolve
+        resolve (callable): Resolver for a single value
+
+    Returns:
+        pd.Series: Resolved values aligned with the input
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        uniques = series.cat.categories
+    else:
+        uniques = pd.unique(series.dropna())
+
+    mapping = {value: resolve(value) for value in uniques}
+    return series.map(mapping)
+
+
+def map_alpha3(nationalities):
+    """
+    Resolves a column of country names to ISO Alpha-3 codes.
+
+    Parameters:
+        nationalities (pd.Series): Country names
+
+    Returns:
+        pd.Series: ISO Alpha-3 codes, missing where the name could not be resolved
+    """
+    return _map_uniques(nationalities, alpha3_for)
+
+
+def map_country_names(country_codes):
+    """
+    Resolves a column of country codes to display names.
+
+    Parameters:
+        country_codes (pd.Series): Alpha-2 or Alpha-3 country codes
+
+    Returns:
+        pd.Series: Country names
+    """
+    return _map_uniques(country_codes, country_name_for)
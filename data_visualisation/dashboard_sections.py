@@ -0,0 +1,125 @@
+import functools
+import os
+import time
+
+import streamlit as st
+
+from data_visualisation.profiling import count_rows, profile_block, record_plotly_payload
+
+# Widget-driven sections rerun on their own; set DASHBOARD_FRAGMENTS=0 to rerun whole
+# pages instead, e.g. to compare section timings with and without fragments
+FRAGMENTS_ENABLED = os.getenv("DASHBOARD_FRAGMENTS", "1") != "0"
+
+# Set SECTION_TIMINGS=1 to show how long each section took to run
+SHOW_SECTION_TIMINGS = os.getenv("SECTION_TIMINGS", "0") == "1"
+
+# Figures kept per builder, one per distinct set of inputs
+FIGURE_CACHE_ENTRIES = 32
+
+
+def begin_rerun():
+    """
+    Marks the start of a full script run. Sections run until end_rerun are timed as
+    part of it; sections run afterwards are fragment reruns.
+    """
+    st.session_state['full_rerun'] = True
+    st.session_state['section_timings'] = {}
+
+
+def end_rerun():
+    """
+    Marks the end of a full script run and, if enabled, lists its section timings in
+    the sidebar.
+    """
+    st.session_state['full_rerun'] = False
+
+    timings = st.session_state.get('section_timings', {})
+    if SHOW_SECTION_TIMINGS and timings:
+        with st.sidebar:
+            st.caption("Section timings (last full rerun)")
+            st.dataframe(
+                [{'Section': name, 'Time (ms)': round(entry['seconds'] * 1000, 1)}
+                 for name, entry in timings.items()],
+                hide_index=True,
+                use_container_width=True
+            )
+
+
+def record_section_time(name, seconds, rerun):
+    """
+    Stores the time a section took in the current session.
+
+    Parameters:
+        name (str): Section name
+        seconds (float): Wall time
+        rerun (str): 'full' or 'fragment'
+    """
+    timings = st.session_state.setdefault('section_timings', {})
+    timings[name] = {'seconds': seconds, 'rerun': rerun}
+
+
+def dashboard_section(name, fragment=False):
+    """
+    Decorates a display function as a timed dashboard section. The section's time
+    is stored in the session and, when profiling is on, in its profile record.
+
+    Parameters:
+        name (str): Section name used in the timings
+        fragment (bool): Run the section as a Streamlit fragment, so interacting with
+            its widgets reruns only this section
+
+    Returns:
+        callable: Decorator
+    """
+    def decorator(display):
+        @functools.wraps(display)
+        def timed(*args, **kwargs):
+            rerun = 'full' if st.session_state.get('full_rerun', True) else 'fragment'
+            with profile_block(name, 'section') as record:
+                if record is not None:
+                    record['rows_in'] = count_rows(args) + count_rows(kwargs)
+                start = time.perf_counter()
+                try:
+                    return display(*args, **kwargs)
+                finally:
+                    seconds = time.perf_counter() - start
+                    record_section_time(name, seconds, rerun)
+                    if record is not None:
+                        record['seconds'] = seconds
+                    if SHOW_SECTION_TIMINGS:
+                        st.caption(f"⏱ {name}: {seconds * 1000:.1f} ms ({rerun} rerun)")
+
+        if fragment and FRAGMENTS_ENABLED:
+            return st.fragment(timed)
+        return timed
+    return decorator
+
+
+def cached_figure(build):
+    """
+    Caches a figure builder by the value of its inputs, so a rerun with unchanged
+    inputs reuses the figure instead of building it again.
+
+    Every caller gets the same figure object rather than an unpickled copy, so
+    figures must be passed to plotly_chart as they are, not modified.
+
+    Parameters:
+        build (callable): Returns a Plotly figure from small, hashable inputs
+
+    Returns:
+        callable: Cached builder
+    """
+    return st.cache_resource(ttl=3600, max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)(build)
+
+
+def plotly_chart(fig, **kwargs):
+    """
+    Sends a figure to the browser with st.plotly_chart, recording its payload size
+    when profiling is on.
+
+    Parameters:
+        fig (go.Figure): Figure to display
+        **kwargs: Passed on to st.plotly_chart
+    """
+    record_plotly_payload(fig)
+    st.plotly_chart(fig, **kwargs)
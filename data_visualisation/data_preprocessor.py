@@ -1,93 +1,292 @@
 import pandas as pd
 import numpy as np
-import pycountry
 from datetime import datetime
+from data_visualisation.country_resolver import alpha3_for, map_alpha3
+from data_visualisation.profiling import profiled
 
-def preprocess_data(raw_clients, raw_memberships, raw_transactions):
+# Declarative dtype plan applied to each raw frame by preprocess_data:
+#   'id'       -> client ids stripped to their digits, downcast to int32 when they fit
+#   'datetime' -> datetime64, invalid dates coerced to NaT
+#   'category' -> categorical, for low-cardinality labels
+#   'float64'  -> kept in double precision; amounts are summed, so float32 is not safe
+DTYPE_PLAN = {
+    'clients': {
+        'client_id': 'id',
+        'date_joined': 'datetime',
+        'birthdate': 'datetime',
+        'nationality': 'category',
+    },
+    'memberships': {
+        'client_id': 'id',
+        'start_date': 'datetime',
+        'end_date': 'datetime',
+        'tier': 'category',
+        'status': 'category',
+    },
+    'transactions': {
+        'client_id': 'id',
+        'date': 'datetime',
+        'amount': 'float64',
+    },
+}
+
+
+def clean_client_id(series):
     """
-    Preprocesses raw client, membership, and transaction data.
-    
+    Normalises client ids to integers by keeping only their digits.
+
+    Integer columns skip the regex pass entirely. Other columns are cleaned once per
+    distinct id and mapped back, since transactions repeat the same few client ids.
+    Ids are downcast to int32 when every value fits, which is the case for all real
+    client ids.
+
+    Parameters:
+        series (pd.Series): Raw client ids
+
+    Returns:
+        pd.Series: Integer client ids, 0 for ids without digits
+    """
+    if pd.api.types.is_integer_dtype(series.dtype) and not series.isna().any():
+        # Fast path: already numeric, nothing to strip
+        ids = series.astype('int64')
+    else:
+        codes, uniques = pd.factorize(series)
+        cleaned = (
+            pd.Series(uniques)
+            .astype(str)
+            .str.replace('[^0-9]', '', regex=True)  # Remove non-numeric characters
+            .replace('', '0')  # Replace empty strings with '0'
+            .astype('int64')  # Convert to integer
+            .to_numpy()
+        )
+        # Missing ids get code -1 and become 0, as 'nan' has no digits
+        ids = pd.Series(
+            np.where(codes >= 0, cleaned[codes] if len(cleaned) else 0, 0),
+            index=series.index,
+            name=series.name
+        )
+
+    int32 = np.iinfo(np.int32)
+    if ids.empty or (ids.min() >= int32.min and ids.max() <= int32.max):
+        ids = ids.astype('int32')
+    return ids
+
+
+def coerce_column(series, kind):
+    """
+    Converts one column according to its DTYPE_PLAN entry.
+
+    Parameters:
+        series (pd.Series): Raw column
+        kind (str): 'id', 'datetime', 'category' or a NumPy dtype name
+
+    Returns:
+        pd.Series: Converted column
+    """
+    if kind == 'id':
+        return clean_client_id(series)
+    if kind == 'datetime':
+        # Fast path: NumPy datetimes need no parsing
+        if pd.api.types.is_datetime64_dtype(series.dtype):
+            return series
+        return pd.to_datetime(series, errors='coerce')  # Coerce invalid dates to NaT
+    if kind == 'category':
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series
+        return series.astype('category')
+    return pd.to_numeric(series, errors='coerce').astype(kind)
+
+
+def apply_dtype_plan(df, plan):
+    """
+    Converts the columns of a frame in place following a dtype plan.
+
+    Parameters:
+        df (pd.DataFrame): Frame to convert
+        plan (dict): Column name to kind, as in DTYPE_PLAN
+
+    Returns:
+        pd.DataFrame: The same frame
+    """
+    for col, kind in plan.items():
+        if col in df.columns:
+            df[col] = coerce_column(df[col], kind)
+    return df
+
+
+def _prepare_frame(raw_df, plan):
+    """
+    Copies a raw frame, stringifies ObjectIds and applies its dtype plan.
+    """
+    # Create a copy of the input DataFrame to avoid modifying the original
+    df = raw_df.copy()
+
+    # Convert MongoDB ObjectIds to strings (if present)
+    if '_id' in df.columns:
+        df['_id'] = df['_id'].astype(str)
+
+    return apply_dtype_plan(df, plan)
+
+
+def _warn_duplicate_clients(df, label):
+    """
+    Prints a warning if a frame holds the same client_id more than once.
+    """
+    if 'client_id' in df.columns:
+        duplicates = df.duplicated('client_id', keep=False)
+        if duplicates.any():
+            print(f"Warning: Found {duplicates.sum()} duplicate client_ids in {label} data")
+
+
+def prepare_clients(raw_clients):
+    """
+    Converts raw clients to their planned dtypes, without the derived columns.
+
     Parameters:
         raw_clients (pd.DataFrame): Raw clients data
+
+    Returns:
+        pd.DataFrame: Clients with clean ids and dates
+    """
+    clients = _prepare_frame(raw_clients, DTYPE_PLAN['clients'])
+    _warn_duplicate_clients(clients, 'clients')
+    return clients
+
+
+def prepare_memberships(raw_memberships):
+    """
+    Converts raw memberships to their planned dtypes.
+
+    Parameters:
         raw_memberships (pd.DataFrame): Raw memberships data
+
+    Returns:
+        pd.DataFrame: Processed memberships
+    """
+    memberships = _prepare_frame(raw_memberships, DTYPE_PLAN['memberships'])
+    _warn_duplicate_clients(memberships, 'memberships')
+    return memberships
+
+
+def prepare_transactions(raw_transactions):
+    """
+    Converts raw transactions to their planned dtypes and drops invalid amounts.
+
+    Parameters:
         raw_transactions (pd.DataFrame): Raw transactions data
-    
+
     Returns:
-        tuple: Processed clients, memberships, transactions, and merged data
+        pd.DataFrame: Processed transactions
     """
-    # Create copies of the input DataFrames to avoid modifying originals
-    clients = raw_clients.copy()
-    memberships = raw_memberships.copy()
-    transactions = raw_transactions.copy()
+    transactions = _prepare_frame(raw_transactions, DTYPE_PLAN['transactions'])
 
-    # Convert MongoDB ObjectIds to strings (if present)
-    for df in [clients, memberships, transactions]:
-        if '_id' in df.columns:
-            df['_id'] = df['_id'].astype(str)
-
-    # Define date columns for each DataFrame
-    date_columns = {
-        'clients': ['date_joined', 'birthdate'],
-        'memberships': ['start_date', 'end_date'],
-        'transactions': ['date']
-    }
-
-    # Convert date columns with error handling
-    for df_name, cols in date_columns.items():
-        df = locals()[df_name]  # Get the DataFrame by name
-        for col in cols:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors='coerce')  # Coerce invalid dates to NaT
-
-    # Clean and standardize client_id across all datasets
-    for df in [clients, memberships, transactions]:
-        if 'client_id' in df.columns:
-            df['client_id'] = (
-                df['client_id']
-                .astype(str)
-                .str.replace('[^0-9]', '', regex=True)  # Remove non-numeric characters
-                .replace('', '0')  # Replace empty strings with '0'
-                .astype(int)  # Convert to integer
-            )
-
-    # Check for duplicate client_ids in clients and memberships
-    if 'client_id' in clients.columns:
-        duplicate_clients = clients.duplicated('client_id', keep=False)
-        if duplicate_clients.any():
-            print(f"Warning: Found {duplicate_clients.sum()} duplicate client_ids in clients data")
-
-    if 'client_id' in memberships.columns:
-        duplicate_memberships = memberships.duplicated('client_id', keep=False)
-        if duplicate_memberships.any():
-            print(f"Warning: Found {duplicate_memberships.sum()} duplicate client_ids in memberships data")
-
-    # Merge clients and memberships data
+    # Filter out invalid transactions
+    if 'amount' in transactions.columns:
+        transactions = transactions[transactions['amount'] > 0]
+    return transactions
+
+
+def merge_clients_memberships(clients, memberships):
+    """
+    Joins clients with their membership.
+
+    Parameters:
+        clients (pd.DataFrame): Clients from prepare_clients
+        memberships (pd.DataFrame): Processed memberships
+
+    Returns:
+        pd.DataFrame: One row per client with a membership, empty if client_id is missing
+    """
     if 'client_id' in clients.columns and 'client_id' in memberships.columns:
-        merged_data = pd.merge(
+        return pd.merge(
             clients,
             memberships,
             on='client_id',
             how='inner',  # Use inner join to keep only matching records
             validate='many_to_one'  # Allow many clients to one membership
         )
-    else:
-        merged_data = pd.DataFrame()
-        print("Warning: client_id missing in clients or memberships - merge skipped")
 
-    # Add ISO Alpha-3 country codes based on nationality
-    if 'nationality' in clients.columns:
-        clients['country_code'] = clients['nationality'].apply(get_iso_alpha3)
+    print("Warning: client_id missing in clients or memberships - merge skipped")
+    return pd.DataFrame()
 
-    # Calculate client ages safely
-    if 'birthdate' in clients.columns:
-        clients['age'] = (
-            (pd.Timestamp.now() - clients['birthdate']).dt.days // 365.25  # Calculate age in years
-        ).clip(0, 120)  # Clip ages to a reasonable range
-        clients['age'] = clients['age'].fillna(0).astype(int)  # Fill NaNs and convert to integers
 
-    # Filter out invalid transactions
-    if 'amount' in transactions.columns:
-        transactions = transactions[transactions['amount'] > 0]
+def client_country_codes(clients):
+    """
+    ISO Alpha-3 country codes based on nationality.
+
+    Parameters:
+        clients (pd.DataFrame): Clients from prepare_clients
+
+    Returns:
+        pd.Series: Country code per client, or None if there is no nationality column
+    """
+    if 'nationality' not in clients.columns:
+        return None
+    return map_alpha3(clients['nationality'])
+
+
+def client_ages(clients):
+    """
+    Client ages in whole years, clipped to 0-120 with missing birthdates as 0.
+
+    Parameters:
+        clients (pd.DataFrame): Clients from prepare_clients
+
+    Returns:
+        pd.Series: Age per client, or None if there is no birthdate column
+    """
+    if 'birthdate' not in clients.columns:
+        return None
+
+    ages = (
+        (pd.Timestamp.now() - clients['birthdate']).dt.days // 365.25  # Calculate age in years
+    ).clip(0, 120)  # Clip ages to a reasonable range
+    return ages.fillna(0).astype('int32')  # Fill NaNs and convert to integers
+
+
+def enrich_clients(clients, country_codes, ages):
+    """
+    Adds the derived columns to the clients frame.
+
+    Parameters:
+        clients (pd.DataFrame): Clients from prepare_clients; not modified
+        country_codes (pd.Series): From client_country_codes, or None
+        ages (pd.Series): From client_ages, or None
+
+    Returns:
+        pd.DataFrame: Clients with `country_code` and `age` where available
+    """
+    clients = clients.copy()
+    if country_codes is not None:
+        clients['country_code'] = country_codes
+    if ages is not None:
+        clients['age'] = ages
+    return clients
+
+
+@profiled('preprocess_data', 'preprocess')
+def preprocess_data(raw_clients, raw_memberships, raw_transactions):
+    """
+    Preprocesses raw client, membership, and transaction data.
+    
+    Parameters:
+        raw_clients (pd.DataFrame): Raw clients data
+        raw_memberships (pd.DataFrame): Raw memberships data
+        raw_transactions (pd.DataFrame): Raw transactions data
+    
+    Returns:
+        tuple: Processed clients, memberships, transactions, and merged data
+    """
+    # Convert dates, clean client_id and set compact dtypes following the plan
+    clients = prepare_clients(raw_clients)
+    memberships = prepare_memberships(raw_memberships)
+    transactions = prepare_transactions(raw_transactions)
+
+    # Merge clients and memberships data, before the derived client columns are added
+    merged_data = merge_clients_memberships(clients, memberships)
+
+    # Add country codes and ages
+    clients = enrich_clients(clients, client_country_codes(clients), client_ages(clients))
 
     return clients, memberships, transactions, merged_data
 
@@ -102,8 +301,4 @@ def get_iso_alpha3(country_name):
     Returns:
         str: ISO Alpha-3 code or None if not found
     """
-    try:
-        country = pycountry.countries.search_fuzzy(country_name)
-        return country[0].alpha_3 if country else None
-    except (LookupError, AttributeError):
-        return None
\ No newline at end of file
+    return alpha3_for(country_name)
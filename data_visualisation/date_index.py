@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+
+def day_end(date):
+    """
+    Last instant of a day, so a range ending on `date` includes all of it.
+
+    Parameters:
+        date: Day, as a date or a timestamp at midnight
+
+    Returns:
+        pd.Timestamp: One nanosecond before the next day starts
+    """
+    return pd.Timestamp(date).normalize() + pd.Timedelta(days=1) - pd.Timedelta(1, unit='ns')
+
+
+class DateIndex:
+    """
+    Rows of a frame ordered by a date column, selected by binary search.
+
+    Built once per data refresh. Date-range selections become two `searchsorted`
+    lookups and a take of the matching rows instead of a boolean mask over every
+    row, and the optional prefix sums give range totals without a groupby. Only the
+    sorted dates, the row positions in date order and the prefix sums are stored;
+    the frame itself is referenced, not copied.
+
+    Parameters:
+        frame (pd.DataFrame): Frame to index
+        column (str): Datetime column to sort by
+        value_column (str, optional): Numeric column to keep prefix sums of
+    """
+
+    def __init__(self, frame, column, value_column=None):
+        self.frame = frame
+        self.column = column
+
+        # Rows with missing dates are never part of a range, so they are left out
+        dates = frame[column].to_numpy(dtype='datetime64[ns]')
+        positions = np.flatnonzero(~np.isnat(dates))
+        positions = positions.astype(np.int32 if len(frame) < 2 ** 31 else np.int64)
+        self.order = positions[np.argsort(dates[positions], kind='stable')]
+        self.dates = dates[self.order]
+
+        self.prefix = None
+        if value_column is not None:
+            values = frame[value_column].to_numpy(dtype='float64')[self.order]
+            self.prefix = np.concatenate([[0.0], np.cumsum(np.nan_to_num(values))])
+
+    def bounds(self, start, end):
+        """
+        Finds the positions of the rows dated between `start` and `end`, both inclusive.
+
+        Parameters:
+            start (pd.Timestamp): First date in the range
+            end (pd.Timestamp): Last date in the range
+
+        Returns:
+            tuple: Start and stop positions in the date order
+        """
+        lo = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start), 'ns'), side='left')
+        hi = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end), 'ns'), side='right')
+        return lo, max(lo, hi)
+
+    def slice(self, start, end):
+        """
+        Returns the rows dated between `start` and `end`, both inclusive.
+
+        Parameters:
+            start (pd.Timestamp): First date in the range
+            end (pd.Timestamp): Last date in the range
+
+        Returns:
+            pd.DataFrame: The rows, in date order
+        """
+        lo, hi = self.bounds(start, end)
+        return self.frame.iloc[self.order[lo:hi]]
+
+    def count(self, start, end):
+        """
+        Counts the rows dated between `start` and `end`, both inclusive.
+        """
+        lo, hi = self.bounds(start, end)
+        return hi - lo
+
+    def total(self, start, end):
+        """
+        Sums the value column over the rows dated between `start` and `end`.
+
+        Returns:
+            float: Range total read from the prefix sums
+        """
+        if self.prefix is None:
+            raise ValueError("DateIndex was built without a value column")
+        lo, hi = self.bounds(start, end)
+        return self.prefix[hi] - self.prefix[lo]
+
+    def month_count(self, year, month):
+        """
+        Counts the rows dated within a calendar month.
+
+        Parameters:
+            year (int): Year
+            month (int): Month, 1-12
+
+        Returns:
+            int: Number of rows in that month
+        """
+        start = pd.Timestamp(year=year, month=month, day=1)
+        end = start + pd.offsets.MonthBegin(1) - pd.Timedelta(1, unit='ns')
+        return self.count(start, end)
+
+
+def build_date_indexes(clients, memberships, transactions, merged_data):
+    """
+    Builds the date indexes used by the date-filtered sections.
+
+    Parameters:
+        clients (pd.DataFrame): Processed clients data
+        memberships (pd.DataFrame): Processed memberships data
+        transactions (pd.DataFrame): Processed transactions data
+        merged_data (pd.DataFrame): Merged clients and memberships data
+
+    Returns:
+        dict: DateIndex per frame name
+    """
+    indexes = {
+        'clients': DateIndex(clients, 'date_joined'),
+        'memberships': DateIndex(memberships, 'start_date'),
+        'transactions': DateIndex(transactions, 'date', value_column='amount'),
+    }
+    if 'start_date' in merged_data.columns:
+        indexes['merged_data'] = DateIndex(merged_data, 'start_date')
+    return indexes
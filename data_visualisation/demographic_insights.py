@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from data_visualisation.aggregate_cube import AGE_BINS, AGE_LABELS
+from data_visualisation.dashboard_sections import dashboard_section, plotly_chart
 
+@dashboard_section("Demographic Insights")
 def display_demographic_insights(clients):
     """
     Displays the Demographic Insights section of the dashboard.
@@ -20,32 +23,26 @@ def display_demographic_insights(clients):
     with col1:
         # Define age groups
         age_groups = pd.cut(clients['age'], 
-                          bins=[0, 18, 25, 35, 45, 55, 65, 100],
-                          labels=['0-18', '19-25', '26-35', '36-45', '46-55', '56-65', '65+'])
+                          bins=AGE_BINS,
+                          labels=AGE_LABELS)
 
         # Ensure age groups are sorted
-        age_groups = pd.Categorical(age_groups, categories=[
-            '0-18', '19-25', '26-35', '36-45', '46-55', '56-65', '65+'
-        ], ordered=True)
+        age_groups = pd.Categorical(age_groups, categories=AGE_LABELS, ordered=True)
 
         # Create histogram
         fig = px.histogram(x=age_groups, 
                           title="Age Group Distribution",
                           color_discrete_sequence=['#BED739'],  # Use #BED739 as the main color
-                          category_orders={'x': [
-                              '0-18', '19-25', '26-35', '36-45', '46-55', '56-65', '65+'
-                          ]})
+                          category_orders={'x': AGE_LABELS})
 
         # Update layout
         fig.update_layout(
             xaxis_title="Age Group",
             yaxis_title="Count",
-            xaxis={'categoryorder': 'array', 'categoryarray': [
-                '0-18', '19-25', '26-35', '36-45', '46-55', '56-65', '65+'
-            ]}
+            xaxis={'categoryorder': 'array', 'categoryarray': AGE_LABELS}
         )
 
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
 
     # Age Statistics
     with col2:
@@ -0,0 +1,61 @@
+import os
+
+import streamlit as st
+import pandas as pd
+from data_visualisation.profiling import (
+    PROFILE_LOG_PATH,
+    profile_history,
+    profile_summary,
+    profiling_enabled,
+    set_profiling,
+)
+
+def load_profile_log(path=PROFILE_LOG_PATH):
+    """
+    Reads the profile records written to the JSON lines log by every run so far.
+
+    Parameters:
+        path (str): JSON lines log
+
+    Returns:
+        pd.DataFrame: One row per profiled call, empty if there is no log yet
+    """
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return pd.read_json(path, lines=True)
+
+def display_diagnostics():
+    """
+    Displays the hidden Diagnostics page: profile summaries of this process and of
+    the JSON lines log.
+    """
+    st.header("Diagnostics")
+
+    # Profiling can be paused without restarting the server
+    enabled = st.toggle(
+        "Profiling",
+        value=profiling_enabled(),
+        help="Turning profiling off stops recording calls and tracing memory"
+    )
+    if enabled != profiling_enabled():
+        set_profiling(enabled)
+
+    # Profiled calls of this process
+    st.subheader("⏱ This Process")
+    records = profile_history()
+    if records.empty:
+        st.info("No profiled calls yet. Open the other pages to collect timings.")
+    else:
+        st.dataframe(profile_summary(records), hide_index=True, use_container_width=True)
+
+        with st.expander("Recent calls"):
+            st.dataframe(records.iloc[::-1], hide_index=True, use_container_width=True)
+
+    # Every run recorded in the log, to track regressions over time
+    st.subheader("📈 Profile Log")
+    log = load_profile_log()
+    if log.empty:
+        st.caption(f"No records in {PROFILE_LOG_PATH} yet.")
+    else:
+        st.dataframe(profile_summary(log), hide_index=True, use_container_width=True)
+        st.caption(f"{len(log):,} records from {PROFILE_LOG_PATH}.")
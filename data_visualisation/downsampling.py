@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+# Horizontal resolution the reduced series is sized for
+PIXEL_WIDTH = 1000
+
+# Up to this many points are plotted as they are
+MAX_SCATTER_POINTS = 5000
+
+# Above this many points a density heatmap replaces the scatter plot
+HEATMAP_THRESHOLD = 200_000
+
+
+def m4_indices(x, y, n_buckets=PIXEL_WIDTH):
+    """
+    Selects the M4 representatives of a series: the first, last, minimum and maximum
+    point of every equal-width x interval. Drawn at `n_buckets` pixels wide, the result
+    is visually identical to the full series and keeps every extreme.
+
+    Parameters:
+        x (np.ndarray): Sorted x values as numbers (e.g. int64 nanoseconds)
+        y (np.ndarray): y values
+        n_buckets (int): Number of x intervals, typically the chart width in pixels
+
+    Returns:
+        np.ndarray: Sorted positions of the points to keep
+    """
+    n = len(x)
+    if n <= 4 * n_buckets:
+        return np.arange(n)
+
+    edges = np.linspace(x[0], x[-1], n_buckets + 1)
+    buckets = np.clip(np.searchsorted(edges, x, side='right') - 1, 0, n_buckets - 1)
+
+    # x is sorted, so every bucket is a contiguous run
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:] - 1, n - 1]
+
+    # Within each run, order by y: the run's first entry is its minimum, the last its maximum
+    by_value = np.lexsort((y, buckets))
+
+    return np.unique(np.concatenate([starts, ends, by_value[starts], by_value[ends]]))
+
+
+def downsample_frame(frame, x, y, n_buckets=PIXEL_WIDTH):
+    """
+    Reduces a frame to its M4 representatives along a datetime column.
+
+    Parameters:
+        frame (pd.DataFrame): Rows to reduce
+        x (str): Datetime column
+        y (str): Numeric column
+        n_buckets (int): Number of x intervals
+
+    Returns:
+        pd.DataFrame: Subset of the rows, sorted by `x`
+    """
+    frame = frame[frame[x].notna()]
+    if not frame[x].is_monotonic_increasing:
+        frame = frame.sort_values(x, kind='stable')
+
+    positions = m4_indices(
+        frame[x].to_numpy(dtype='datetime64[ns]').astype('int64'),
+        frame[y].to_numpy(dtype='float64'),
+        n_buckets
+    )
+    return frame.iloc[positions]
+
+
+def density_grid(frame, x, y, n_x=PIXEL_WIDTH // 4, n_y=100):
+    """
+    Bins a frame into a 2-D histogram along a datetime and a numeric column.
+
+    Parameters:
+        frame (pd.DataFrame): Rows to bin
+        x (str): Datetime column
+        y (str): Numeric column
+        n_x (int): Number of x bins
+        n_y (int): Number of y bins
+
+    Returns:
+        tuple: x bin centres (datetimes), y bin centres and counts shaped (n_y, n_x)
+    """
+    frame = frame[frame[x].notna()]
+    counts, x_edges, y_edges = np.histogram2d(
+        frame[x].to_numpy(dtype='datetime64[ns]').astype('int64'),
+        frame[y].to_numpy(dtype='float64'),
+        bins=(n_x, n_y)
+    )
+    x_centres = pd.to_datetime(((x_edges[:-1] + x_edges[1:]) / 2).astype('int64'))
+    y_centres = (y_edges[:-1] + y_edges[1:]) / 2
+    return x_centres, y_centres, counts.T
@@ -1,31 +1,22 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import pycountry
-import country_converter as coco
+from data_visualisation.country_resolver import country_name_for, map_country_names
+from data_visualisation.dashboard_sections import dashboard_section, plotly_chart
 
 def get_country_name(country_code):
     """
     Get the country name for a given country code.
     
     Parameters:
-        country_code (str): The 2-letter country code.
+        country_code (str): The 2- or 3-letter country code.
     
     Returns:
         str: The full country name, or 'Unknown' if not found.
     """
-    try:
-        # Try using pycountry first
-        country = pycountry.countries.get(alpha_2=country_code.upper())
-        if country:
-            return country.name
-        else:
-            # Fallback to country_converter if pycountry fails
-            country_name = coco.convert(names=country_code, to='name_short')
-            return country_name if country_name != "not found" else 'Unknown'
-    except (KeyError, AttributeError):
-        return 'Unknown'
+    return country_name_for(country_code)
 
+@dashboard_section("Global Distribution")
 def display_global_distribution(clients):
     """
     Displays the Global Client Distribution section of the dashboard.
@@ -39,7 +30,7 @@ def display_global_distribution(clients):
     country_counts.columns = ['country_code', 'count']
 
     # Map country codes to country names
-    country_counts['country_name'] = country_counts['country_code'].apply(get_country_name)
+    country_counts['country_name'] = map_country_names(country_counts['country_code'])
 
     # Create choropleth map
     fig = px.choropleth(country_counts,
@@ -83,7 +74,7 @@ def display_global_distribution(clients):
 
     # Display the map in the first column
     with col1:
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
 
     # Display the country list in the second column
     with col2:
@@ -2,14 +2,17 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import numpy as np
+from data_visualisation.dashboard_sections import dashboard_section, plotly_chart
 
-def display_kpi_section(clients, memberships):
+@dashboard_section("Key Performance Indicators")
+def display_kpi_section(clients, memberships, tier_counts=None):
     """
     Displays the KPI (Key Performance Indicators) section of the dashboard.
     
     Parameters:
         clients (pd.DataFrame): Processed clients data
         memberships (pd.DataFrame): Processed memberships data
+        tier_counts (pd.DataFrame, optional): Membership counts per tier from the aggregate cube
     """
     # Section header
     # st.markdown("---")
@@ -58,12 +61,15 @@ def display_kpi_section(clients, memberships):
             uniformtext_minsize=12
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
 
     # Membership Tier Distribution Bar Chart
     with col2:
-        # Count membership tiers
-        tier_counts = memberships['tier'].value_counts()
+        # Count membership tiers, unless the aggregate cube already did
+        if tier_counts is None:
+            tier_counts = memberships['tier'].value_counts()
+        else:
+            tier_counts = tier_counts.set_index('tier')['count']
 
         # Define colors for each tier
         tier_colors = {
@@ -89,7 +95,7 @@ def display_kpi_section(clients, memberships):
             yaxis_title=None
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
 
     # Optional: Add insights or explanations
     st.caption(
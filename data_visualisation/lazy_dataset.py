@@ -0,0 +1,359 @@
+import threading
+import time
+
+from data_visualisation.profiling import count_rows, profile_block
+from data_visualisation.read_only import read_only
+
+# Seconds between the background refresher's checks for expired items
+REFRESH_CHECK_INTERVAL = 30
+
+
+class LazyDataset:
+    """
+    Named data items computed on first access and cached one by one.
+
+    Each item is registered with a function that receives the dataset and reads the
+    items it needs from it. Those reads are recorded as dependencies, so invalidating
+    an item also drops everything derived from it, and nothing is computed until a
+    page asks for it. Items can be read from several threads; each item is computed
+    at most once at a time.
+
+    Items are refreshed without blocking readers: the current values are served
+    while the new ones are computed in the background, then swapped in together.
+
+    Values are shared by every reader, so frames are stored as ReadOnlyFrames: a page
+    that needs another column derives a new frame instead of modifying the shared one.
+    """
+
+    def __init__(self):
+        self._computes = {}
+        self._ttls = {}
+        self._values = {}
+        self._expires_at = {}
+        self._dependents = {}
+        self._dependencies = {}
+        self._generations = {}
+        self._item_locks = {}
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._refresh_mutex = threading.Lock()
+        self._pending_refresh = set()
+        self._refreshing = set()
+        self._refresh_worker = None
+        self._refresher_stop = None
+
+    def register(self, name, compute, ttl=None):
+        """
+        Declares an item.
+
+        Parameters:
+            name (str): Item name
+            compute (callable): Called with the dataset, returns the item's value
+            ttl (float or callable, optional): Seconds after which the item and its
+                dependents are refreshed in the background, serving the current values
+                meanwhile; a callable receives each new value and returns its ttl
+        """
+        with self._lock:
+            self._computes[name] = compute
+            self._ttls[name] = ttl
+            self._item_locks[name] = threading.Lock()
+            self._generations.setdefault(name, 0)
+        self.invalidate(name)
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def get(self, name):
+        """
+        Returns an item, computing it and its dependencies if needed.
+
+        Parameters:
+            name (str): Item name
+
+        Returns:
+            The item's value
+        """
+        if name not in self._computes:
+            raise KeyError(f"Unknown dataset item: {name}")
+
+        # Record that the item being computed on this thread depends on this one; a
+        # refresh collects the dependencies of the new values apart
+        stack = self._stack()
+        refresh = getattr(self._local, 'refresh', None)
+        if stack:
+            with self._lock:
+                self._dependents.setdefault(name, set()).add(stack[-1])
+                if refresh is not None and stack[-1] in refresh['names']:
+                    refresh['dependencies'].setdefault(stack[-1], set()).add(name)
+                else:
+                    self._dependencies.setdefault(stack[-1], set()).add(name)
+
+        # A refresh running on this thread computes new values aside from the served ones
+        if refresh is not None and name in refresh['names']:
+            return self._refresh_value(name, refresh['values'], stack)
+
+        self._expire(name)
+        with self._lock:
+            if name in self._values:
+                return self._values[name]
+
+        with self._item_locks[name]:
+            # Another thread may have computed it while we waited
+            with self._lock:
+                if name in self._values:
+                    return self._values[name]
+                generation = self._generations[name]
+
+            stack.append(name)
+            try:
+                with profile_block(name, 'dataset') as record:
+                    value = read_only(self._computes[name](self))
+                    if record is not None:
+                        record['rows_out'] = count_rows(value)
+            finally:
+                stack.pop()
+
+            # Keep the value unless the item was invalidated while it was computed
+            with self._lock:
+                if self._generations[name] == generation:
+                    self._values[name] = value
+                    self._expires_at[name] = self._expiry(name, value, time.monotonic())
+            return value
+
+    def _refresh_value(self, name, values, stack):
+        """
+        Computes an item for the refresh running on this thread, from the other
+        refreshed values, without touching the value being served.
+        """
+        if name not in values:
+            stack.append(name)
+            try:
+                with profile_block(name, 'dataset') as record:
+                    values[name] = read_only(self._computes[name](self))
+                    if record is not None:
+                        record['rows_out'] = count_rows(values[name])
+            finally:
+                stack.pop()
+        return values[name]
+
+    def is_computed(self, name):
+        """
+        Checks whether an item currently holds a cached value.
+        """
+        with self._lock:
+            return name in self._values
+
+    def invalidate(self, *names):
+        """
+        Drops cached items together with every item derived from them.
+
+        Parameters:
+            *names (str): Items to drop
+        """
+        with self._lock:
+            pending = list(names)
+            while pending:
+                name = pending.pop()
+                self._values.pop(name, None)
+                self._expires_at.pop(name, None)
+                self._generations[name] = self._generations.get(name, 0) + 1
+                pending.extend(self._dependents.pop(name, ()))
+
+    def refresh(self, *names, wait=False):
+        """
+        Recomputes items and every computed item derived from them, while readers
+        keep getting the current values. The new values are swapped in together once
+        all of them are ready, so a page never mixes old and new data within one read.
+
+        Refreshes are single-flight: one runs at a time, and items already waiting
+        for or going through a refresh are not queued again.
+
+        Parameters:
+            *names (str): Items to refresh
+            wait (bool): Refresh on this thread and return once the values are swapped
+                in, instead of in the background
+
+        Returns:
+            bool: True if the refresh ran or was queued
+        """
+        if wait:
+            return self._refresh_now(set(names))
+
+        with self._lock:
+            new = set(names) - self._refreshing
+            if not new:
+                return False
+            self._refreshing |= new
+            self._pending_refresh |= new
+            if self._refresh_worker is None:
+                self._refresh_worker = threading.Thread(
+                    target=self._run_refreshes, name="dataset-refresh", daemon=True
+                )
+                self._refresh_worker.start()
+        return True
+
+    def _run_refreshes(self):
+        """
+        Background worker: refreshes the queued items until none are left.
+        """
+        while True:
+            with self._lock:
+                names = self._pending_refresh
+                self._pending_refresh = set()
+                if not names:
+                    self._refresh_worker = None
+                    return
+            try:
+                self._refresh_now(names)
+            finally:
+                with self._lock:
+                    self._refreshing -= names
+
+    def _refresh_now(self, names):
+        """
+        Recomputes the given items and their computed dependents on this thread, then
+        swaps the new values in. Items whose new value equals the current one keep
+        their dependents, so an unchanged source recomputes nothing else.
+
+        Returns:
+            bool: False if a computation failed; the current values are kept then
+        """
+        with self._refresh_mutex:
+            with self._lock:
+                computed = set(self._values)
+                generations = dict(self._generations)
+            roots = [name for name in names if name in computed]
+
+            values = {}
+            dependencies = {}
+            self._local.refresh = {'names': set(roots), 'values': values, 'dependencies': dependencies}
+            try:
+                for name in roots:
+                    self.get(name)
+
+                # Dependents of the roots that changed are recomputed from the new roots
+                changed = [name for name in roots if not _unchanged(self._values.get(name), values[name])]
+                stale = self._closure(changed) | self._closure(set(names) - computed)
+                self._local.refresh['names'] |= stale
+                for name in sorted(stale & (computed - set(roots))):
+                    self.get(name)
+            except Exception as e:
+                print(f"Warning: Dataset refresh failed, serving the previous data: {str(e)}")
+                return False
+            finally:
+                self._local.refresh = None
+
+            now = time.monotonic()
+            with self._lock:
+                for name in stale | set(roots):
+                    if self._generations.get(name) != generations.get(name):
+                        # Invalidated while it was refreshed: computed again on next access
+                        continue
+                    if name in values and (name in stale or name not in self._values):
+                        self._values[name] = values[name]
+                        self._replace_dependencies(name, dependencies.get(name, set()))
+                    elif name in stale:
+                        self._values.pop(name, None)
+                    value = values.get(name, self._values.get(name))
+                    self._expires_at[name] = self._expiry(name, value, now)
+                    if name in stale:
+                        # Values computed meanwhile from the old data are not stored
+                        self._generations[name] += 1
+            return True
+
+    def _replace_dependencies(self, name, dependencies):
+        """
+        Forgets the items a previous value of an item was computed from and no new
+        one is, so invalidating them no longer drops the item.
+        """
+        for dependency in self._dependencies.get(name, set()) - dependencies:
+            self._dependents.get(dependency, set()).discard(name)
+        self._dependencies[name] = dependencies
+
+    def _closure(self, names):
+        """
+        Items together with everything derived from them.
+        """
+        with self._lock:
+            closure, pending = set(), list(names)
+            while pending:
+                name = pending.pop()
+                if name not in closure:
+                    closure.add(name)
+                    pending.extend(self._dependents.get(name, ()))
+            return closure
+
+    def _expire(self, name):
+        """
+        Schedules a background refresh of an item whose time to live has passed; the
+        current value is served until the new one is ready.
+        """
+        # Checked and queued under the lock: a refresh that swaps new values in between
+        # would otherwise be followed by another one for the same expired value
+        with self._lock:
+            expires_at = self._expires_at.get(name)
+            if expires_at is not None and time.monotonic() > expires_at:
+                self.refresh(name)
+
+    def _expiry(self, name, value, now):
+        """
+        The monotonic time at which a value stored now expires, or None if it does not.
+        """
+        ttl = self._ttls[name]
+        if callable(ttl):
+            ttl = ttl(value)
+        return None if ttl is None else now + ttl
+
+    def start_refresher(self, interval=REFRESH_CHECK_INTERVAL):
+        """
+        Starts a daemon thread that refreshes expired items ahead of the next read,
+        so no reader is the one to find them expired.
+
+        Parameters:
+            interval (float): Seconds between checks
+        """
+        with self._lock:
+            if self._refresher_stop is not None:
+                return
+            self._refresher_stop = stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                with self._lock:
+                    names = [name for name in self._ttls if name in self._values]
+                for name in names:
+                    self._expire(name)
+
+        threading.Thread(target=run, name="dataset-refresher", daemon=True).start()
+
+    def stop_refresher(self):
+        """
+        Stops the thread started by start_refresher.
+        """
+        with self._lock:
+            if self._refresher_stop is not None:
+                self._refresher_stop.set()
+                self._refresher_stop = None
+
+    def _stack(self):
+        """
+        Items being computed on the current thread, innermost last.
+        """
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+
+def _unchanged(old, new):
+    """
+    Checks whether a refreshed value equals the current one. Only plain values are
+    compared; frames and other objects count as changed unless they are the same object.
+    """
+    if old is new:
+        return True
+    if type(old) is not type(new) or not isinstance(old, (dict, list, tuple, str, int, float)):
+        return False
+    try:
+        return bool(old == new)
+    except (TypeError, ValueError):
+        return False
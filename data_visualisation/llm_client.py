@@ -0,0 +1,162 @@
+import os
+import queue
+import threading
+import time
+
+# Model used by the chatbot: 'gemini', or 'stub' for a local model that needs no API key
+CHATBOT_MODEL = os.getenv("CHATBOT_MODEL", "gemini")
+
+GEMINI_MODEL_NAME = "gemini-1.5-flash"
+
+
+class GeminiClient:
+    """
+    Generates answers with Google Gemini. The SDK is configured on first use, so the
+    dashboard starts without an API key and only the chatbot reports it missing.
+
+    Parameters:
+        api_key (str): Google API key
+        model_name (str): Gemini model
+    """
+
+    def __init__(self, api_key, model_name=GEMINI_MODEL_NAME):
+        import google.generativeai as gen_ai
+
+        gen_ai.configure(api_key=api_key)
+        self.name = model_name
+        self.model = gen_ai.GenerativeModel(model_name)
+
+    def generate(self, prompt):
+        """
+        Answers a prompt.
+
+        Parameters:
+            prompt (str): Full prompt, context included
+
+        Returns:
+            str: Model response
+        """
+        response = self.model.generate_content(prompt)
+        return getattr(response, "text", "I couldn't process that.")
+
+    def stream(self, prompt):
+        """
+        Answers a prompt, yielding the text as the model produces it.
+
+        Parameters:
+            prompt (str): Full prompt, context included
+
+        Yields:
+            str: Pieces of the response
+        """
+        for chunk in self.model.generate_content(prompt, stream=True):
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
+
+
+class StubClient:
+    """
+    Local stand-in for the LLM: answers instantly by naming the context sections it
+    was given, so retrieval and prompt sizes can be checked without network access or
+    a key. The last prompt is kept in `last_prompt` and `calls` counts the requests.
+
+    Parameters:
+        delay (float): Seconds to wait before each streamed word, to mimic a remote model
+    """
+
+    def __init__(self, delay=0.0):
+        self.name = "stub"
+        self.delay = delay
+        self.last_prompt = None
+        self.calls = 0
+
+    def generate(self, prompt):
+        """
+        Answers a prompt with the headings of its context sections.
+
+        Parameters:
+            prompt (str): Full prompt; context sections start with '## '
+
+        Returns:
+            str: Deterministic response listing the sections
+        """
+        self.last_prompt = prompt
+        self.calls += 1
+        headings = [line.strip()[3:] for line in prompt.splitlines() if line.strip().startswith('## ')]
+        if not headings:
+            return "I have no dashboard data matching that question."
+        return "Answered from: " + "; ".join(headings)
+
+    def stream(self, prompt):
+        """
+        Yields the answer of generate word by word.
+        """
+        for word in self.generate(prompt).split(" "):
+            if self.delay:
+                time.sleep(self.delay)
+            yield word + " "
+
+
+def stream_in_background(pieces, timeout=None):
+    """
+    Reads a response stream on a worker thread and yields its pieces as they arrive,
+    so slow network reads never hold up rendering of what has already been received.
+
+    Parameters:
+        pieces (iterable): Response stream, e.g. client.stream(prompt)
+        timeout (float, optional): Seconds to wait for the next piece
+
+    Yields:
+        str: Pieces of the response, in order
+
+    Raises:
+        TimeoutError: If no piece arrives within the timeout
+        Exception: Whatever the stream raised, re-raised on the caller's thread
+    """
+    pieces_queue = queue.Queue()
+    done = object()
+
+    def run():
+        try:
+            for piece in pieces:
+                pieces_queue.put(piece)
+        except Exception as e:
+            pieces_queue.put(e)
+        finally:
+            pieces_queue.put(done)
+
+    threading.Thread(target=run, name="llm-stream", daemon=True).start()
+    while True:
+        try:
+            piece = pieces_queue.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("The model did not respond in time.")
+        if piece is done:
+            return
+        if isinstance(piece, Exception):
+            raise piece
+        yield piece
+
+
+def create_llm_client(model=CHATBOT_MODEL):
+    """
+    Creates the client for the configured model.
+
+    Parameters:
+        model (str): 'gemini' or 'stub'
+
+    Returns:
+        GeminiClient | StubClient: Client with generate(prompt) and stream(prompt) methods
+
+    Raises:
+        ValueError: If the model is unknown or the Gemini API key is not set
+    """
+    if model == "stub":
+        return StubClient()
+    if model == "gemini":
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise ValueError("Google API key not found. Set GOOGLE_API_KEY in environment variables.")
+        return GeminiClient(api_key)
+    raise ValueError(f"Unknown chatbot model: {model}")
@@ -1,47 +1,62 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime
+from data_visualisation.birthday_index import BirthdayIndex
+from data_visualisation.dashboard_sections import dashboard_section
 
-def display_birthdays(clients):
+# Rows shown per page of the birthday list
+PAGE_SIZE = 50
+
+@dashboard_section("Upcoming Birthdays", fragment=True)
+def display_birthdays(clients, birthday_index=None):
     """
     Displays the Upcoming Member Birthdays section of the dashboard.
-    
+
     Parameters:
         clients (pd.DataFrame): Processed clients data with birthdate information
+        birthday_index (BirthdayIndex, optional): Clients sorted by birthday, built once
+            per data refresh; built here if not given
     """
     # Section header
     st.markdown("---")
     st.subheader("🎂 Upcoming Member Birthdays")
 
-    # Calculate days until next birthday
-    def days_until_birthday(birthdate):
-        today = pd.Timestamp.now().normalize()
-        next_birthday = birthdate.replace(year=today.year)
-        
-        # If birthday has already passed this year, set it to next year
-        if next_birthday < today:
-            next_birthday = next_birthday.replace(year=today.year + 1)
-        
-        return (next_birthday - today).days
+    if birthday_index is None:
+        birthday_index = BirthdayIndex(clients)
+
+    # Only the birthdays within the selected window are looked up
+    col_window, col_page = st.columns(2)
 
-    # Add days until next birthday to clients
-    clients['days_until_birthday'] = clients['birthdate'].apply(days_until_birthday)
+    with col_window:
+        days_ahead = st.slider(
+            "Days Ahead",
+            min_value=0,
+            max_value=365,
+            value=30,
+            help="Show birthdays from today up to this many days ahead"
+        )
 
-    # Sort by days until birthday (ascending)
-    upcoming_birthdays = clients.sort_values(by='days_until_birthday')
+    upcoming_birthdays = birthday_index.upcoming(days_ahead)
+    n_pages = max(1, -(-len(upcoming_birthdays) // PAGE_SIZE))
+
+    with col_page:
+        page = st.number_input(
+            "Page",
+            min_value=1,
+            max_value=n_pages,
+            value=1,
+            help=f"{len(upcoming_birthdays)} birthdays, {PAGE_SIZE} per page"
+        )
+
+    page_rows = upcoming_birthdays.iloc[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
 
     # Highlight rows where birthday is today
-    def highlight_birthday_today(row):
-        today = pd.Timestamp.now().normalize()
-        birthday = row['birthdate'].replace(year=today.year)
-        
-        if birthday == today:
-            return ['background-color: #FFD700; color: black'] * len(row)  # Gold background with black font
-        else:
-            return [''] * len(row)
+    def highlight_birthday_today(rows):
+        styles = pd.DataFrame('', index=rows.index, columns=rows.columns)
+        styles.loc[rows['days_until_birthday'] == 0] = 'background-color: #FFD700; color: black'  # Gold background with black font
+        return styles
 
     # Apply highlighting
-    highlighted_birthdays = upcoming_birthdays.style.apply(highlight_birthday_today, axis=1)
+    highlighted_birthdays = page_rows.style.apply(highlight_birthday_today, axis=None)
 
     # Display the list
     st.dataframe(
@@ -63,4 +78,4 @@ def display_birthdays(clients):
         Birthdays happening today are highlighted in gold. Use this information
         for personalized marketing or client engagement opportunities.
         """
-    )
\ No newline at end of file
+    )
@@ -1,13 +1,16 @@
 import streamlit as st
 import pandas as pd
+from data_visualisation.dashboard_sections import dashboard_section
 
-def display_retention_rate(memberships, merged_data):
+@dashboard_section("Retention Rate")
+def display_retention_rate(memberships, merged_data, retention_by_tier=None):
     """
     Displays the Membership Retention Rate section of the dashboard.
     
     Parameters:
         memberships (pd.DataFrame): Processed memberships data
         merged_data (pd.DataFrame): Merged clients and memberships data
+        retention_by_tier (pd.DataFrame, optional): Pre-aggregated 'Tier' and 'Retention Rate'
     """
     # Section header
     st.markdown("---")
@@ -49,10 +52,11 @@ def display_retention_rate(memberships, merged_data):
     st.markdown("### Retention by Membership Tier")
     
     # Calculate retention by tier
-    retention_by_tier = merged_data.groupby('tier')['status'].apply(
-        lambda x: (x == 'ACTIVE').mean() * 100
-    ).reset_index()
-    retention_by_tier.columns = ['Tier', 'Retention Rate']
+    if retention_by_tier is None:
+        retention_by_tier = merged_data.groupby('tier', observed=True)['status'].apply(
+            lambda x: (x == 'ACTIVE').mean() * 100
+        ).reset_index()
+        retention_by_tier.columns = ['Tier', 'Retention Rate']
 
     # Display the breakdown
     st.dataframe(
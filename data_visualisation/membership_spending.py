@@ -1,14 +1,20 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from data_visualisation.dashboard_sections import dashboard_section, plotly_chart
 
-def display_membership_spending(memberships, transactions):
+# Membership tiers in display order
+TIER_ORDER = ['No Membership', 'Bronze', 'Silver', 'Gold', 'Platinum']
+
+@dashboard_section("Membership Spending")
+def display_membership_spending(memberships, transactions, avg_spending=None):
     """
     Displays the Membership Spending Analysis section of the dashboard.
     
     Parameters:
         memberships (pd.DataFrame): Processed memberships data
         transactions (pd.DataFrame): Processed transactions data
+        avg_spending (pd.DataFrame, optional): Pre-aggregated average 'amount' per 'tier'
     """
     # Section header
     st.markdown("---")
@@ -40,7 +46,7 @@ def display_membership_spending(memberships, transactions):
         merged_data = merged_data[merged_data['amount'] > 0]
 
         # Define the order of tiers
-        tier_order = ['No Membership', 'Bronze', 'Silver', 'Gold', 'Platinum']
+        tier_order = TIER_ORDER
 
         # Ensure the 'tier' column is categorical with the specified order
         merged_data['tier'] = pd.Categorical(
@@ -69,7 +75,7 @@ def display_membership_spending(memberships, transactions):
                     yaxis_title="Amount Spent ($)",
                     showlegend=False
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
             else:
                 st.warning("No data available for box plot")
 
@@ -77,11 +83,12 @@ def display_membership_spending(memberships, transactions):
         with col2:
             st.markdown("### Average Spending by Tier")
             if not merged_data.empty:
-                # Handle FutureWarning for groupby
-                avg_spending = merged_data.groupby(
-                    'tier', 
-                    observed=False  # Explicitly set to handle categorical warning
-                )['amount'].mean().reset_index()
+                if avg_spending is None:
+                    # Handle FutureWarning for groupby
+                    avg_spending = merged_data.groupby(
+                        'tier', 
+                        observed=False  # Explicitly set to handle categorical warning
+                    )['amount'].mean().reset_index()
                 
                 fig = px.bar(avg_spending,
                             x='tier',
@@ -96,7 +103,7 @@ def display_membership_spending(memberships, transactions):
                     yaxis_title="Average Amount Spent ($)",
                     showlegend=False
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
             else:
                 st.warning("No data available for bar chart")
 
@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
+from data_visualisation.dashboard_sections import dashboard_section
 
-def display_monthly_statistics(clients, memberships, merged_data):
+@dashboard_section("Monthly Statistics", fragment=True)
+def display_monthly_statistics(clients, memberships, merged_data, clients_index=None, memberships_index=None):
     """
     Displays the Monthly Statistics section of the dashboard.
     
@@ -9,6 +11,8 @@ def display_monthly_statistics(clients, memberships, merged_data):
         clients (pd.DataFrame): Processed clients data
         memberships (pd.DataFrame): Processed memberships data
         merged_data (pd.DataFrame): Merged clients and memberships data
+        clients_index (DateIndex, optional): Clients sorted by 'date_joined'
+        memberships_index (DateIndex, optional): Memberships sorted by 'start_date'
     """
     # Section header
     # st.markdown("---")
@@ -48,25 +52,33 @@ def display_monthly_statistics(clients, memberships, merged_data):
 
     # Filter and display signups
     with col1:
-        filtered_clients = clients[
-            (clients['date_joined'].dt.year == selected_year) & 
-            (clients['date_joined'].dt.month == selected_month)
-        ]
+        if clients_index is not None:
+            signups = clients_index.month_count(selected_year, selected_month)
+        else:
+            filtered_clients = clients[
+                (clients['date_joined'].dt.year == selected_year) & 
+                (clients['date_joined'].dt.month == selected_month)
+            ]
+            signups = len(filtered_clients)
         st.metric(
             label=f"Signups in {selected_month_year}", 
-            value=len(filtered_clients),
+            value=signups,
             help="Number of new client signups in the selected month"
         )
 
     # Filter and display memberships
     with col2:
-        filtered_memberships = memberships[
-            (memberships['start_date'].dt.year == selected_year) & 
-            (memberships['start_date'].dt.month == selected_month)
-        ]
+        if memberships_index is not None:
+            new_memberships = memberships_index.month_count(selected_year, selected_month)
+        else:
+            filtered_memberships = memberships[
+                (memberships['start_date'].dt.year == selected_year) & 
+                (memberships['start_date'].dt.month == selected_month)
+            ]
+            new_memberships = len(filtered_memberships)
         st.metric(
             label=f"Memberships in {selected_month_year}", 
-            value=len(filtered_memberships),
+            value=new_memberships,
             help="Number of new memberships started in the selected month"
         )
 
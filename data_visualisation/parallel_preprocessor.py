@@ -0,0 +1,453 @@
+import multiprocessing
+import os
+import sys
+import threading
+import types
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import pandas as pd
+import pyarrow as pa
+from data_visualisation.data_preprocessor import (
+    DTYPE_PLAN,
+    _prepare_frame,
+    _warn_duplicate_clients,
+    client_ages,
+    client_country_codes,
+    enrich_clients,
+    merge_clients_memberships,
+    prepare_transactions,
+)
+from data_visualisation.profiling import profiled
+
+# Worker processes used by the parallel preprocessing; 1 keeps it in this process
+PREPROCESS_WORKERS = int(os.getenv("PREPROCESS_WORKERS", "1"))
+
+# Frames with fewer rows are preprocessed in this process, as the hand-off to the
+# workers would cost more than it saves
+PARALLEL_MIN_ROWS = int(os.getenv("PREPROCESS_PARALLEL_MIN_ROWS", "200000"))
+
+# Column that keeps the clients' order through the partitioned merge
+POSITION_COLUMN = '__position'
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def get_process_pool(workers):
+    """
+    Returns the process-wide worker pool, creating it on first use.
+
+    Workers are spawned rather than forked, since the dashboard server runs threads
+    that a forked child would inherit in an unknown state. The pool is kept between
+    refreshes, so the spawn cost is paid once.
+
+    Parameters:
+        workers (int): Worker processes; a pool of another size is replaced
+
+    Returns:
+        ProcessPoolExecutor: The pool
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+
+def close_process_pool():
+    """
+    Shuts the worker pool down, e.g. before the process exits.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool, _pool_workers = None, 0
+
+
+@contextmanager
+def _workers_skip_main_script():
+    """
+    Streamlit runs the app script as a `__main__` module without a spec, which a
+    spawned worker would run again on start. Workers started in this block get an
+    empty `__main__` instead; the steps they run live in importable modules.
+    """
+    main = sys.modules.get('__main__')
+    if main is None or getattr(main, '__spec__', None) is not None or not getattr(main, '__file__', None):
+        yield
+        return
+    sys.modules['__main__'] = types.ModuleType('__main__')
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main
+
+
+def arrow_compatible(frame):
+    """
+    Converts the object columns Arrow cannot type, such as ObjectIds or ids mixing
+    numbers and strings, to strings. Missing values stay missing, so the conversions
+    in DTYPE_PLAN give the same result as on the original column.
+
+    Parameters:
+        frame (pd.DataFrame): Raw frame; not modified
+
+    Returns:
+        pd.DataFrame: The frame, or a copy with the offending columns converted
+    """
+    converted = {}
+    for col in frame.columns:
+        if frame[col].dtype != object:
+            continue
+        try:
+            pa.array(frame[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            converted[col] = frame[col].where(frame[col].isna(), frame[col].astype(str))
+    return frame.assign(**converted) if converted else frame
+
+
+def write_shared(frame):
+    """
+    Writes a frame to a new shared memory block as an Arrow IPC stream.
+
+    Parameters:
+        frame (pd.DataFrame): Frame to hand to another process
+
+    Returns:
+        tuple: Block name and stream size in bytes
+    """
+    table = pa.Table.from_pandas(frame)
+
+    # Size the block exactly, then serialise straight into it
+    counter = pa.MockOutputStream()
+    with pa.ipc.new_stream(counter, table.schema) as writer:
+        writer.write_table(table)
+    size = counter.size()
+
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        sink = pa.FixedSizeBufferWriter(pa.py_buffer(block.buf))
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        # The block cannot be closed while Arrow still holds its memory
+        del sink, writer
+    finally:
+        block.close()
+    return block.name, size
+
+
+def read_shared(name, size, unlink=True):
+    """
+    Reads a frame written by write_shared. The Arrow buffers are read in place and
+    copied once, into the pandas frame, which must not point into the block once it
+    is closed.
+
+    Parameters:
+        name (str): Block name
+        size (int): Stream size in bytes
+        unlink (bool): Free the block once read
+
+    Returns:
+        pd.DataFrame: The frame
+    """
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(block.buf).slice(0, size)).read_all()
+        frame = table.to_pandas()
+        del table
+        # An integer index is converted without copying
+        frame.index = frame.index.copy(deep=True)
+        try:
+            block.close()
+        except BufferError:
+            frame = frame.copy()
+            block.close()
+    finally:
+        if unlink:
+            block.unlink()
+    return frame
+
+
+def _prepare_clients_partition(raw_clients):
+    return _prepare_frame(raw_clients, DTYPE_PLAN['clients'])
+
+
+def _prepare_memberships_partition(raw_memberships):
+    return _prepare_frame(raw_memberships, DTYPE_PLAN['memberships'])
+
+
+def _merge_partition(clients, memberships):
+    return merge_clients_memberships(clients, memberships)
+
+
+# Steps the workers run, by name; the duplicate checks need the whole frame and
+# run in the parent
+PARALLEL_STEPS = {
+    'clients': _prepare_clients_partition,
+    'memberships': _prepare_memberships_partition,
+    'transactions': prepare_transactions,
+    'merge': _merge_partition,
+}
+
+
+def _run_step(step, blocks):
+    """
+    Worker entry point: reads the input frames from shared memory, runs the step and
+    writes its result to a new block, which the parent reads and frees.
+    """
+    frames = [read_shared(name, size, unlink=False) for name, size in blocks]
+    return write_shared(PARALLEL_STEPS[step](*frames))
+
+
+def row_partitions(frame, partitions):
+    """
+    Splits a frame into contiguous row ranges of about the same size.
+
+    Returns:
+        list: Non-empty frames, in order
+    """
+    bounds = [len(frame) * i // partitions for i in range(partitions + 1)]
+    return [frame.iloc[start:stop] for start, stop in zip(bounds, bounds[1:]) if stop > start]
+
+
+def hash_partitions(frame, partitions, column='client_id'):
+    """
+    Splits a frame by the hash of a column, so equal keys land in the same partition.
+
+    Returns:
+        list: One frame per partition, some possibly empty
+    """
+    buckets = pd.util.hash_pandas_object(frame[column], index=False).to_numpy() % partitions
+    return [frame[buckets == i] for i in range(partitions)]
+
+
+def concat_partitions(frames):
+    """
+    Concatenates partition results. Categorical columns get the sorted union of the
+    partitions' categories, as the column would have if converted in one piece.
+
+    Returns:
+        pd.DataFrame: The frames, one after another
+    """
+    frames = list(frames)
+    if len(frames) == 1:
+        return frames[0]
+    for col in frames[0].columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            categories = sorted(set().union(*(frame[col].cat.categories for frame in frames)))
+            frames = [frame.assign(**{col: frame[col].cat.set_categories(categories)}) for frame in frames]
+    return pd.concat(frames)
+
+
+def run_partitioned(step, partitions, workers):
+    """
+    Runs a step over partitions in the worker pool. Each partition's frames are
+    written to shared memory and the worker writes its result to a new block; every
+    block is freed once read, also when a step fails.
+
+    Parameters:
+        step (str): Name in PARALLEL_STEPS
+        partitions (list): Tuples of the frames passed to the step
+        workers (int): Worker processes
+
+    Returns:
+        list: Result frames, in partition order
+
+    Raises:
+        BrokenProcessPool: If a worker died; the pool is replaced on the next call
+    """
+    return _collect(submit_partitioned(step, partitions, workers), raise_errors=True)
+
+
+def submit_partitioned(step, partitions, workers):
+    """
+    Starts run_partitioned without waiting for the workers.
+
+    Returns:
+        list: (input blocks, future) pairs, to pass to _collect
+    """
+    pool = get_process_pool(workers)
+    submitted = []
+    try:
+        for frames in partitions:
+            blocks = []
+            submitted.append((blocks, None))
+            for frame in frames:
+                blocks.append(write_shared(frame))
+            # Workers are started as tasks are submitted
+            with _workers_skip_main_script():
+                submitted[-1] = (blocks, pool.submit(_run_step, step, blocks))
+    except BaseException:
+        _collect(submitted)
+        raise
+    return submitted
+
+
+def _collect(submitted, raise_errors=False):
+    """
+    Waits for every submitted step and reads its result, freeing all blocks.
+
+    Parameters:
+        submitted (list): (input blocks, future or None) pairs
+        raise_errors (bool): Raise the first error once every step has finished
+
+    Returns:
+        list: Result frames of the steps that succeeded, in partition order
+    """
+    results, error = [], None
+    for blocks, future in submitted:
+        try:
+            if future is not None:
+                results.append(read_shared(*future.result()))
+        except Exception as e:
+            error = error or e
+        finally:
+            for name, _ in blocks:
+                _unlink(name)
+    if isinstance(error, BrokenProcessPool):
+        close_process_pool()
+    if raise_errors and error is not None:
+        raise error
+    return results
+
+
+def _unlink(name):
+    """
+    Frees a shared memory block, if it still exists.
+    """
+    try:
+        block = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    block.close()
+    block.unlink()
+
+
+def _use_workers(frame, workers):
+    return workers > 1 and len(frame) >= PARALLEL_MIN_ROWS
+
+
+def parallel_prepare(step, raw_frame, workers=None):
+    """
+    Runs one of the prepare steps over row ranges of a raw frame in the worker pool.
+
+    Parameters:
+        step (str): 'clients', 'memberships' or 'transactions'
+        raw_frame (pd.DataFrame): Raw frame
+        workers (int, optional): Worker processes, PREPROCESS_WORKERS by default
+
+    Returns:
+        pd.DataFrame: The same frame as prepare_clients, prepare_memberships or
+        prepare_transactions
+    """
+    workers = PREPROCESS_WORKERS if workers is None else workers
+    if not _use_workers(raw_frame, workers):
+        frame = PARALLEL_STEPS[step](raw_frame)
+    else:
+        partitions = row_partitions(arrow_compatible(raw_frame), workers)
+        frame = concat_partitions(run_partitioned(step, [(part,) for part in partitions], workers))
+    if step != 'transactions':
+        _warn_duplicate_clients(frame, step)
+    return frame
+
+
+def parallel_merge(clients, memberships, workers=None):
+    """
+    Joins clients with their membership, one client_id hash partition per worker.
+
+    Parameters:
+        clients (pd.DataFrame): Clients from prepare_clients
+        memberships (pd.DataFrame): Processed memberships
+        workers (int, optional): Worker processes, PREPROCESS_WORKERS by default
+
+    Returns:
+        pd.DataFrame: The same frame as merge_clients_memberships
+    """
+    return submit_merge(clients, memberships, workers)()
+
+
+def submit_merge(clients, memberships, workers=None):
+    """
+    Starts parallel_merge, so this process can do other work while the workers merge.
+
+    Parameters:
+        clients (pd.DataFrame): Clients from prepare_clients
+        memberships (pd.DataFrame): Processed memberships
+        workers (int, optional): Worker processes, PREPROCESS_WORKERS by default
+
+    Returns:
+        callable: Waits for the workers and returns the merged frame; it must be
+            called, also on errors, to free the shared memory blocks
+    """
+    workers = PREPROCESS_WORKERS if workers is None else workers
+    if (
+        not _use_workers(clients, workers)
+        or 'client_id' not in clients.columns or 'client_id' not in memberships.columns
+    ):
+        return lambda: merge_clients_memberships(clients, memberships)
+
+    # Remember each client's position to restore the order of a single merge
+    clients = clients.assign(**{POSITION_COLUMN: range(len(clients))})
+    partitions = [
+        (client_part, membership_part)
+        for client_part, membership_part in zip(
+            hash_partitions(clients, workers), hash_partitions(memberships, workers)
+        )
+        if not client_part.empty and not membership_part.empty
+    ]
+    if not partitions:
+        return lambda: merge_clients_memberships(clients.drop(columns=POSITION_COLUMN), memberships)
+
+    submitted = submit_partitioned('merge', partitions, workers)
+
+    def finish():
+        merged = concat_partitions(_collect(submitted, raise_errors=True))
+        return (
+            merged.sort_values(POSITION_COLUMN, kind='stable')
+            .drop(columns=POSITION_COLUMN)
+            .reset_index(drop=True)
+        )
+    return finish
+
+
+@profiled('parallel_preprocess_data', 'preprocess')
+def parallel_preprocess_data(raw_clients, raw_memberships, raw_transactions, workers=None):
+    """
+    preprocess_data with the conversions and the merge spread over worker processes.
+
+    Frames are handed to the workers through shared memory as Arrow buffers rather
+    than pickled. The conversions run over row ranges; the merge runs over client_id
+    hash partitions, so each client meets its membership in the same worker. Ages
+    and country codes are computed in this process while the workers merge.
+
+    Parameters:
+        raw_clients (pd.DataFrame): Raw clients data
+        raw_memberships (pd.DataFrame): Raw memberships data
+        raw_transactions (pd.DataFrame): Raw transactions data
+        workers (int, optional): Worker processes, PREPROCESS_WORKERS by default
+
+    Returns:
+        tuple: Processed clients, memberships, transactions, and merged data
+    """
+    clients = parallel_prepare('clients', raw_clients, workers)
+    memberships = parallel_prepare('memberships', raw_memberships, workers)
+    transactions = parallel_prepare('transactions', raw_transactions, workers)
+
+    finish_merge = submit_merge(clients, memberships, workers)
+
+    # Ages and country codes are vectorised over the unique values already and take
+    # less time than the merge, so they run here meanwhile rather than in the workers,
+    # which would each have to build the country table first
+    try:
+        clients = enrich_clients(clients, client_country_codes(clients), client_ages(clients))
+    finally:
+        merged_data = finish_merge()
+
+    return clients, memberships, transactions, merged_data
@@ -0,0 +1,245 @@
+import collections
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+# Set DASHBOARD_PROFILING=1 to profile sections, loading and preprocessing. When off,
+# profiled functions are left undecorated and profile_block does nothing. Profiling
+# started this way can be turned off and on again with set_profiling.
+PROFILING_ENABLED = os.getenv("DASHBOARD_PROFILING", "0") == "1"
+
+# JSON lines file the profile records are appended to
+PROFILE_LOG_PATH = os.getenv("PROFILE_LOG_PATH", ".cache/profile.jsonl")
+
+# Records kept in memory for the diagnostics page
+PROFILE_HISTORY = 1000
+
+_history = collections.deque(maxlen=PROFILE_HISTORY)
+_log_lock = threading.Lock()
+_local = threading.local()
+
+# Profile blocks open on any thread; memory is traced while there is at least one
+_open_blocks = 0
+_tracing_lock = threading.Lock()
+
+
+def set_profiling(enabled):
+    """
+    Turns profiling on or off while the dashboard runs. Turning it off stops the
+    memory tracing; functions only record calls if profiling was on at import.
+
+    Parameters:
+        enabled (bool): Profile from now on
+    """
+    global PROFILING_ENABLED
+    with _tracing_lock:
+        PROFILING_ENABLED = enabled
+        if not enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def profiling_enabled():
+    """
+    Checks whether profiling is currently on.
+    """
+    return PROFILING_ENABLED
+
+
+def _start_tracing():
+    global _open_blocks
+    with _tracing_lock:
+        _open_blocks += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def _stop_tracing():
+    global _open_blocks
+    with _tracing_lock:
+        _open_blocks -= 1
+        if _open_blocks == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def count_rows(values):
+    """
+    Counts the rows of every DataFrame or Series in a value, tuple, list or dict.
+
+    Parameters:
+        values: Arguments or return value of a profiled function
+
+    Returns:
+        int: Total number of rows
+    """
+    if isinstance(values, (pd.DataFrame, pd.Series)):
+        return len(values)
+    if isinstance(values, dict):
+        values = list(values.values())
+    if isinstance(values, (tuple, list)):
+        return sum(count_rows(value) for value in values)
+    return 0
+
+
+def _stack():
+    """
+    Profile records open on the current thread, innermost last.
+    """
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+@contextlib.contextmanager
+def profile_block(name, kind):
+    """
+    Profiles a block of code: wall time, peak memory above the memory in use at the
+    start, and the rows and Plotly payload the block reports on the yielded record.
+    Memory is traced process-wide while any block is open, so blocks running at the
+    same time on other threads add to each other's peak. A caller that times the
+    block itself can set `seconds` on the record, which is then kept.
+
+    Parameters:
+        name (str): Name of the profiled step
+        kind (str): 'section', 'load', 'preprocess' or 'dataset'
+
+    Yields:
+        dict: The record, or None when profiling is off
+    """
+    if not PROFILING_ENABLED:
+        yield None
+        return
+
+    _start_tracing()
+
+    stack = _stack()
+    record = {
+        'name': name,
+        'kind': kind,
+        'rows_in': 0,
+        'rows_out': 0,
+        'plotly_bytes': 0,
+        'parent': stack[-1]['name'] if stack else None,
+    }
+    memory_at_start = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    record['_child_peak'] = 0
+    stack.append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.setdefault('seconds', time.perf_counter() - start)
+        stack.pop()
+
+        # A nested block resets the peak, so fold in the highest peak seen by children
+        peak = max(tracemalloc.get_traced_memory()[1], record.pop('_child_peak'))
+        record['peak_memory_bytes'] = max(0, peak - memory_at_start)
+        if stack:
+            stack[-1]['_child_peak'] = max(stack[-1]['_child_peak'], peak)
+            stack[-1]['plotly_bytes'] += record['plotly_bytes']
+        _stop_tracing()
+
+        record['timestamp'] = time.time()
+        write_record(record)
+
+
+def record_plotly_payload(fig):
+    """
+    Adds the size of a figure's JSON payload to the innermost profile record.
+
+    Parameters:
+        fig (go.Figure): Figure about to be sent to the browser
+    """
+    if not PROFILING_ENABLED:
+        return
+    stack = _stack()
+    if stack:
+        stack[-1]['plotly_bytes'] += len(fig.to_json())
+
+
+def profiled(name, kind):
+    """
+    Decorates a function so that each call is profiled with profile_block. Rows are
+    counted over the DataFrames passed in and returned.
+
+    Parameters:
+        name (str): Name of the profiled step
+        kind (str): 'section', 'load', 'preprocess' or 'dataset'
+
+    Returns:
+        callable: Decorator, which leaves the function untouched when profiling is off
+    """
+    def decorator(function):
+        if not PROFILING_ENABLED:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with profile_block(name, kind) as record:
+                if record is None:
+                    return function(*args, **kwargs)
+                record['rows_in'] = count_rows(args) + count_rows(kwargs)
+                result = function(*args, **kwargs)
+                record['rows_out'] = count_rows(result)
+                return result
+        return wrapper
+    return decorator
+
+
+def write_record(record):
+    """
+    Keeps a profile record for the diagnostics page and appends it to the JSON lines log.
+
+    Parameters:
+        record (dict): Finished profile record
+    """
+    _history.append(record)
+    try:
+        with _log_lock:
+            os.makedirs(os.path.dirname(PROFILE_LOG_PATH) or '.', exist_ok=True)
+            with open(PROFILE_LOG_PATH, 'a', encoding='utf-8') as file:
+                file.write(json.dumps(record) + '\n')
+    except OSError as e:
+        print(f"Warning: Could not write profile record: {str(e)}")
+
+
+def profile_history():
+    """
+    Returns the profile records of this process, oldest first.
+
+    Returns:
+        pd.DataFrame: One row per profiled call
+    """
+    return pd.DataFrame(list(_history))
+
+
+def profile_summary(records):
+    """
+    Summarises profile records per profiled step.
+
+    Parameters:
+        records (pd.DataFrame): Records from profile_history or the JSON lines log
+
+    Returns:
+        pd.DataFrame: Calls, mean and 95th percentile time, peak memory, rows and
+            Plotly payload per step, slowest first
+    """
+    if records.empty:
+        return records
+
+    summary = records.groupby(['kind', 'name']).agg(
+        calls=('seconds', 'size'),
+        mean_ms=('seconds', lambda seconds: seconds.mean() * 1000),
+        p95_ms=('seconds', lambda seconds: seconds.quantile(0.95) * 1000),
+        peak_memory_mb=('peak_memory_bytes', lambda peak: peak.max() / 2**20),
+        rows_in=('rows_in', 'max'),
+        rows_out=('rows_out', 'max'),
+        plotly_kb=('plotly_bytes', lambda payload: payload.max() / 1024),
+    )
+    return summary.sort_values('mean_ms', ascending=False).reset_index()
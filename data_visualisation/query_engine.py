@@ -0,0 +1,345 @@
+import json
+import re
+
+import numpy as np
+import pandas as pd
+from data_visualisation.aggregate_cube import AGE_BINS, AGE_LABELS
+from data_visualisation.country_resolver import alpha3_for, map_country_names
+from data_visualisation.date_index import day_end
+from data_visualisation.membership_spending import TIER_ORDER
+from data_visualisation.spender_index import SpenderIndex
+
+# Largest number of rows a tool returns
+MAX_RESULT_ROWS = 50
+
+_REQUIRED = object()
+
+
+class Parameter:
+    """
+    A typed tool argument.
+
+    Parameters:
+        kind (str): 'date', 'int' or 'str'
+        description (str): Shown to the model
+        default: Value when the argument is left out; required if not given
+        choices (list, optional): Allowed values of a 'str' argument
+        minimum (int, optional): Smallest value of an 'int' argument; lower values
+            are raised to it
+    """
+
+    def __init__(self, kind, description, default=_REQUIRED, choices=None, minimum=None):
+        self.kind = kind
+        self.description = description
+        self.default = default
+        self.choices = choices
+        self.minimum = minimum
+
+    @property
+    def required(self):
+        return self.default is _REQUIRED
+
+    def coerce(self, name, value):
+        """
+        Converts a value from the model to the argument's type.
+
+        Raises:
+            ValueError: If the value has the wrong type or is not an allowed choice
+        """
+        if value is None:
+            if self.required:
+                raise ValueError(f"Missing argument: {name}")
+            return self.default
+        try:
+            if self.kind == 'date':
+                value = pd.Timestamp(value).normalize()
+            elif self.kind == 'int':
+                value = int(value)
+            else:
+                value = str(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Argument {name} must be a {self.kind}, got {value!r}")
+
+        if self.choices is not None and value not in self.choices:
+            raise ValueError(f"Argument {name} must be one of {', '.join(self.choices)}")
+        if self.minimum is not None:
+            value = max(value, self.minimum)
+        return value
+
+    def signature(self, name):
+        text = f"{name}: {self.kind}"
+        if self.choices is not None:
+            text += f" ({'|'.join(self.choices)})"
+        if self.minimum is not None:
+            text += f" (>= {self.minimum})"
+        if not self.required:
+            text += f" = {self.default!r}" if self.default is not None else " = null"
+        return text
+
+
+DATE_START = Parameter('date', "First day, YYYY-MM-DD")
+DATE_END = Parameter('date', "Last day, YYYY-MM-DD, included")
+COUNTRY = Parameter('str', "Country name or ISO code", default=None)
+TIER = Parameter('str', "Membership tier", default=None, choices=TIER_ORDER)
+
+# Tools the model may call: description and typed parameters
+TOOLS = {
+    'top_spenders': (
+        "Clients with the highest total spend between two dates",
+        {'start_date': DATE_START, 'end_date': DATE_END,
+         'k': Parameter('int', "Number of clients", default=5, minimum=1), 'country': COUNTRY, 'tier': TIER},
+    ),
+    'total_spend': (
+        "Total transaction amount and count between two dates",
+        {'start_date': DATE_START, 'end_date': DATE_END, 'country': COUNTRY, 'tier': TIER},
+    ),
+    'count_clients': (
+        "Number of clients, optionally filtered",
+        {'country': COUNTRY, 'tier': TIER,
+         'min_age': Parameter('int', "Lowest age", default=None),
+         'max_age': Parameter('int', "Highest age", default=None)},
+    ),
+    'clients_by': (
+        "Number of clients per country, membership tier or age group",
+        {'dimension': Parameter('str', "Grouping", choices=['country', 'tier', 'age_group']),
+         'top': Parameter('int', "Largest groups to return", default=10, minimum=1)},
+    ),
+    'retention_by_tier': (
+        "Share of active memberships per tier, in percent",
+        {},
+    ),
+    'average_spending_by_tier': (
+        "Average transaction amount per membership tier",
+        {},
+    ),
+    'monthly_signups': (
+        "New clients or memberships per month between two dates",
+        {'start_date': DATE_START, 'end_date': DATE_END,
+         'fact': Parameter('str', "What to count", default='clients', choices=['clients', 'memberships'])},
+    ),
+}
+
+
+def resolve_country(country):
+    """
+    Resolves a country name or code to the ISO Alpha-3 code used in the clients data.
+    Codes go through the same lookup as names, so only real ISO codes are accepted.
+
+    Raises:
+        ValueError: If the country is not recognised
+    """
+    code = alpha3_for(country)
+    if code is None:
+        raise ValueError(f"Unknown country: {country}")
+    return code
+
+
+class QueryEngine:
+    """
+    Runs the model's tool calls against the dashboard data.
+
+    Tools are read-only analytic functions with typed arguments, built on the same
+    dataset items as the dashboard sections: the spender index, the date indexes and
+    the aggregate cube. Items are read on first use, so a tool computes only what
+    it needs.
+
+    Parameters:
+        data (LazyDataset): Dataset of the dashboard
+    """
+
+    def __init__(self, data):
+        self.data = data
+
+    def execute(self, call):
+        """
+        Validates and runs a tool call.
+
+        Parameters:
+            call (dict): `tool` name and `arguments` dict
+
+        Returns:
+            pd.DataFrame: Result of the tool
+
+        Raises:
+            ValueError: If the tool is unknown or an argument is invalid
+        """
+        name = call.get('tool')
+        if name not in TOOLS:
+            raise ValueError(f"Unknown tool: {name}")
+        _, parameters = TOOLS[name]
+
+        arguments = call.get('arguments') or {}
+        unknown = set(arguments) - set(parameters)
+        if unknown:
+            raise ValueError(f"Unknown arguments for {name}: {', '.join(sorted(unknown))}")
+
+        values = {
+            parameter_name: parameter.coerce(parameter_name, arguments.get(parameter_name))
+            for parameter_name, parameter in parameters.items()
+        }
+        if 'country' in values and values['country'] is not None:
+            values['country'] = resolve_country(values['country'])
+
+        result = getattr(self, name)(**values)
+        return result.head(MAX_RESULT_ROWS).reset_index(drop=True)
+
+    def _client_mask(self, client_ids, country=None, tier=None):
+        """
+        Marks the clients matching the country and tier filters.
+        """
+        mask = np.ones(len(client_ids), dtype=bool)
+        if country is not None:
+            clients = self.data['clients'].drop_duplicates('client_id').set_index('client_id')
+            mask &= (clients['country_code'].reindex(client_ids).astype(object) == country).to_numpy()
+        if tier is not None:
+            memberships = self.data['memberships'].drop_duplicates('client_id').set_index('client_id')
+            mask &= (memberships['tier'].reindex(client_ids).astype(object) == tier).to_numpy()
+        return mask
+
+    def _spender_index(self, start_date, end_date):
+        """
+        The spender index when it was built, otherwise one built from the transactions
+        of the range, so both answer the same.
+        """
+        spender_index = self.data['spender_index']
+        if spender_index is not None:
+            return spender_index
+        transactions = self.data['transactions_index'].slice(start_date, day_end(end_date))
+        return SpenderIndex(self.data['clients'], self.data['memberships'], transactions)
+
+    def top_spenders(self, start_date, end_date, k, country, tier):
+        return self._spender_index(start_date, end_date).top_k(
+            start_date, end_date, k=k,
+            tiers=[tier] if tier else None,
+            countries=[country] if country else None
+        )
+
+    def total_spend(self, start_date, end_date, country, tier):
+        if country is None and tier is None:
+            index = self.data['transactions_index']
+            end = day_end(end_date)
+            return pd.DataFrame({
+                'total_amount': [index.total(start_date, end)],
+                'transactions': [index.count(start_date, end)],
+            })
+
+        transactions = self.data['transactions_index'].slice(start_date, day_end(end_date))
+        mask = self._client_mask(transactions['client_id'].to_numpy(), country, tier)
+        return pd.DataFrame({
+            'total_amount': [transactions['amount'].to_numpy()[mask].sum()],
+            'transactions': [int(mask.sum())],
+        })
+
+    def count_clients(self, country, tier, min_age, max_age):
+        clients = self.data['clients'].drop_duplicates('client_id')
+        mask = self._client_mask(clients['client_id'].to_numpy(), country, tier)
+        if min_age is not None:
+            mask &= (clients['age'] >= min_age).to_numpy()
+        if max_age is not None:
+            mask &= (clients['age'] <= max_age).to_numpy()
+        return pd.DataFrame({'clients': [int(mask.sum())]})
+
+    def clients_by(self, dimension, top):
+        if dimension == 'tier':
+            counts = self.data['aggregate_cube'].tier_counts().rename(columns={'count': 'clients'})
+            return counts.head(top)
+
+        clients = self.data['clients'].drop_duplicates('client_id')
+        if dimension == 'country':
+            counts = clients['country_code'].value_counts().head(top).rename_axis('country_code')
+            counts = counts.reset_index(name='clients')
+            counts.insert(0, 'country', map_country_names(counts['country_code']))
+            return counts
+
+        groups = pd.cut(clients['age'], bins=AGE_BINS, labels=AGE_LABELS).value_counts(sort=False)
+        return groups.rename_axis('age_group').reset_index(name='clients')
+
+    def retention_by_tier(self):
+        return self.data['aggregate_cube'].retention_by_tier()
+
+    def average_spending_by_tier(self):
+        spending = self.data['aggregate_cube'].average_spending_by_tier(TIER_ORDER)
+        spending['tier'] = spending['tier'].astype(str)
+        return spending.rename(columns={'amount': 'average_amount'})
+
+    def monthly_signups(self, start_date, end_date, fact):
+        name = 'New Clients' if fact == 'clients' else 'New Memberships'
+        counts = self.data['aggregate_cube'].monthly_counts(fact, start_date, end_date, name)
+        counts['Month'] = counts['Month'].dt.strftime('%Y-%m')
+        return counts
+
+
+def tool_instructions(today):
+    """
+    Describes the tools to the model, so it can reply with a tool call instead of an
+    answer when a tool computes what the question asks.
+
+    Parameters:
+        today (pd.Timestamp): Date relative dates are resolved against
+
+    Returns:
+        str: Prompt section listing the tools and the reply format
+    """
+    tools = "\n".join(
+        f"- {name}({', '.join(parameter.signature(p) for p, parameter in parameters.items())}): {description}"
+        for name, (description, parameters) in TOOLS.items()
+    )
+    return f"""
+These tools compute exact answers from the customer data platform:
+{tools}
+
+If one of them answers the question, reply with one JSON object and nothing else:
+{{"tool": "<name>", "arguments": {{...}}}}, dates as YYYY-MM-DD. Otherwise answer in plain text.
+Today: {today.date().isoformat()}
+"""
+
+
+def parse_tool_call(text):
+    """
+    Reads the JSON tool call from a model response.
+
+    Parameters:
+        text (str): Model response, possibly wrapped in a code fence
+
+    Returns:
+        dict: The call, or None if the response holds no tool call
+    """
+    match = re.search(r"\{.*\}", text or "", re.DOTALL)
+    if match is None:
+        return None
+    try:
+        call = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(call, dict) or not call.get('tool'):
+        return None
+    return call
+
+
+def format_result(call, result):
+    """
+    Renders a tool result as a Markdown answer that shows what was computed.
+
+    Parameters:
+        call (dict): The executed call
+        result (pd.DataFrame): Its result
+
+    Returns:
+        str: Markdown answer
+    """
+    arguments = ", ".join(f"{key}={value}" for key, value in (call.get('arguments') or {}).items())
+    lines = [f"`{call['tool']}({arguments})`", ""]
+    if result.empty:
+        lines.append("No matching data.")
+        return "\n".join(lines)
+
+    def cell(value):
+        if isinstance(value, (float, np.floating)):
+            return f"{value:,.2f}"
+        return str(value)
+
+    lines.append("| " + " | ".join(str(column) for column in result.columns) + " |")
+    lines.append("|" + "---|" * len(result.columns))
+    for row in result.itertuples(index=False):
+        lines.append("| " + " | ".join(cell(value) for value in row) + " |")
+    return "\n".join(lines)
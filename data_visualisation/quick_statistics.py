@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
+from data_visualisation.dashboard_sections import dashboard_section
 
+@dashboard_section("Quick Statistics")
 def display_quick_statistics(clients, merged_data, transactions):
     """
     Displays the Quick Statistics section of the dashboard.
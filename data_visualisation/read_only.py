@@ -0,0 +1,127 @@
+import pandas as pd
+
+# Frames served by the dataset are shared by every session. The app turns on pandas'
+# copy-on-write at startup, so a frame derived from them (a selection, a column, a
+# shallow copy) copies the data it changes instead of writing through to the shared frame
+
+# Methods that modify a frame when called with inplace=True
+INPLACE_METHODS = (
+    'clip', 'drop', 'drop_duplicates', 'dropna', 'eval', 'fillna', 'interpolate', 'mask',
+    'query', 'rename', 'rename_axis', 'replace', 'reset_index', 'set_axis', 'set_index',
+    'sort_index', 'sort_values', 'where',
+)
+
+
+def _refuse(action):
+    raise TypeError(
+        f"Cannot {action} a shared dataset frame; derive a new frame instead, "
+        f"e.g. with assign(), or work on a copy()"
+    )
+
+
+class _ReadOnlyIndexer:
+    """
+    .loc, .iloc, .at or .iat of a read-only frame: selections work, assignments raise.
+    """
+
+    def __init__(self, indexer):
+        self._indexer = indexer
+
+    def __getitem__(self, key):
+        return self._indexer[key]
+
+    def __setitem__(self, key, value):
+        _refuse("assign to cells of")
+
+    def __call__(self, *args, **kwargs):
+        return _ReadOnlyIndexer(self._indexer(*args, **kwargs))
+
+
+class ReadOnlyFrame(pd.DataFrame):
+    """
+    DataFrame that refuses to be modified: assigning or deleting columns or cells,
+    renaming the axes and in-place methods raise a TypeError. Everything derived
+    from it (selections, merges, copies) is an ordinary DataFrame.
+    """
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    @property
+    def loc(self):
+        return _ReadOnlyIndexer(super().loc)
+
+    @property
+    def iloc(self):
+        return _ReadOnlyIndexer(super().iloc)
+
+    @property
+    def at(self):
+        return _ReadOnlyIndexer(super().at)
+
+    @property
+    def iat(self):
+        return _ReadOnlyIndexer(super().iat)
+
+    def __setitem__(self, key, value):
+        _refuse(f"assign column {key!r} of")
+
+    def __delitem__(self, key):
+        _refuse(f"delete column {key!r} of")
+
+    def __setattr__(self, name, value):
+        if name in ('columns', 'index') or (not name.startswith('_') and name in self.columns):
+            _refuse(f"set {name!r} of")
+        super().__setattr__(name, value)
+
+    def insert(self, *args, **kwargs):
+        _refuse("insert a column into")
+
+    def pop(self, item):
+        _refuse(f"pop column {item!r} from")
+
+    def update(self, *args, **kwargs):
+        _refuse("update")
+
+
+def _guard_inplace(name):
+    method = getattr(pd.DataFrame, name)
+
+    def guarded(self, *args, **kwargs):
+        if kwargs.get('inplace'):
+            _refuse(f"call {name}(inplace=True) on")
+        return method(self, *args, **kwargs)
+
+    guarded.__name__ = name
+    guarded.__doc__ = method.__doc__
+    return guarded
+
+
+for _name in INPLACE_METHODS:
+    setattr(ReadOnlyFrame, _name, _guard_inplace(_name))
+
+
+def read_only(value):
+    """
+    Wraps frames so they can be shared between sessions without being copied.
+
+    The wrapper shares the frame's data; with copy-on-write on, the conversion is a
+    shallow copy. Tuples and lists are wrapped item by item; other values are
+    returned as they are.
+
+    Parameters:
+        value: Value to share
+
+    Returns:
+        The value, with every DataFrame as a ReadOnlyFrame
+    """
+    if isinstance(value, ReadOnlyFrame):
+        return value
+    if isinstance(value, pd.DataFrame):
+        return ReadOnlyFrame(value)
+    if isinstance(value, tuple) and not hasattr(value, '_fields'):
+        return tuple(read_only(item) for item in value)
+    if isinstance(value, list):
+        return [read_only(item) for item in value]
+    return value
@@ -0,0 +1,164 @@
+import collections
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+# Cached answers kept in memory, least recently used evicted first
+RESPONSE_CACHE_ENTRIES = 256
+
+# Answers older than this are asked again
+RESPONSE_CACHE_TTL = 24 * 3600
+
+
+def get_response_cache_dir():
+    """
+    Returns the directory holding cached answers, configurable with RESPONSE_CACHE_DIR.
+    Set it to an empty string to keep answers in memory only.
+    """
+    return os.getenv("RESPONSE_CACHE_DIR", ".cache/chat_responses")
+
+
+def normalise_question(question):
+    """
+    Normalises a question so trivially different phrasings share a cache entry:
+    lowercase, single spaces, no trailing punctuation.
+
+    Parameters:
+        question (str): User question
+
+    Returns:
+        str: Normalised question
+    """
+    return re.sub(r"\s+", " ", question.lower()).strip().rstrip("?!. ")
+
+
+def data_version(chunks):
+    """
+    Hashes the context the chatbot answers from, so cached answers expire with the data.
+
+    Parameters:
+        chunks (list): (heading, body) tuples
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    return hashlib.sha256(json.dumps(chunks).encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Chatbot answers by question and data version, with TTL and LRU eviction in
+    memory and an optional directory of JSON files that outlives the process.
+
+    Parameters:
+        max_entries (int): Answers kept in memory
+        ttl (float): Seconds an answer stays valid
+        directory (str, optional): Directory of the on-disk entries; memory only if empty
+    """
+
+    def __init__(self, max_entries=RESPONSE_CACHE_ENTRIES, ttl=RESPONSE_CACHE_TTL, directory=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.directory = get_response_cache_dir() if directory is None else directory
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(question, version, model=""):
+        """
+        Cache key of a question asked against one version of the data.
+
+        Parameters:
+            question (str): User question
+            version (str): Data version from data_version
+            model (str): Model answering, so models do not share answers
+
+        Returns:
+            str: SHA-256 hex digest
+        """
+        payload = json.dumps([normalise_question(question), version, model])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """
+        Returns the cached answer, or None if there is none or it has expired.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry['created_at'] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    return entry['response']
+                del self._entries[key]
+
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if now - entry['created_at'] > self.ttl:
+            self._remove_file(key)
+            return None
+
+        self._remember(key, entry)
+        return entry['response']
+
+    def set(self, key, response):
+        """
+        Caches an answer in memory and, if configured, on disk.
+        """
+        entry = {'created_at': time.time(), 'response': response}
+        self._remember(key, entry)
+        if not self.directory:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            staging = f"{self._path(key)}.tmp-{os.getpid()}-{threading.get_ident()}"
+            with open(staging, 'w', encoding='utf-8') as file:
+                json.dump(entry, file)
+            os.replace(staging, self._path(key))
+            self._prune_directory()
+        except OSError as e:
+            print(f"Warning: Could not write cached response: {str(e)}")
+
+    def _prune_directory(self):
+        """
+        Keeps the newest `max_entries` files on disk, like the in-memory LRU.
+        """
+        paths = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory) if name.endswith('.json')
+        ]
+        if len(paths) <= self.max_entries:
+            return
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _remove_file(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def __len__(self):
+        return len(self._entries)
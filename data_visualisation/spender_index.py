@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+
+
+class SpenderIndex:
+    """
+    Per-client cumulative spend by day, for top-K spender queries over any date range.
+
+    Transactions are summed per (client, day) and stored sorted by client, then day,
+    with running totals alongside, so the index grows with the number of transactions
+    rather than with clients × days. A date range's per-client totals are two
+    vectorised `searchsorted` lookups per client and a difference of running totals.
+    The top K are picked with a partial selection and only the winners are joined
+    with names. Tier and country filters are client masks and never touch the
+    transactions.
+
+    Parameters:
+        clients (pd.DataFrame): Processed clients data
+        memberships (pd.DataFrame): Processed memberships data, or None for no tiers
+        transactions (pd.DataFrame): Processed transactions data
+    """
+
+    def __init__(self, clients, memberships, transactions):
+        unique_clients = clients.drop_duplicates('client_id').sort_values('client_id')
+        self.client_ids = unique_clients['client_id'].to_numpy()
+        self.names = unique_clients['name'].to_numpy() if 'name' in unique_clients else None
+        self.countries = (
+            unique_clients['country_code'].astype(object).to_numpy()
+            if 'country_code' in unique_clients else None
+        )
+        if memberships is not None:
+            tiers = memberships.drop_duplicates('client_id').set_index('client_id')['tier']
+            self.tiers = tiers.reindex(self.client_ids).astype(object).to_numpy()
+        else:
+            self.tiers = np.full(len(self.client_ids), None, dtype=object)
+
+        # Keep transactions of known clients with a date, like the merge with clients did
+        transaction_clients = transactions['client_id'].to_numpy()
+        dates = transactions['date'].to_numpy(dtype='datetime64[ns]')
+        known = ~np.isnat(dates) & np.isin(transaction_clients, self.client_ids)
+        columns = np.searchsorted(self.client_ids, transaction_clients[known]).astype('int64')
+        days = dates[known].astype('datetime64[D]').astype('int64')
+
+        # One key per (client, day): the client's position times the days spanned, plus the day
+        self.first_day = int(days.min()) if len(days) else 0
+        self.n_days = int(days.max()) - self.first_day + 1 if len(days) else 0
+        keys = columns * self.n_days + (days - self.first_day)
+
+        # Sum each (client, day), then keep running totals over the sorted keys
+        order = np.argsort(keys, kind='stable')
+        self.keys, starts = np.unique(keys[order], return_index=True)
+        amounts = transactions['amount'].to_numpy(dtype='float64')[known][order]
+        daily = np.add.reduceat(amounts, starts) if len(starts) else np.zeros(0)
+        self.cumulative = np.concatenate([[0.0], np.cumsum(daily)])
+
+    def totals(self, start_date, end_date):
+        """
+        Total spend per client between two dates, both days included in full.
+
+        Parameters:
+            start_date (pd.Timestamp): First day of the range
+            end_date (pd.Timestamp): Last day of the range
+
+        Returns:
+            np.ndarray: Spend per client, aligned with `client_ids`
+        """
+        n_clients = len(self.client_ids)
+        lo = max(_day_number(start_date) - self.first_day, 0)
+        hi = min(_day_number(end_date) - self.first_day, self.n_days - 1)
+        if hi < lo:
+            return np.zeros(n_clients)
+
+        # Each client's keys are contiguous; find the range's first and last day within them
+        base = np.arange(n_clients, dtype='int64') * self.n_days
+        first = np.searchsorted(self.keys, base + lo, side='left')
+        last = np.searchsorted(self.keys, base + hi, side='right')
+        return self.cumulative[last] - self.cumulative[first]
+
+    def top_k(self, start_date, end_date, k=5, tiers=None, countries=None):
+        """
+        The K clients with the highest spend between two dates.
+
+        Parameters:
+            start_date (pd.Timestamp): First day of the range
+            end_date (pd.Timestamp): Last day of the range
+            k (int): Number of clients to return
+            tiers (list, optional): Only consider clients in these membership tiers
+            countries (list, optional): Only consider clients with these country codes
+
+        Returns:
+            pd.DataFrame: `client_id`, `name` and `amount`, highest spend first
+        """
+        totals = self.totals(start_date, end_date)
+
+        # Clients without spend in the range are not ranked
+        candidates = totals > 0
+        if tiers:
+            candidates &= np.isin(self.tiers, tiers)
+        if countries and self.countries is not None:
+            candidates &= np.isin(self.countries, countries)
+
+        positions = np.flatnonzero(candidates)
+        if len(positions) > k:
+            best = np.argpartition(totals[positions], -k)[-k:]
+            positions = positions[best]
+        positions = positions[np.argsort(-totals[positions], kind='stable')]
+
+        return pd.DataFrame({
+            'client_id': self.client_ids[positions],
+            'name': self.names[positions] if self.names is not None else None,
+            'amount': totals[positions],
+        })
+
+    def tier_options(self):
+        """
+        Membership tiers that can be used as a filter.
+        """
+        return sorted({tier for tier in self.tiers if isinstance(tier, str)})
+
+    def country_options(self):
+        """
+        Country codes that can be used as a filter.
+        """
+        if self.countries is None:
+            return []
+        return sorted({country for country in self.countries if isinstance(country, str)})
+
+
+def _day_number(date):
+    """
+    Days since 1970-01-01 of the day a date falls on.
+    """
+    return int(np.datetime64(pd.Timestamp(date), 'D').astype('int64'))
+
+
+def build_spender_index(clients, memberships, transactions):
+    """
+    Builds the spender index.
+
+    Parameters:
+        clients (pd.DataFrame): Processed clients data
+        memberships (pd.DataFrame): Processed memberships data
+        transactions (pd.DataFrame): Processed transactions data
+
+    Returns:
+        SpenderIndex: The index
+    """
+    return SpenderIndex(clients, memberships, transactions)
@@ -0,0 +1,375 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from data_visualisation.data_preprocessor import DTYPE_PLAN, prepare_transactions
+
+# Chunked preprocessing for transaction tables too large to hold in memory. The
+# dashboard does not use it: IncrementalMongoLoader keeps the whole table, and only
+# benchmarks/streaming_benchmark.py runs this module.
+
+# Rows per chunk when no memory budget is set
+CHUNK_ROWS = 100_000
+
+# Set PREPROCESS_MEMORY_BUDGET_MB to bound the memory used by one chunk in flight
+MEMORY_BUDGET_MB = os.getenv("PREPROCESS_MEMORY_BUDGET_MB")
+
+# Share of the budget a raw chunk may use: while it is prepared, the rows it was
+# combined from, its prepared copy and the groupby buffers are alive at the same time
+BUDGET_SHARE = 0.25
+
+# Rows first read from a source sized by the budget, to learn its bytes per row.
+# Later reads are as large as a raw chunk may be: reading one takes less than
+# preparing it, as the documents of a cursor take about three times the frame built
+# from them, and an Arrow batch less than its frame
+PROBE_ROWS = 1_000
+
+# Chunks this much over the target size are kept whole: splitting one would copy its
+# small remainder into the next chunk
+SPLIT_TOLERANCE = 0.1
+
+# Partition column types per DTYPE_PLAN kind. prepare_transactions picks some types
+# per chunk, e.g. int32 client ids only when they fit, so the files use the widest
+PARTITION_TYPES = {
+    'id': pa.int64(),
+    'datetime': pa.timestamp('ns'),
+    'float64': pa.float64(),
+}
+
+
+def _memory_budget(memory_budget):
+    """
+    The budget given, or the one set in PREPROCESS_MEMORY_BUDGET_MB, in bytes.
+    """
+    if memory_budget is None and MEMORY_BUDGET_MB:
+        return int(float(MEMORY_BUDGET_MB) * 2**20)
+    return memory_budget
+
+
+def budget_rows(memory_budget, bytes_per_row):
+    """
+    Rows of a raw chunk that fit in its share of the memory budget.
+
+    Parameters:
+        memory_budget (int): Bytes one chunk in flight may use
+        bytes_per_row (float): Frame bytes per row seen so far
+
+    Returns:
+        int: Rows per chunk, at least one
+    """
+    return max(1, int(memory_budget * BUDGET_SHARE // bytes_per_row))
+
+
+def iter_frame_chunks(frame, chunk_rows=CHUNK_ROWS):
+    """
+    Yields consecutive row slices of an in-memory frame.
+
+    Parameters:
+        frame (pd.DataFrame): Raw frame
+        chunk_rows (int): Rows per chunk
+
+    Yields:
+        pd.DataFrame: Views of the frame, without copying
+    """
+    for start in range(0, len(frame), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows]
+
+
+def iter_mongo_chunks(collection, projection=None, chunk_rows=CHUNK_ROWS, query=None, memory_budget=None):
+    """
+    Reads a collection cursor in chunks of raw documents.
+
+    With a memory budget, the first PROBE_ROWS documents measure the bytes per row,
+    and every later chunk holds as many documents as fit in a raw chunk's share of it.
+
+    Parameters:
+        collection (pymongo.collection.Collection): Collection to read
+        projection (dict, optional): Fields to fetch
+        chunk_rows (int): Documents per chunk when no memory budget is set; also the
+            server batch size
+        query (dict, optional): Filter, e.g. an `_id` range
+        memory_budget (int, optional): Bytes one chunk in flight may use; defaults to
+            PREPROCESS_MEMORY_BUDGET_MB
+
+    Yields:
+        pd.DataFrame: Raw documents of one chunk
+    """
+    memory_budget = _memory_budget(memory_budget)
+    if memory_budget is not None:
+        chunk_rows = PROBE_ROWS
+    bytes_per_row = 0.0
+
+    documents = []
+    for document in collection.find(query or {}, projection, batch_size=chunk_rows):
+        documents.append(document)
+        if len(documents) >= chunk_rows:
+            chunk = pd.DataFrame(documents)
+            documents = []
+            if memory_budget is not None:
+                bytes_per_row = max(bytes_per_row, frame_bytes(chunk) / len(chunk))
+                chunk_rows = budget_rows(memory_budget, bytes_per_row)
+            yield chunk
+    if documents:
+        yield pd.DataFrame(documents)
+
+
+def iter_parquet_chunks(path, columns=None, chunk_rows=CHUNK_ROWS, memory_budget=None):
+    """
+    Reads a Parquet file in record batches, one row group slice at a time.
+
+    With a memory budget, the bytes per row of the first PROBE_ROWS rows size the
+    batches to a raw chunk's share of it.
+
+    Parameters:
+        path (str): Parquet file
+        columns (list, optional): Columns to read
+        chunk_rows (int): Rows per chunk when no memory budget is set
+        memory_budget (int, optional): Bytes one chunk in flight may use; defaults to
+            PREPROCESS_MEMORY_BUDGET_MB
+
+    Yields:
+        pd.DataFrame: Rows of one batch
+    """
+    file = pq.ParquetFile(path)
+    memory_budget = _memory_budget(memory_budget)
+    if memory_budget is not None:
+        probe = next(file.iter_batches(batch_size=PROBE_ROWS, columns=columns), None)
+        if probe is None or probe.num_rows == 0:
+            return
+        probe = probe.to_pandas()
+        chunk_rows = budget_rows(memory_budget, frame_bytes(probe) / len(probe))
+        del probe
+
+    for batch in file.iter_batches(batch_size=chunk_rows, columns=columns):
+        yield batch.to_pandas()
+
+
+def frame_bytes(frame):
+    """
+    Memory held by a frame, strings included.
+    """
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+def bounded_chunks(chunks, memory_budget):
+    """
+    Regroups chunks so each holds as many rows as fit in the memory budget.
+
+    Small chunks are combined and large ones split, using the bytes per row seen so
+    far, so that a chunk and everything allocated while preparing it stay within the budget.
+
+    Parameters:
+        chunks (iterable): Raw frames of any size
+        memory_budget (int): Bytes one chunk in flight may use
+
+    Yields:
+        pd.DataFrame: Raw frames of about `memory_budget * BUDGET_SHARE` bytes
+    """
+    target = memory_budget * BUDGET_SHARE
+    pending, pending_rows = [], 0
+    bytes_per_row = None
+
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        chunk_bytes_per_row = frame_bytes(chunk) / len(chunk)
+        bytes_per_row = chunk_bytes_per_row if bytes_per_row is None else max(bytes_per_row, chunk_bytes_per_row)
+        rows_per_chunk = max(1, int(target // bytes_per_row))
+
+        pending.append(chunk)
+        pending_rows += len(chunk)
+        while pending_rows >= rows_per_chunk:
+            combined = pd.concat(pending) if len(pending) > 1 else pending[0]
+            if len(combined) <= rows_per_chunk * (1 + SPLIT_TOLERANCE):
+                yield combined
+                pending, pending_rows = [], 0
+                break
+            yield combined.iloc[:rows_per_chunk]
+            rest = combined.iloc[rows_per_chunk:]
+            pending, pending_rows = ([rest], len(rest)) if len(rest) else ([], 0)
+
+    if pending:
+        yield pd.concat(pending) if len(pending) > 1 else pending[0]
+
+
+class RunningAggregates:
+    """
+    Transaction aggregates kept up to date chunk by chunk, so the dashboard totals
+    are known without the full table: totals, the date range, spend per day and
+    spend per client.
+    """
+
+    def __init__(self):
+        self.transactions = 0
+        self.total_amount = 0.0
+        self.first_date = None
+        self.last_date = None
+        self.daily_totals = pd.Series(dtype='float64')
+        self.client_totals = pd.Series(dtype='float64')
+
+    def update(self, transactions):
+        """
+        Adds a chunk of prepared transactions.
+
+        Parameters:
+            transactions (pd.DataFrame): Chunk from prepare_transactions
+        """
+        if transactions.empty:
+            return
+        self.transactions += len(transactions)
+        self.total_amount += float(transactions['amount'].sum())
+
+        dates = transactions['date'].dropna()
+        if not dates.empty:
+            first, last = dates.min(), dates.max()
+            self.first_date = first if self.first_date is None else min(self.first_date, first)
+            self.last_date = last if self.last_date is None else max(self.last_date, last)
+
+        daily = transactions.groupby(transactions['date'].dt.normalize())['amount'].sum()
+        self.daily_totals = self.daily_totals.add(daily, fill_value=0)
+        per_client = transactions.groupby('client_id')['amount'].sum()
+        self.client_totals = self.client_totals.add(per_client, fill_value=0)
+
+    def top_spenders(self, k=5):
+        """
+        The K clients with the highest spend over all transactions.
+
+        Returns:
+            pd.DataFrame: `client_id` and `amount`, highest spend first
+        """
+        top = self.client_totals.nlargest(k)
+        return pd.DataFrame({'client_id': top.index.astype('int64'), 'amount': top.to_numpy()})
+
+
+class PartitionWriter:
+    """
+    Writes prepared chunks as Parquet files partitioned by month, like the
+    transactions table of the snapshot. Columns of the dtype plan always get their
+    PARTITION_TYPES type; other columns take the type of the first chunk, widened when
+    a later chunk needs it (an all-null column, or int32 then int64).
+
+    Parameters:
+        directory (str): Directory to write; replaced if it exists
+        date_column (str): Column the partitions are split on
+    """
+
+    def __init__(self, directory, date_column='date'):
+        self.directory = directory
+        self.date_column = date_column
+        self.schema = None
+        self.chunks = 0
+        self.files = []
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+
+    def write(self, frame):
+        """
+        Appends a prepared chunk, one file per month it covers.
+
+        Raises:
+            ValueError: If the chunk's columns differ from the first chunk's, or a
+                column's type cannot be combined with the earlier chunks'
+        """
+        if frame.empty:
+            return
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        try:
+            if self.schema is None:
+                schema = _planned_schema(table.schema.remove_metadata())
+            else:
+                table = table.select(self.schema.names)
+                schema = pa.unify_schemas(
+                    [self.schema, _planned_schema(table.schema.remove_metadata())],
+                    promote_options='permissive'
+                )
+            table = table.cast(schema)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, KeyError) as e:
+            raise ValueError(f"Chunk does not match the partition schema: {str(e)}")
+        self.schema = schema
+
+        # Factorising periods is much faster than formatting every date as text
+        codes, months = pd.factorize(frame[self.date_column].dt.to_period('M'), sort=True)
+        labels = [str(month) for month in months] + (['unknown'] if (codes < 0).any() else [])
+        for code, month in enumerate(labels):
+            rows = np.flatnonzero(codes == (code if code < len(months) else -1))
+            path = os.path.join(self.directory, f"part-{month}-{self.chunks:05d}.parquet")
+            pq.write_table(table.take(rows), path)
+            self.files.append(path)
+        self.chunks += 1
+
+
+def _planned_schema(schema):
+    """
+    Replaces the types of the dtype plan's columns with their PARTITION_TYPES type.
+    """
+    plan = DTYPE_PLAN['transactions']
+    return pa.schema([
+        field.with_type(PARTITION_TYPES[plan[field.name]]) if plan.get(field.name) in PARTITION_TYPES else field
+        for field in schema
+    ])
+
+
+def read_partitions(directory, start_date=None, end_date=None, columns=None):
+    """
+    Reads written partitions back, skipping months outside a date range.
+
+    Parameters:
+        directory (str): Directory written by PartitionWriter
+        start_date (pd.Timestamp, optional): First day to read
+        end_date (pd.Timestamp, optional): Last day to read
+        columns (list, optional): Columns to read
+
+    Returns:
+        pd.DataFrame: The matching rows
+    """
+    first = pd.Timestamp(start_date).strftime('%Y-%m') if start_date is not None else None
+    last = pd.Timestamp(end_date).strftime('%Y-%m') if end_date is not None else None
+
+    parts = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.parquet'):
+            continue
+        month = name[len('part-'):len('part-YYYY-MM')]
+        if month != 'unknown' and ((first and month < first) or (last and month > last)):
+            continue
+        parts.append(pq.read_table(os.path.join(directory, name), columns=columns, memory_map=True))
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    # Files written before a column was widened have the narrower type
+    return pa.concat_tables(parts, promote_options='permissive').to_pandas()
+
+
+def stream_preprocess_transactions(chunks, directory=None, memory_budget=None):
+    """
+    Preprocesses transactions chunk by chunk: the same client_id cleaning, date
+    coercion and amount filtering as prepare_transactions, without ever holding the
+    whole table. Prepared chunks feed the running aggregates and, if a directory is
+    given, are written as monthly Parquet partitions.
+
+    Parameters:
+        chunks (iterable): Raw transaction frames, e.g. from iter_mongo_chunks or
+            iter_parquet_chunks given the same memory budget, so reading a chunk
+            stays within it too
+        directory (str, optional): Where to write the partitions
+        memory_budget (int, optional): Bytes one chunk in flight may use; defaults to
+            PREPROCESS_MEMORY_BUDGET_MB; chunks are taken as they come if not set
+
+    Returns:
+        tuple: RunningAggregates, and the PartitionWriter or None
+    """
+    memory_budget = _memory_budget(memory_budget)
+    if memory_budget is not None:
+        chunks = bounded_chunks(chunks, memory_budget)
+
+    aggregates = RunningAggregates()
+    writer = PartitionWriter(directory) if directory else None
+    for raw_chunk in chunks:
+        transactions = prepare_transactions(raw_chunk)
+        aggregates.update(transactions)
+        if writer is not None:
+            writer.write(transactions)
+        del raw_chunk, transactions
+    return aggregates, writer
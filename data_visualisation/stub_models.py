@@ -0,0 +1,137 @@
+import calendar
+import json
+import re
+
+import pandas as pd
+from data_visualisation.country_resolver import alpha3_for
+from data_visualisation.llm_client import StubClient
+from data_visualisation.membership_spending import TIER_ORDER
+
+MONTHS = [month.lower() for month in calendar.month_name if month]
+
+
+class StubToolModel(StubClient):
+    """
+    Deterministic stand-in for the model when tools are offered: maps keywords of the
+    question to a tool call, and otherwise answers like StubClient, so the query
+    engine can be checked end to end offline.
+
+    Parameters:
+        delay (float): Seconds to wait before each streamed word, to mimic a remote model
+    """
+
+    def __init__(self, delay=0.0):
+        super().__init__(delay)
+        self.name = "stub-tools"
+
+    def generate(self, prompt):
+        """
+        Answers a prompt with a JSON tool call when it offers tools and one fits the
+        question, with the headings of its context sections otherwise.
+
+        Parameters:
+            prompt (str): Full prompt; the question is on its last 'Question: ' line and
+                today's date on a 'Today: ' line from query_engine.tool_instructions
+
+        Returns:
+            str: JSON tool call or deterministic answer
+        """
+        questions = re.findall(r"^Question: (.*)$", prompt, re.MULTILINE)
+        today = re.search(r"^Today: (.*)$", prompt, re.MULTILINE)
+        if questions and today:
+            call = self.plan(questions[-1], pd.Timestamp(today.group(1)))
+            if call['tool'] is not None:
+                self.last_prompt = prompt
+                self.calls += 1
+                return json.dumps(call)
+        return super().generate(prompt)
+
+    def plan(self, question, today):
+        """
+        Picks the tool and arguments for a question.
+
+        Parameters:
+            question (str): User question
+            today (pd.Timestamp): Date relative dates are resolved against
+
+        Returns:
+            dict: Tool call, with a `tool` of None if no tool fits
+        """
+        text = question.lower()
+        start, end = self._date_range(text, today)
+        filters = {}
+        country = self._country(question)
+        if country is not None:
+            filters['country'] = country
+        tier = next((tier for tier in TIER_ORDER if tier.lower() in text), None)
+        if tier is not None:
+            filters['tier'] = tier
+        dates = {'start_date': start.date().isoformat(), 'end_date': end.date().isoformat()}
+
+        if 'retention' in text:
+            return {'tool': 'retention_by_tier', 'arguments': {}}
+        if 'average' in text and 'spend' in text:
+            return {'tool': 'average_spending_by_tier', 'arguments': {}}
+        if 'top' in text and ('spender' in text or 'spent' in text or 'spend' in text):
+            k = re.search(r"top (\d+)", text)
+            arguments = {**dates, **filters}
+            if k:
+                arguments['k'] = int(k.group(1))
+            return {'tool': 'top_spenders', 'arguments': arguments}
+        if 'signup' in text or 'sign up' in text or 'joined' in text:
+            fact = 'memberships' if 'membership' in text else 'clients'
+            return {'tool': 'monthly_signups', 'arguments': {**dates, 'fact': fact}}
+        if any(word in text for word in ('total', 'revenue', 'sales', 'spend', 'amount')):
+            return {'tool': 'total_spend', 'arguments': {**dates, **filters}}
+        for dimension, words in [('country', ('country', 'countries')), ('tier', ('tier',)),
+                                 ('age_group', ('age group', 'ages'))]:
+            if ' by ' in text and any(word in text for word in words):
+                return {'tool': 'clients_by', 'arguments': {'dimension': dimension}}
+        if 'how many' in text and ('client' in text or 'member' in text):
+            return {'tool': 'count_clients', 'arguments': filters}
+        return {'tool': None}
+
+    @staticmethod
+    def _date_range(text, today):
+        """
+        Reads a date range from phrases like 'last quarter', 'last 30 days', 'in 2024'
+        or 'March 2024'; the last twelve months otherwise.
+        """
+        today = today.normalize()
+        days = re.search(r"last (\d+) days", text)
+        if days:
+            return today - pd.Timedelta(days=int(days.group(1)) - 1), today
+        if 'last quarter' in text:
+            current = today.to_period('Q')
+            return (current - 1).start_time, (current - 1).end_time.normalize()
+        if 'last month' in text:
+            current = today.to_period('M')
+            return (current - 1).start_time, (current - 1).end_time.normalize()
+        if 'last year' in text:
+            year = pd.Period(today.year - 1, freq='Y')
+            return year.start_time, year.end_time.normalize()
+        if 'this year' in text:
+            return pd.Timestamp(year=today.year, month=1, day=1), today
+
+        month = re.search(rf"({'|'.join(MONTHS)}) (\d{{4}})", text)
+        if month:
+            period = pd.Period(f"{month.group(1)} {month.group(2)}", freq='M')
+            return period.start_time, period.end_time.normalize()
+        year = re.search(r"\b(20\d{2})\b", text)
+        if year:
+            period = pd.Period(int(year.group(1)), freq='Y')
+            return period.start_time, period.end_time.normalize()
+        return today - pd.DateOffset(years=1), today
+
+    @staticmethod
+    def _country(question):
+        """
+        Finds a country named after 'in' or 'from', e.g. 'in Germany'.
+        """
+        for match in re.finditer(r"\b(?:in|from)\s+((?:[A-Z][a-z]+\s?)+)", question):
+            candidate = match.group(1).strip()
+            if candidate.lower().split()[0] in MONTHS:
+                continue
+            if alpha3_for(candidate) is not None:
+                return candidate
+        return None
@@ -3,8 +3,14 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from data_visualisation.dashboard_sections import dashboard_section, plotly_chart
 
-def display_temporal_trends(clients, memberships):
+# Date range shown by the chart
+TRENDS_START = pd.Timestamp('2024-01-01')
+TRENDS_END = pd.Timestamp('2025-01-31')
+
+@dashboard_section("Temporal Trends")
+def display_temporal_trends(clients, memberships, clients_monthly=None, memberships_monthly=None):
     """
     Displays a line chart showing the monthly trends of new clients and memberships
     from January 2024 to the end of January 2025.
@@ -12,39 +18,36 @@ def display_temporal_trends(clients, memberships):
     Args:
         clients (pd.DataFrame): DataFrame containing client data with a 'date_joined' column.
         memberships (pd.DataFrame): DataFrame containing membership data with a 'start_date' column.
+        clients_monthly (pd.DataFrame, optional): Pre-aggregated 'Month' and 'New Clients' counts.
+        memberships_monthly (pd.DataFrame, optional): Pre-aggregated 'Month' and 'New Memberships' counts.
     """
     st.subheader("Temporal Trends (Jan 2024 - Jan 2025)")
     
-    # Ensure 'date_joined' and 'start_date' columns are in datetime format
-    clients['date_joined'] = pd.to_datetime(clients['date_joined'])
-    memberships['start_date'] = pd.to_datetime(memberships['start_date'])
-    
-    # Define the date range filter
-    start_date = pd.to_datetime('2024-01-01')
-    end_date = pd.to_datetime('2025-01-31')
-    
-    # Filter clients and memberships data to the specified date range
-    clients_filtered = clients[(clients['date_joined'] >= start_date) & (clients['date_joined'] <= end_date)]
-    memberships_filtered = memberships[(memberships['start_date'] >= start_date) & (memberships['start_date'] <= end_date)]
-    
-    # Group by month and count new clients
-    clients_monthly = clients_filtered.resample('ME', on='date_joined').size().reset_index(name='New Clients')
-    
-    # Group by month and count new memberships
-    memberships_monthly = memberships_filtered.resample('ME', on='start_date').size().reset_index(name='New Memberships')
+    if clients_monthly is None or memberships_monthly is None:
+        # Ensure 'date_joined' and 'start_date' are in datetime format, leaving the inputs untouched
+        date_joined = pd.to_datetime(clients['date_joined'])
+        start_date = pd.to_datetime(memberships['start_date'])
+        
+        # Filter clients and memberships data to the specified date range
+        clients_filtered = pd.DataFrame({'date_joined': date_joined[(date_joined >= TRENDS_START) & (date_joined <= TRENDS_END)]})
+        memberships_filtered = pd.DataFrame({'start_date': start_date[(start_date >= TRENDS_START) & (start_date <= TRENDS_END)]})
+        
+        # Group by month and count new clients
+        clients_monthly = clients_filtered.resample('ME', on='date_joined').size().reset_index(name='New Clients')
+        clients_monthly.rename(columns={'date_joined': 'Month'}, inplace=True)
+        
+        # Group by month and count new memberships
+        memberships_monthly = memberships_filtered.resample('ME', on='start_date').size().reset_index(name='New Memberships')
+        memberships_monthly.rename(columns={'start_date': 'Month'}, inplace=True)
     
     # Merge the two dataframes on the month
     trends_data = pd.merge(
         clients_monthly,
         memberships_monthly,
-        left_on='date_joined',
-        right_on='start_date',
+        on='Month',
         how='outer'
     ).fillna(0)
     
-    # Rename the merged date column for clarity
-    trends_data.rename(columns={'date_joined': 'Month'}, inplace=True)
-    
     # Plot the line chart
     fig = px.line(
         trends_data,
@@ -67,4 +70,4 @@ def display_temporal_trends(clients, memberships):
     )
     
     # Display the chart in Streamlit
-    st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+    plotly_chart(fig, use_container_width=True)
\ No newline at end of file
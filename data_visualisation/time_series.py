@@ -0,0 +1,195 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Calendar rollups offered by the transaction trends section
+GRANULARITIES = {
+    'Daily': None,
+    'Weekly': 'W',
+    'Monthly': 'MS',
+}
+
+# Trailing windows, in days, kept as rolling sums of the daily totals
+ROLLING_WINDOWS = (7, 30)
+
+# Columns whose values are checked for changes to transactions already folded in
+CHECKSUM_COLUMNS = ['_id', 'amount', 'date']
+
+
+class TransactionTimeSeries:
+    """
+    Daily, weekly and monthly transaction totals plus trailing 7/30-day sums, kept up
+    to date incrementally.
+
+    `update` only folds transactions appended since the last update (with an `_id`
+    above the last one seen) into the daily totals, adds their sums to the existing
+    weekly and monthly buckets, and recomputes the rolling sums from the first
+    affected day onwards. Reading a series is a lookup.
+
+    Anything other than an append is detected with a checksum over the `_id`, amount
+    and date of the transactions seen before: an amount or date changed in place, a
+    deleted transaction, or one inserted with a lower `_id` changes it, and the series
+    are rebuilt from scratch.
+
+    Updates are serialised by a lock. The series are never modified in place: an
+    update builds new ones and swaps them in with a single assignment, so readers
+    take no lock and always see the series of one update.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._series = _empty_series()
+        self.last_id = None
+        self.seen_rows = 0
+        self.checksum = 0
+
+    def update(self, transactions):
+        """
+        Folds new transactions into the series.
+
+        Parameters:
+            transactions (pd.DataFrame): All processed transactions; not modified
+        """
+        with self._lock:
+            hashes = _row_hashes(transactions) if '_id' in transactions.columns else None
+            new_transactions = self._new_rows(transactions, hashes)
+            series = self._series
+            if new_transactions is None:
+                series = _empty_series()
+                new_transactions = transactions
+
+            if hashes is not None and len(transactions):
+                self.last_id = transactions['_id'].max()
+                self.checksum = _checksum(hashes)
+            self.seen_rows = len(transactions)
+
+            self._series = _add(series, new_transactions)
+
+    def _new_rows(self, transactions, hashes):
+        """
+        Finds the transactions appended since the last update.
+
+        Parameters:
+            transactions (pd.DataFrame): All processed transactions
+            hashes (np.ndarray): Row hashes from _row_hashes, None without `_id`
+
+        Returns:
+            pd.DataFrame: New rows, or None if the series must be rebuilt from scratch
+        """
+        if self.last_id is None or '_id' not in transactions.columns:
+            return None
+
+        # ObjectId hex strings sort in insertion order
+        is_new = (transactions['_id'] > self.last_id).to_numpy()
+        seen_hashes = hashes[~is_new]
+        if len(seen_hashes) != self.seen_rows or _checksum(seen_hashes) != self.checksum:
+            return None
+        return transactions[is_new]
+
+    def totals(self, granularity):
+        """
+        Total transaction amount per period.
+
+        Parameters:
+            granularity (str): 'Daily', 'Weekly' or 'Monthly'
+
+        Returns:
+            pd.DataFrame: `period` and `total_amount`
+        """
+        series = self._series
+        totals = series['daily'] if GRANULARITIES[granularity] is None else series['rollups'][granularity]
+        return self._as_frame(totals, 'total_amount')
+
+    def rolling_totals(self, window):
+        """
+        Trailing sum of transaction amounts over `window` days, per day with transactions.
+
+        Parameters:
+            window (int): One of ROLLING_WINDOWS
+
+        Returns:
+            pd.DataFrame: `period` and `total_amount`
+        """
+        return self._as_frame(self._series['rolling'][window], 'total_amount')
+
+    @staticmethod
+    def _as_frame(series, name):
+        frame = series.rename(name).rename_axis('period').reset_index()
+        frame['period'] = frame['period'].dt.date
+        return frame
+
+
+def _empty_series():
+    """
+    Series of a TransactionTimeSeries without any transactions.
+    """
+    empty = pd.Series(dtype='float64', index=pd.DatetimeIndex([]))
+    return {
+        'daily': empty,
+        'rollups': {name: empty for name, freq in GRANULARITIES.items() if freq},
+        'rolling': {window: empty for window in ROLLING_WINDOWS},
+    }
+
+
+def _add(series, transactions):
+    """
+    Adds transactions to the daily totals and every derived series.
+
+    Parameters:
+        series (dict): Current series, as from _empty_series; not modified
+        transactions (pd.DataFrame): Transactions to add
+
+    Returns:
+        dict: New series
+    """
+    dates = transactions['date']
+    valid = dates.notna()
+    if not valid.any():
+        return series
+
+    new_daily = transactions.loc[valid, 'amount'].groupby(dates[valid].dt.normalize()).sum()
+    daily = series['daily'].add(new_daily, fill_value=0).sort_index()
+
+    rollups = {}
+    for name, rollup in series['rollups'].items():
+        new_rollup = new_daily.resample(GRANULARITIES[name]).sum()
+        rollups[name] = rollup.add(new_rollup, fill_value=0).sort_index()
+
+    # Rolling sums change from the first new day onwards; earlier values are kept
+    first_day = new_daily.index.min()
+    rolling = {}
+    for window, sums in series['rolling'].items():
+        history = daily[daily.index > first_day - pd.Timedelta(days=window)]
+        recomputed = history.rolling(f'{window}D').sum()
+        rolling[window] = pd.concat([sums[sums.index < first_day], recomputed[recomputed.index >= first_day]])
+
+    return {'daily': daily, 'rollups': rollups, 'rolling': rolling}
+
+
+def _row_hashes(transactions):
+    """
+    Hash of each transaction's `_id`, amount and date.
+
+    Returns:
+        np.ndarray: uint64 hash per row
+    """
+    hashes = np.zeros(len(transactions), dtype=np.uint64)
+    for col in CHECKSUM_COLUMNS:
+        if col not in transactions.columns:
+            continue
+        # Hashed without factorising first, which only pays off for heavily repeated values
+        column = pd.util.hash_array(transactions[col].to_numpy(), categorize=False)
+        # Combine the columns' hashes so swapping values between rows changes the result
+        hashes = hashes * np.uint64(1000003) + column
+    return hashes
+
+
+def _checksum(hashes):
+    """
+    Order-independent checksum of row hashes: their sum, wrapping around at 2**64.
+    """
+    return int(hashes.sum(dtype=np.uint64))
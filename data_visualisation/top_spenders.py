@@ -1,17 +1,30 @@
 import streamlit as st
 import pandas as pd
+from data_visualisation.country_resolver import country_name_for
+from data_visualisation.dashboard_sections import dashboard_section
+from data_visualisation.date_index import day_end
+from data_visualisation.spender_index import SpenderIndex
 
-def display_top_spenders(clients, transactions):
+# Largest number of spenders the list can show
+MAX_TOP_SPENDERS = 50
+
+@dashboard_section("Top Spenders", fragment=True)
+def display_top_spenders(clients, transactions, transactions_index=None, spender_index=None, memberships=None):
     """
-    Displays the Top 5 Spenders section of the dashboard.
+    Displays the Top Spenders section of the dashboard.
     
     Parameters:
         clients (pd.DataFrame): Processed clients data
         transactions (pd.DataFrame): Processed transactions data
+        transactions_index (DateIndex, optional): Transactions sorted by date for range slicing
+        spender_index (SpenderIndex, optional): Per-client cumulative spend over all
+            transactions; without it one is built from the selected range
+        memberships (pd.DataFrame, optional): Processed memberships data, for the tier
+            filter when there is no spender index
     """
     # Section header
     st.markdown("---")
-    st.subheader("🏆 Top 5 Spenders")
+    st.subheader("🏆 Top Spenders")
 
     # Add time frame selector
     col_start, col_end = st.columns(2)
@@ -30,17 +43,47 @@ def display_top_spenders(clients, transactions):
             help="Select the end date for the analysis period"
         )
 
-    # Filter transactions within the selected time frame
-    filtered_transactions = transactions[
-        (transactions['date'] >= pd.Timestamp(start_date)) &
-        (transactions['date'] <= pd.Timestamp(end_date))
-    ]
+    if spender_index is None:
+        # Index only the transactions within the selected time frame
+        if transactions_index is not None:
+            filtered_transactions = transactions_index.slice(pd.Timestamp(start_date), day_end(end_date))
+        else:
+            filtered_transactions = transactions[
+                (transactions['date'] >= pd.Timestamp(start_date)) &
+                (transactions['date'] <= day_end(end_date))
+            ]
+        spender_index = SpenderIndex(clients, memberships, filtered_transactions)
+
+    # List size and segment filters
+    col_k, col_tier, col_country = st.columns([1, 2, 2])
+
+    with col_k:
+        top_k = st.number_input(
+            "Number of Clients",
+            min_value=1,
+            max_value=MAX_TOP_SPENDERS,
+            value=5,
+            help="How many of the top spenders to list"
+        )
 
-    # Calculate total spending per client
-    total_spent = filtered_transactions.groupby('client_id')['amount'].sum().reset_index()
+    with col_tier:
+        tiers = st.multiselect("Membership Tiers", spender_index.tier_options())
 
-    # Merge with clients to get names
-    top_spenders = pd.merge(total_spent, clients, on='client_id').nlargest(5, 'amount')
+    with col_country:
+        countries = st.multiselect(
+            "Countries",
+            spender_index.country_options(),
+            format_func=country_name_for
+        )
+
+    # Two row lookups per client instead of filtering and grouping transactions
+    top_spenders = spender_index.top_k(
+        pd.Timestamp(start_date),
+        pd.Timestamp(end_date),
+        k=int(top_k),
+        tiers=tiers,
+        countries=countries
+    )
 
     # Display the list
     st.dataframe(
@@ -60,7 +103,7 @@ def display_top_spenders(clients, transactions):
     # Optional: Add insights or explanations
     st.caption(
         """
-        This list shows the top 5 clients by total spending within the selected time period.
+        This list shows the top clients by total spending within the selected time period.
         Use the date selectors to analyze different time frames and identify your most valuable clients.
         """
     )
\ No newline at end of file
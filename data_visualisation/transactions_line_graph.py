@@ -1,28 +1,24 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from data_visualisation.time_series import GRANULARITIES, ROLLING_WINDOWS
+from data_visualisation.dashboard_sections import cached_figure, dashboard_section, plotly_chart
 
-def display_transaction_trends(transactions):
-    """
-    Displays the Transaction Trends Over Time section of the dashboard.
-    
-    Parameters:
-        transactions (pd.DataFrame): Processed transactions data
-    """
-    # Section header
-    st.markdown("---")
-    st.subheader("💰 Total Transaction Amount Over Time")
+# Rolling windows offered next to the calendar granularities
+ROLLING_OPTIONS = {f"{window}-Day Rolling": window for window in ROLLING_WINDOWS}
 
-    # Fixed aggregation period (Daily)
-    aggregation_period = 'Daily'
-
-    # Aggregate transactions based on the fixed period
-    transactions['period'] = transactions['date'].dt.date
+@cached_figure
+def build_trends_figure(period_totals, aggregation_period):
+    """
+    Builds the line graph of transaction totals.
 
-    # Group by period and calculate total amount
-    period_totals = transactions.groupby('period')['amount'].sum().reset_index()
-    period_totals.columns = ['period', 'total_amount']
+    Parameters:
+        period_totals (pd.DataFrame): `period` and `total_amount`
+        aggregation_period (str): Name of the aggregation, shown in the title
 
+    Returns:
+        go.Figure: The line graph
+    """
     # Create line graph
     fig = px.line(period_totals, 
                   x='period', 
@@ -39,12 +35,47 @@ def display_transaction_trends(transactions):
         hovermode='x unified',
         showlegend=False
     )
+    return fig
+
+@dashboard_section("Transaction Trends", fragment=True)
+def display_transaction_trends(transactions, time_series=None):
+    """
+    Displays the Transaction Trends Over Time section of the dashboard.
+    
+    Parameters:
+        transactions (pd.DataFrame): Processed transactions data
+        time_series (TransactionTimeSeries, optional): Precomputed rollups; enables the
+            granularity selector
+    """
+    # Section header
+    st.markdown("---")
+    st.subheader("💰 Total Transaction Amount Over Time")
+
+    if time_series is not None:
+        # Every option is a lookup into a precomputed series
+        aggregation_period = st.selectbox(
+            "Aggregation",
+            options=list(GRANULARITIES) + list(ROLLING_OPTIONS),
+            index=0,
+            help="Choose how transaction amounts are grouped over time"
+        )
+        if aggregation_period in ROLLING_OPTIONS:
+            period_totals = time_series.rolling_totals(ROLLING_OPTIONS[aggregation_period])
+        else:
+            period_totals = time_series.totals(aggregation_period)
+    else:
+        # Fixed aggregation period (Daily)
+        aggregation_period = 'Daily'
 
-    # Add range slider for better date navigation
+        # Group by period and calculate total amount, leaving the input untouched
+        period = transactions['date'].dt.date.rename('period')
+        period_totals = transactions.groupby(period)['amount'].sum().reset_index()
+        period_totals.columns = ['period', 'total_amount']
 
+    fig = build_trends_figure(period_totals, aggregation_period)
 
     # Display the graph
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(fig, use_container_width=True)
 
     # Optional: Add insights or explanations
     st.caption(
@@ -1,13 +1,95 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
+from data_visualisation.downsampling import (
+    HEATMAP_THRESHOLD, MAX_SCATTER_POINTS, density_grid, downsample_frame
+)
+from data_visualisation.dashboard_sections import cached_figure, dashboard_section, plotly_chart
+from data_visualisation.date_index import day_end
 
-def display_transaction_scatter(transactions):
+def _style_figure(fig):
+    """
+    Applies the axes, hover mode and range controls shared by both chart kinds.
+    """
+    # Update layout
+    fig.update_layout(
+        xaxis_title="Date",
+        yaxis_title="Amount ($)",
+        coloraxis_colorbar=dict(title="Amount ($)"),
+        hovermode='x unified'
+    )
+
+    # Add range slider for better date navigation
+    fig.update_xaxes(
+        rangeslider_visible=True,
+        rangeselector=dict(
+            buttons=list([
+                dict(count=1, label="1m", step="month", stepmode="backward"),
+                dict(count=6, label="6m", step="month", stepmode="backward"),
+                dict(count=1, label="YTD", step="year", stepmode="todate"),
+                dict(count=1, label="1y", step="year", stepmode="backward"),
+                dict(step="all")
+            ])
+        )
+    )
+    return fig
+
+@cached_figure
+def build_scatter_figure(plotted_transactions):
+    """
+    Builds the scatter plot of individual transactions.
+
+    Parameters:
+        plotted_transactions (pd.DataFrame): The transactions to draw, already downsampled
+
+    Returns:
+        go.Figure: The scatter plot
+    """
+    # Create scatter plot
+    fig = px.scatter(plotted_transactions, 
+                     x='date', 
+                     y='amount', 
+                     title='Transaction Scatter Plot',
+                     labels={'date': 'Date', 'amount': 'Amount ($)'},
+                     color='amount',
+                     color_continuous_scale=['#BED739', '#2E8B57'],  # Custom color scale with #BED739
+                     hover_data=['transaction_id', 'client_id'])
+    return _style_figure(fig)
+
+@cached_figure
+def build_density_figure(x_centres, y_centres, counts):
+    """
+    Builds the density heatmap shown instead of the scatter plot for large ranges.
+
+    Parameters:
+        x_centres (pd.DatetimeIndex): Date bin centres
+        y_centres (np.ndarray): Amount bin centres
+        counts (np.ndarray): Transactions per cell, shaped (len(y_centres), len(x_centres))
+
+    Returns:
+        go.Figure: The heatmap
+    """
+    fig = go.Figure(go.Heatmap(
+        x=x_centres,
+        y=y_centres,
+        z=np.where(counts > 0, counts, np.nan),  # Leave empty cells blank
+        colorscale=[[0, '#BED739'], [1, '#2E8B57']],
+        colorbar=dict(title="Transactions"),
+        hovertemplate="Date: %{x}<br>Amount: $%{y:,.2f}<br>Transactions: %{z}<extra></extra>"
+    ))
+    fig.update_layout(title='Transaction Density')
+    return _style_figure(fig)
+
+@dashboard_section("Transaction Scatter Plot", fragment=True)
+def display_transaction_scatter(transactions, transactions_index=None):
     """
     Displays the Transaction Scatter Plot section of the dashboard.
     
     Parameters:
         transactions (pd.DataFrame): Processed transactions data
+        transactions_index (DateIndex, optional): Transactions sorted by date for range slicing
     """
     # Section header
     st.markdown("---")
@@ -31,45 +113,45 @@ def display_transaction_scatter(transactions):
         )
 
     # Filter transactions within the selected time frame
-    filtered_transactions = transactions[
-        (transactions['date'] >= pd.Timestamp(start_date)) &
-        (transactions['date'] <= pd.Timestamp(end_date))
-    ]
+    if transactions_index is not None:
+        filtered_transactions = transactions_index.slice(pd.Timestamp(start_date), day_end(end_date))
+    else:
+        filtered_transactions = transactions[
+            (transactions['date'] >= pd.Timestamp(start_date)) &
+            (transactions['date'] <= day_end(end_date))
+        ]
 
-    # Create scatter plot
-    fig = px.scatter(filtered_transactions, 
-                     x='date', 
-                     y='amount', 
-                     title='Transaction Scatter Plot',
-                     labels={'date': 'Date', 'amount': 'Amount ($)'},
-                     color='amount',
-                     color_continuous_scale=['#BED739', '#2E8B57'],  # Custom color scale with #BED739
-                     hover_data=['transaction_id', 'client_id'])
+    # Only send the browser as many points as the chart can show
+    total_points = len(filtered_transactions)
+    plotted_points = total_points
 
-    # Update layout
-    fig.update_layout(
-        xaxis_title="Date",
-        yaxis_title="Amount ($)",
-        coloraxis_colorbar=dict(title="Amount ($)"),
-        hovermode='x unified'
-    )
+    if total_points > HEATMAP_THRESHOLD:
+        # Too many points for a scatter: show how densely transactions fall in each cell
+        fig = build_density_figure(*density_grid(filtered_transactions, 'date', 'amount'))
+        plotted_points = None
+    else:
+        plotted_transactions = filtered_transactions
+        if total_points > MAX_SCATTER_POINTS:
+            # Keep the first, last, lowest and highest transaction of every pixel column
+            plotted_transactions = downsample_frame(filtered_transactions, 'date', 'amount')
+            plotted_points = len(plotted_transactions)
 
-    # Add range slider for better date navigation
-    fig.update_xaxes(
-        rangeslider_visible=True,
-        rangeselector=dict(
-            buttons=list([
-                dict(count=1, label="1m", step="month", stepmode="backward"),
-                dict(count=6, label="6m", step="month", stepmode="backward"),
-                dict(count=1, label="YTD", step="year", stepmode="todate"),
-                dict(count=1, label="1y", step="year", stepmode="backward"),
-                dict(step="all")
-            ])
-        )
-    )
+        fig = build_scatter_figure(plotted_transactions[['date', 'amount', 'transaction_id', 'client_id']])
 
     # Display the plot
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(fig, use_container_width=True)
+
+    # Narrowing the date range re-queries the data at a finer resolution
+    if plotted_points is None:
+        st.caption(
+            f"{total_points:,} transactions are shown as a density map. "
+            "Narrow the date range to see individual transactions."
+        )
+    elif plotted_points < total_points:
+        st.caption(
+            f"Showing {plotted_points:,} of {total_points:,} transactions, keeping the highest and lowest "
+            "amounts at every point in time. Narrow the date range to see more detail."
+        )
 
     # Optional: Add insights or explanations
     st.caption(
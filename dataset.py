@@ -0,0 +1,159 @@
+import time
+
+from data_visualisation.lazy_dataset import LazyDataset
+from data_visualisation.data_preprocessor import client_ages, client_country_codes, enrich_clients
+from data_visualisation.parallel_preprocessor import parallel_merge, parallel_prepare
+from data_visualisation.aggregate_cube import build_aggregate_cube
+from data_visualisation.date_index import DateIndex
+from data_visualisation.spender_index import build_spender_index
+from data_visualisation.birthday_index import BirthdayIndex
+from data_visualisation.chat_context import build_chat_context
+from data_visualisation.chat_retrieval import BM25Index
+from snapshot_cache import (
+    SNAPSHOT_MAX_AGE,
+    SNAPSHOT_TABLES,
+    is_stale,
+    load_snapshot_table,
+    read_manifest,
+    refresh_in_background,
+)
+
+# Seconds between checks of a stale snapshot's manifest while it is being rebuilt
+SNAPSHOT_RECHECK_INTERVAL = 60
+
+
+def _fresh_frames(data):
+    """
+    Preprocessed frames built from the source, in SNAPSHOT_TABLES order.
+    """
+    return tuple(data[f'fresh_{name}'] for name in SNAPSHOT_TABLES)
+
+
+def _rebuild_snapshot(data):
+    """
+    Fetches the latest documents and writes a new snapshot in the background. Once
+    it is written, every item read from the old snapshot is refreshed and the frames
+    built for the snapshot are released. Pages are served the previous data until
+    the refreshed items are swapped in.
+    """
+    def build():
+        data.refresh('raw_data', wait=True)
+        return _fresh_frames(data)
+
+    def swap_in():
+        data.refresh('snapshot_manifest', wait=True)
+        data.invalidate('raw_data')
+
+    refresh_in_background(build, on_done=swap_in)
+
+
+def _snapshot_manifest(data):
+    """
+    Reads the snapshot manifest and schedules a refresh if the snapshot is missing or stale.
+    """
+    manifest = read_manifest()
+    if manifest is None:
+        # Cold start: pages build what they need from the source, the snapshot is
+        # written in the background from the same items
+        refresh_in_background(lambda: _fresh_frames(data))
+    elif is_stale(manifest):
+        # Serve the snapshot right away and swap in fresh data once it has been rebuilt
+        _rebuild_snapshot(data)
+    return manifest
+
+
+def _manifest_ttl(manifest):
+    """
+    Seconds the manifest is served for: until the snapshot it describes reaches
+    SNAPSHOT_MAX_AGE, counted from when the snapshot was written rather than when
+    the manifest was read.
+    """
+    if manifest is None:
+        return SNAPSHOT_MAX_AGE
+    remaining = manifest['created_at'] + SNAPSHOT_MAX_AGE - time.time()
+    return max(remaining, SNAPSHOT_RECHECK_INTERVAL)
+
+
+def _served_frame(name):
+    """
+    Serves a preprocessed frame from the snapshot, or builds it from the source.
+    """
+    def compute(data):
+        manifest = data['snapshot_manifest']
+        if manifest is not None:
+            frame = load_snapshot_table(name, manifest)
+            if frame is not None:
+                return frame
+            _rebuild_snapshot(data)
+        return data[f'fresh_{name}']
+    return compute
+
+
+def create_dataset(get_loader, time_series=None):
+    """
+    Declares every dataset item the dashboard pages read.
+
+    Nothing is loaded here. Each page reads only the items it shows, and each item
+    computes only what it depends on: the Geographic page never builds the clients ×
+    memberships merge, and the Chatbot page reads only the summaries it answers from.
+
+    Parameters:
+        get_loader (callable): Returns the IncrementalMongoLoader to fetch from
+        time_series (TransactionTimeSeries, optional): Engine kept up to date with
+            the transactions; enables the `transaction_time_series` item
+
+    Returns:
+        LazyDataset: The dataset
+    """
+    data = LazyDataset()
+
+    # Source documents and their preprocessing, one step per item; large frames are
+    # spread over PREPROCESS_WORKERS processes
+    data.register('raw_data', lambda data: get_loader().sync())
+    data.register('fresh_clients_base', lambda data: parallel_prepare('clients', data['raw_data'][0]))
+    data.register('fresh_memberships', lambda data: parallel_prepare('memberships', data['raw_data'][1]))
+    data.register('fresh_transactions', lambda data: parallel_prepare('transactions', data['raw_data'][2]))
+    data.register('fresh_country_code', lambda data: client_country_codes(data['fresh_clients_base']))
+    data.register('fresh_age', lambda data: client_ages(data['fresh_clients_base']))
+    data.register('fresh_clients', lambda data: enrich_clients(
+        data['fresh_clients_base'], data['fresh_country_code'], data['fresh_age']
+    ))
+    data.register('fresh_merged_data', lambda data: parallel_merge(
+        data['fresh_clients_base'], data['fresh_memberships']
+    ))
+
+    # Frames served to the pages, read table by table from the snapshot when there is one
+    data.register('snapshot_manifest', _snapshot_manifest, ttl=_manifest_ttl)
+    for name in SNAPSHOT_TABLES:
+        data.register(name, _served_frame(name))
+
+    # Per-page structures, built once per data refresh
+    data.register('aggregate_cube', lambda data: build_aggregate_cube(
+        data['clients'], data['memberships'], data['transactions']
+    ))
+    data.register('clients_index', lambda data: DateIndex(data['clients'], 'date_joined'))
+    data.register('transactions_index', lambda data: DateIndex(
+        data['transactions'], 'date', value_column='amount'
+    ))
+    data.register('merged_data_index', lambda data: (
+        DateIndex(data['merged_data'], 'start_date')
+        if 'start_date' in data['merged_data'].columns else None
+    ))
+    data.register('spender_index', lambda data: build_spender_index(
+        data['clients'], data['memberships'], data['transactions']
+    ))
+    data.register('birthday_index', lambda data: BirthdayIndex(data['clients']))
+
+    # Chatbot context summarised from the same aggregates, and its search index
+    data.register('chat_context', lambda data: build_chat_context(
+        data['clients'], data['memberships'], data['merged_data'], data['transactions'], data['aggregate_cube']
+    ))
+    data.register('chat_retriever', lambda data: BM25Index(data['chat_context']))
+
+    if time_series is not None:
+        def update_time_series(data):
+            time_series.update(data['transactions'])
+            return time_series
+        data.register('transaction_time_series', update_time_series)
+
+    return data
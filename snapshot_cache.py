@@ -0,0 +1,269 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Frames stored in a snapshot, in the order preprocess_data returns them
+SNAPSHOT_TABLES = ('clients', 'memberships', 'transactions', 'merged_data')
+
+# Bump when preprocessing changes the meaning of the stored columns
+SNAPSHOT_VERSION = 2
+
+# Snapshots older than this are still served, but refreshed in the background
+SNAPSHOT_MAX_AGE = 3600
+
+# Frames partitioned by month of a date column; the others are written as a single file
+PARTITION_COLUMNS = {'transactions': 'date'}
+
+_refresh_lock = threading.Lock()
+
+
+def get_snapshot_dir():
+    """
+    Returns the directory holding the snapshot, configurable with SNAPSHOT_DIR.
+    """
+    return os.getenv("SNAPSHOT_DIR", ".snapshot")
+
+
+def _type_name(arrow_type):
+    """
+    Describes an Arrow type, ignoring the index width of dictionary (categorical)
+    columns, which Parquet does not preserve.
+    """
+    if pa.types.is_dictionary(arrow_type):
+        return f"dictionary<{arrow_type.value_type}>"
+    return str(arrow_type)
+
+
+def schema_hash(schemas):
+    """
+    Hashes the column names and types of every table in a snapshot.
+
+    Parameters:
+        schemas (dict): Arrow schema per table name
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    description = {
+        name: [(field.name, _type_name(field.type)) for field in schema]
+        for name, schema in sorted(schemas.items())
+    }
+    payload = json.dumps({'version': SNAPSHOT_VERSION, 'tables': description}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def source_watermark(frames):
+    """
+    Records how far the snapshot reaches into each source collection.
+
+    ObjectId hex strings sort in creation order, so the largest `_id` marks the newest
+    document included in the snapshot.
+
+    Parameters:
+        frames (dict): Preprocessed frames per table name
+
+    Returns:
+        dict: Row count and largest `_id` per table
+    """
+    watermark = {}
+    for name, frame in frames.items():
+        watermark[name] = {
+            'rows': len(frame),
+            'max_id': str(frame['_id'].max()) if '_id' in frame.columns and len(frame) else None,
+        }
+    return watermark
+
+
+def _partitions(name, frame):
+    """
+    Splits a frame into the parts written as separate Parquet files.
+
+    Parameters:
+        name (str): Table name
+        frame (pd.DataFrame): Frame to split
+
+    Returns:
+        list: (partition label, row positions) pairs
+    """
+    column = PARTITION_COLUMNS.get(name)
+    if column is None or column not in frame.columns or frame.empty:
+        return [('all', np.arange(len(frame)))]
+
+    months = frame[column].dt.strftime('%Y-%m').fillna('unknown').to_numpy()
+    return [(str(month), np.flatnonzero(months == month)) for month in sorted(set(months))]
+
+
+def save_snapshot(data, directory=None):
+    """
+    Writes the preprocessed frames to Parquet together with a manifest.
+
+    The snapshot is written to a temporary directory and swapped in afterwards, so a
+    reader never sees a half-written snapshot.
+
+    Parameters:
+        data (tuple): Clients, memberships, transactions and merged data
+        directory (str, optional): Snapshot directory, defaults to get_snapshot_dir()
+    """
+    directory = directory or get_snapshot_dir()
+    frames = dict(zip(SNAPSHOT_TABLES, data))
+    staging = f"{directory}.tmp-{os.getpid()}-{threading.get_ident()}"
+    shutil.rmtree(staging, ignore_errors=True)
+
+    tables, schemas = {}, {}
+    for name, frame in frames.items():
+        os.makedirs(os.path.join(staging, name))
+        # Convert once so every partition of a table shares the same schema
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        schemas[name] = table.schema.remove_metadata()
+
+        files = []
+        for label, rows in _partitions(name, frame):
+            filename = os.path.join(name, f"part-{label}.parquet")
+            pq.write_table(table.take(rows), os.path.join(staging, filename))
+            files.append(filename)
+        tables[name] = files
+
+    manifest = {
+        'version': SNAPSHOT_VERSION,
+        'created_at': time.time(),
+        'watermark': source_watermark(frames),
+        'schema_hash': schema_hash(schemas),
+        'table_schema_hashes': {name: schema_hash({name: schema}) for name, schema in schemas.items()},
+        'tables': tables,
+    }
+    with open(os.path.join(staging, 'manifest.json'), 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2)
+
+    # Swap the new snapshot in place of the old one
+    previous = f"{directory}.old-{os.getpid()}-{threading.get_ident()}"
+    if os.path.exists(directory):
+        os.replace(directory, previous)
+    os.replace(staging, directory)
+    shutil.rmtree(previous, ignore_errors=True)
+
+
+def read_manifest(directory=None):
+    """
+    Reads the snapshot manifest.
+
+    Parameters:
+        directory (str, optional): Snapshot directory, defaults to get_snapshot_dir()
+
+    Returns:
+        dict: The manifest, or None if there is no usable snapshot
+    """
+    path = os.path.join(directory or get_snapshot_dir(), 'manifest.json')
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            manifest = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if manifest.get('version') != SNAPSHOT_VERSION:
+        return None
+    return manifest
+
+
+def load_snapshot_table(name, manifest, directory=None):
+    """
+    Loads a single preprocessed frame from the snapshot, memory-mapping its Parquet files.
+
+    Parameters:
+        name (str): Table name, one of SNAPSHOT_TABLES
+        manifest (dict): Manifest returned by read_manifest
+        directory (str, optional): Snapshot directory, defaults to get_snapshot_dir()
+
+    Returns:
+        pd.DataFrame: The frame, or None if its files are missing or do not match the manifest
+    """
+    directory = directory or get_snapshot_dir()
+    try:
+        parts = [
+            pq.read_table(os.path.join(directory, filename), memory_map=True)
+            for filename in manifest['tables'][name]
+        ]
+        table = pa.concat_tables(parts)
+        expected_hash = manifest['table_schema_hashes'][name]
+    except (OSError, KeyError, pa.ArrowInvalid):
+        return None
+
+    if schema_hash({name: table.schema.remove_metadata()}) != expected_hash:
+        return None
+    return table.to_pandas()
+
+
+def load_snapshot(directory=None):
+    """
+    Loads the preprocessed frames from the snapshot.
+
+    Parameters:
+        directory (str, optional): Snapshot directory, defaults to get_snapshot_dir()
+
+    Returns:
+        tuple: (data, manifest), where data holds the frames in SNAPSHOT_TABLES order,
+            or None if the snapshot is missing, outdated or does not match its manifest
+    """
+    directory = directory or get_snapshot_dir()
+    manifest = read_manifest(directory)
+    if manifest is None:
+        return None
+
+    frames = []
+    for name in SNAPSHOT_TABLES:
+        frame = load_snapshot_table(name, manifest, directory)
+        if frame is None:
+            return None
+        frames.append(frame)
+
+    return tuple(frames), manifest
+
+
+def is_stale(manifest, max_age=SNAPSHOT_MAX_AGE):
+    """
+    Checks whether a snapshot is old enough to be refreshed.
+
+    Parameters:
+        manifest (dict): Snapshot manifest
+        max_age (int): Maximum age in seconds
+
+    Returns:
+        bool: True if the snapshot should be rebuilt
+    """
+    return time.time() - manifest['created_at'] > max_age
+
+
+def refresh_in_background(build, on_done=None):
+    """
+    Rebuilds the data in a daemon thread and stores it as the new snapshot.
+
+    Only one refresh runs at a time; calls made while a refresh is running are ignored.
+
+    Parameters:
+        build (callable): Returns fresh frames in SNAPSHOT_TABLES order
+        on_done (callable, optional): Called after the new snapshot has been written
+
+    Returns:
+        bool: True if a refresh was started
+    """
+    if not _refresh_lock.acquire(blocking=False):
+        return False
+
+    def run():
+        try:
+            save_snapshot(build())
+            if on_done is not None:
+                on_done()
+        except Exception as e:
+            print(f"Warning: Background snapshot refresh failed: {str(e)}")
+        finally:
+            _refresh_lock.release()
+
+    threading.Thread(target=run, name="snapshot-refresh", daemon=True).start()
+    return True
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_visualisation.aggregate_cube import build_aggregate_cube
+from data_visualisation.membership_spending import TIER_ORDER
+
+TIERS = ['No Membership', 'Bronze', 'Silver', 'Gold']
+
+
+@pytest.fixture
+def frames():
+    """
+    Processed frames with the awkward cases of the real data: clients listed twice,
+    memberships of clients missing from the clients data, and transactions of those.
+    """
+    rng = np.random.default_rng(7)
+    clients = pd.DataFrame({
+        'client_id': np.arange(1, 301),
+        'country_code': rng.choice(['GBR', 'FRA', 'DEU'], 300),
+        'age': rng.integers(18, 80, 300),
+        'date_joined': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 700, 300), unit='D'),
+    })
+    clients = pd.concat([clients, clients.iloc[::7]], ignore_index=True)
+
+    # Clients 251-400 have a membership, 301-400 no client row
+    memberships = pd.DataFrame({
+        'membership_id': [f'm{i}' for i in range(251, 401)],
+        'client_id': np.arange(251, 401),
+        'tier': rng.choice(TIERS, 150),
+        'status': rng.choice(['ACTIVE', 'INACTIVE'], 150, p=[0.8, 0.2]),
+        'start_date': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 700, 150), unit='D'),
+    })
+    transactions = pd.DataFrame({
+        'client_id': rng.integers(1, 451, 5000),
+        'amount': rng.gamma(2.0, 2500.0, 5000).round(2),
+        'date': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 700, 5000), unit='D'),
+    })
+    return clients, memberships, transactions
+
+
+def test_retention_by_tier_matches_merged_rows(frames):
+    clients, memberships, transactions = frames
+    cube = build_aggregate_cube(clients, memberships, transactions)
+
+    merged = pd.merge(clients, memberships, on='client_id', how='inner')
+    expected = merged.groupby('tier', observed=True)['status'].apply(
+        lambda x: (x == 'ACTIVE').mean() * 100
+    ).reset_index()
+    expected.columns = ['Tier', 'Retention Rate']
+
+    pd.testing.assert_frame_equal(cube.retention_by_tier().reset_index(drop=True), expected)
+
+
+def test_average_spending_by_tier_matches_transaction_merge(frames):
+    clients, memberships, transactions = frames
+    cube = build_aggregate_cube(clients, memberships, transactions)
+
+    merged = pd.merge(transactions, memberships, on='client_id', how='inner', validate='m:1')
+    merged = merged[merged['amount'] > 0]
+    merged['tier'] = pd.Categorical(merged['tier'], categories=TIER_ORDER, ordered=True)
+    expected = merged.groupby('tier', observed=False)['amount'].mean().reset_index()
+
+    pd.testing.assert_frame_equal(cube.average_spending_by_tier(TIER_ORDER), expected)
+
+
+def test_tier_counts_match_memberships(frames):
+    clients, memberships, transactions = frames
+    cube = build_aggregate_cube(clients, memberships, transactions)
+
+    counts = cube.tier_counts().set_index('tier')['count']
+    expected = memberships['tier'].value_counts()
+    assert counts.to_dict() == expected.to_dict()
+    assert list(counts) == sorted(counts, reverse=True)
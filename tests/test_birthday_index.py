@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_visualisation.birthday_index import BirthdayIndex
+
+
+def clients(birthdates):
+    return pd.DataFrame({
+        'client_id': np.arange(1, len(birthdates) + 1),
+        'name': [f'client {i}' for i in range(1, len(birthdates) + 1)],
+        'birthdate': pd.to_datetime(birthdates),
+    })
+
+
+def upcoming(index, days, today):
+    result = index.upcoming(days, today=pd.Timestamp(today))
+    return list(zip(result['client_id'], result['days_until_birthday']))
+
+
+def test_leap_day_birthdays_fall_on_february_28_in_other_years():
+    index = BirthdayIndex(clients(['1992-02-29', '1990-02-28', '1985-03-01']))
+
+    assert upcoming(index, 2, '2025-02-27') == [(2, 1), (1, 1), (3, 2)]
+    # In a leap year February 29 is its own day
+    assert upcoming(index, 2, '2024-02-28') == [(2, 0), (1, 1), (3, 2)]
+
+
+def test_window_wraps_around_the_new_year():
+    index = BirthdayIndex(clients(['1980-12-31', '1975-01-01', '1999-01-03', '2001-12-29', None]))
+
+    assert upcoming(index, 3, '2024-12-30') == [(1, 1), (2, 2)]
+    assert upcoming(index, 5, '2024-12-30') == [(1, 1), (2, 2), (3, 4)]
+
+
+def brute_force(birthdates, days, today):
+    """
+    Every client's birthdays in the window, checking each day of it in turn.
+    """
+    expected = []
+    for offset in range(min(days, 365) + 1):
+        day = today + pd.Timedelta(days=offset)
+        for client_id, birthdate in enumerate(birthdates, start=1):
+            if pd.isna(birthdate):
+                continue
+            celebrates = (birthdate.month, birthdate.day) == (day.month, day.day)
+            if (birthdate.month, birthdate.day) == (2, 29) and not day.is_leap_year:
+                celebrates = (day.month, day.day) == (2, 28)
+            if celebrates:
+                expected.append((client_id, offset))
+    return expected
+
+
+@pytest.mark.parametrize('today', ['2023-01-01', '2023-02-27', '2024-02-27', '2024-12-15', '2025-12-31'])
+@pytest.mark.parametrize('days', [0, 7, 30, 365])
+def test_matches_checking_every_day(today, days):
+    rng = np.random.default_rng(11)
+    birthdates = list(pd.Timestamp('1950-01-01') + pd.to_timedelta(rng.integers(0, 365 * 50, 300), unit='D'))
+    birthdates += [pd.Timestamp('1988-02-29'), pd.Timestamp('2000-02-29'), pd.NaT]
+    index = BirthdayIndex(clients(birthdates))
+
+    result = upcoming(index, days, today)
+    expected = brute_force(birthdates, days, pd.Timestamp(today))
+    assert sorted(result, key=lambda row: (row[1], row[0])) == sorted(expected, key=lambda row: (row[1], row[0]))
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_visualisation.aggregate_cube import build_aggregate_cube
+from data_visualisation.chat_context import build_chat_context
+from data_visualisation.chat_retrieval import BM25Index
+
+
+@pytest.fixture
+def context():
+    rng = np.random.default_rng(5)
+    clients = pd.DataFrame({
+        'client_id': np.arange(1, 101),
+        'country_code': rng.choice(['GBR', 'FRA'], 100, p=[0.7, 0.3]),
+        'age': rng.integers(18, 80, 100),
+        'date_joined': pd.Timestamp('2023-06-01') + pd.to_timedelta(rng.integers(0, 500, 100), unit='D'),
+    })
+    memberships = pd.DataFrame({
+        'membership_id': [f'm{i}' for i in range(1, 61)],
+        'client_id': np.arange(1, 61),
+        'tier': rng.choice(['Bronze', 'Silver', 'Gold'], 60),
+        'status': rng.choice(['ACTIVE', 'INACTIVE'], 60, p=[0.75, 0.25]),
+        'start_date': pd.Timestamp('2023-06-01') + pd.to_timedelta(rng.integers(0, 500, 60), unit='D'),
+    })
+    transactions = pd.DataFrame({
+        'transaction_id': [f't{i}' for i in range(1000)],
+        'client_id': rng.integers(1, 101, 1000),
+        'amount': rng.gamma(2.0, 100.0, 1000).round(2),
+        'date': pd.Timestamp('2023-06-01') + pd.to_timedelta(rng.integers(0, 500, 1000), unit='D'),
+    })
+    merged_data = pd.merge(clients, memberships, on='client_id')
+    cube = build_aggregate_cube(clients, memberships, transactions)
+    chunks = build_chat_context(clients, memberships, merged_data, transactions, cube)
+    return dict(chunks), clients, memberships, transactions
+
+
+def test_numbers_come_from_the_current_data(context):
+    chunks, clients, memberships, transactions = context
+
+    quick = chunks["🚀 Quick Statistics / Overview"]
+    assert "Total Clients: 100" in quick
+    assert f"Total Transaction Amount: ${transactions['amount'].sum():,.2f}" in quick
+    active = (memberships['status'] == 'ACTIVE').sum()
+    assert f"Active Memberships: {active}" in quick
+
+    tiers = chunks["📊 Membership Tier Distribution"]
+    for tier, count in memberships['tier'].value_counts().items():
+        assert f"{tier} | {count}" in tiers
+
+    geographic = chunks["🌍 Geographic Analysis / Clients by Country"]
+    assert f"United Kingdom | GBR | {(clients['country_code'] == 'GBR').sum()}" in geographic
+
+
+def test_monthly_statistics_per_year(context):
+    chunks, _, _, transactions = context
+    years = sorted(heading.split()[3] for heading in chunks if heading.startswith("📅 Monthly Statistics"))
+    assert years == ['2023', '2024']
+
+    monthly = transactions.groupby(transactions['date'].dt.strftime('%Y-%m'))['amount'].sum()
+    body = chunks["📅 Monthly Statistics 2024 / Signups and Transaction Amount"]
+    rows = {line.split(' | ')[0]: line.split(' | ')[-1] for line in body.splitlines()[1:]}
+    assert rows == {month: f"{amount:.2f}" for month, amount in monthly.items() if month.startswith('2024')}
+
+
+def test_context_can_be_searched(context):
+    chunks = context[0]
+    index = BM25Index(list(chunks.items()))
+    assert index.search("Which country do most clients come from?")[0][0].startswith("🌍 Geographic Analysis")
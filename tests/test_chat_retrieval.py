@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from data_visualisation.chat_retrieval import BM25Index, chunk_graph_data, tokenize
+from data_visualisation.chatbot import CONTEXT_CHUNKS, CONTEXT_MAX_CHARS
+
+
+@pytest.fixture(scope='module')
+def index():
+    with open(os.path.join(os.path.dirname(__file__), '..', 'training.txt'), encoding='utf-8') as file:
+        return BM25Index(chunk_graph_data(file.read()))
+
+
+@pytest.mark.parametrize('question, heading', [
+    ("Which country has the most clients?", "Geographic Analysis"),
+    ("What is the age group distribution?", "Age Group Distribution"),
+    ("How does retention differ between tiers?", "Retention by Membership Tier"),
+    ("What is the overall retention rate?", "Membership Retention Rate"),
+    ("How many client signups were there in 2024?", "Monthly Statistics (2024)"),
+])
+def test_question_naming_a_section_ranks_it_first(index, question, heading):
+    results = index.search(question, top_k=CONTEXT_CHUNKS, max_chars=CONTEXT_MAX_CHARS)
+    assert heading in results[0][0]
+
+
+def test_unrelated_question_finds_nothing(index):
+    assert index.search("Zebra quantum xylophone?") == []
+
+
+def test_tokenize_drops_stopwords_and_plurals():
+    assert tokenize("What are the countries of the clients?") == ['country', 'client']
+
+
+def many_chunks():
+    return [(f"Spending part {i}", "spending amount " * 50 + f"value {i}") for i in range(12)]
+
+
+def test_chunk_count_is_limited():
+    index = BM25Index(many_chunks())
+    assert len(index.search("spending amount", top_k=CONTEXT_CHUNKS)) == CONTEXT_CHUNKS
+
+
+def test_context_size_is_limited():
+    index = BM25Index(many_chunks())
+    results = index.search("spending amount", top_k=10, max_chars=CONTEXT_MAX_CHARS)
+    size = sum(len(heading) + len(body) for heading, body in results)
+    assert 0 < len(results) < 10
+    assert size <= CONTEXT_MAX_CHARS
+    # One more chunk would have gone over the limit
+    assert size + len(''.join(many_chunks()[0])) > CONTEXT_MAX_CHARS
+
+
+def test_best_chunk_is_kept_even_if_larger_than_the_limit():
+    index = BM25Index([("Spending", "spending " * 1000), ("Other", "unrelated text")])
+    results = index.search("spending", max_chars=100)
+    assert [heading for heading, _ in results] == ["Spending"]
@@ -0,0 +1,111 @@
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from data_visualisation import chatbot
+from data_visualisation.date_index import DateIndex
+from data_visualisation.llm_client import StubClient
+from data_visualisation.query_engine import QueryEngine
+from data_visualisation.response_cache import ResponseCache
+from data_visualisation.stub_models import StubToolModel
+
+
+def run_chatbot(query_engine=None):
+    from data_visualisation.chatbot import chatbot
+    chatbot(query_engine=query_engine)
+
+
+class FailingClient(StubClient):
+    """
+    A model whose requests fail, as when the network is down.
+    """
+
+    def generate(self, prompt):
+        raise ConnectionError("network unreachable")
+
+    def stream(self, prompt):
+        yield "Partial "
+        raise ConnectionError("network unreachable")
+
+
+@pytest.fixture
+def query_engine():
+    transactions = pd.DataFrame({
+        'client_id': [1, 2, 3, 1],
+        'amount': [10.0, 20.0, 5.0, 30.0],
+        'date': pd.to_datetime(['2024-03-01', '2024-03-05', '2024-03-20', '2024-04-02']),
+    })
+    return QueryEngine({
+        'transactions_index': DateIndex(transactions, 'date', value_column='amount'),
+        'spender_index': None,
+        'clients': pd.DataFrame({'client_id': [1, 2, 3], 'name': ['Ann', 'Bob', 'Cem']}),
+        'memberships': pd.DataFrame({'client_id': [1, 2, 3], 'tier': ['Gold', 'Silver', 'Gold']}),
+    })
+
+
+@pytest.fixture
+def app(monkeypatch):
+    def start(client, query_engine=None):
+        monkeypatch.setattr(chatbot, 'get_llm_client', lambda: client)
+        monkeypatch.setattr(chatbot, 'get_response_cache', lambda: ResponseCache(directory=''))
+        app = AppTest.from_function(run_chatbot, kwargs={'query_engine': query_engine})
+        app.run()
+        return app
+    return start
+
+
+def test_answer_from_the_model(app):
+    client = StubClient()
+    chat = app(client)
+    chat.chat_input[0].set_value("Which country has the most clients?").run()
+
+    assert not chat.exception and not chat.error
+    assert "Answered from: Geographic Analysis" in chat.chat_message[1].markdown[0].value
+    assert client.calls == 1
+
+
+def test_model_failure_is_shown(app):
+    chat = app(FailingClient())
+    chat.chat_input[0].set_value("Which country has the most clients?").run()
+
+    assert not chat.exception
+    assert [error.value for error in chat.error] == ["The model could not answer: network unreachable"]
+
+
+def test_question_a_tool_answers_is_computed_from_the_data(app, query_engine, monkeypatch):
+    model = StubToolModel()
+    monkeypatch.setattr(chatbot, 'StubToolModel', lambda: model)
+    chat = app(StubClient(), query_engine)
+    chat.chat_input[0].set_value("Who were the top 2 spenders in March 2024?").run()
+
+    assert not chat.exception and not chat.error
+    answer = chat.chat_message[1].markdown[0].value
+    assert answer.startswith("`top_spenders(start_date=2024-03-01, end_date=2024-03-31, k=2)`")
+    assert "| Bob " in answer and "| Ann " in answer and "Cem" not in answer
+    assert chat.chat_message[1].caption[0].value.startswith("Computed from the data")
+    # One streamed request picks the tool; there is no separate routing call
+    assert model.calls == 1
+
+
+def test_question_no_tool_answers_is_streamed(app, query_engine, monkeypatch):
+    model = StubToolModel()
+    monkeypatch.setattr(chatbot, 'StubToolModel', lambda: model)
+    chat = app(StubClient(), query_engine)
+    chat.chat_input[0].set_value("Which country has the most clients?").run()
+
+    assert not chat.exception and not chat.error
+    assert "Answered from: Geographic Analysis" in chat.chat_message[1].markdown[0].value
+    assert "Question: Which country has the most clients?" in model.last_prompt
+    assert model.calls == 1
+
+
+@pytest.mark.parametrize('pieces, is_call', [
+    (["", "  ", '{"tool"', ': "x"}'], True),
+    (["\n```json\n", "{}"], True),
+    (["Canada ", "has ", "the most."], False),
+    ([], False),
+])
+def test_peek_tool_call_keeps_every_piece(pieces, is_call):
+    peeked, rest = chatbot.peek_tool_call(iter(pieces))
+    assert peeked == is_call
+    assert list(rest) == pieces
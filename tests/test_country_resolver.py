@@ -0,0 +1,90 @@
+import pandas as pd
+import pycountry
+import country_converter as coco
+import pytest
+
+from data_visualisation import country_resolver
+from data_visualisation.country_resolver import alpha3_for, country_name_for, map_alpha3, map_country_names
+
+
+def baseline_iso_alpha3(country_name):
+    """
+    get_iso_alpha3 as it was before the country table.
+    """
+    try:
+        country = pycountry.countries.search_fuzzy(country_name)
+        return country[0].alpha_3 if country else None
+    except (LookupError, AttributeError):
+        return None
+
+
+def baseline_country_name(country_code):
+    """
+    get_country_name as it was before the country table.
+    """
+    try:
+        country = pycountry.countries.get(alpha_2=country_code.upper())
+        if country:
+            return country.name
+        else:
+            country_name = coco.convert(names=country_code, to='name_short')
+            return country_name if country_name != "not found" else 'Unknown'
+    except (KeyError, AttributeError):
+        return 'Unknown'
+
+
+NATIONALITIES = [
+    'France', 'germany', 'UNITED KINGDOM', 'United States', 'Korea, Republic of', 'Bolivia',
+    'Russia', 'Vietnam', 'Viet Nam', 'Iran', 'Taiwan', 'Czechia', 'Côte d\'Ivoire',
+    'FR', 'deu', '826', 'Frnace', 'Atlantis', '', None,
+]
+
+CODES = ['FR', 'fr', 'GB', 'US', 'KR', 'CI', 'FRA', 'gbr', 'USA', 'KOR', 'CIV', 'TWN', 'XK', 'ZZZ', '', None]
+
+
+@pytest.fixture(scope='module', autouse=True)
+def country_table(tmp_path_factory):
+    """
+    Builds the country table afresh in a temporary location, once for the module.
+    """
+    path = tmp_path_factory.mktemp('country') / 'country_table.json'
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv('COUNTRY_TABLE_PATH', str(path))
+        monkeypatch.setattr(country_resolver, '_table', None)
+        yield path
+
+
+@pytest.mark.parametrize('nationality', NATIONALITIES)
+def test_alpha3_matches_baseline(nationality):
+    assert alpha3_for(nationality) == baseline_iso_alpha3(nationality)
+
+
+@pytest.mark.parametrize('code', CODES)
+def test_country_name_matches_baseline(code):
+    assert country_name_for(code) == baseline_country_name(code)
+
+
+def values(series):
+    """
+    The values of a series, missing ones as None.
+    """
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def test_column_mapping_matches_baseline():
+    nationalities = pd.Series(NATIONALITIES * 3)
+    expected = values(nationalities.apply(baseline_iso_alpha3))
+    assert values(map_alpha3(nationalities)) == expected
+    assert values(map_alpha3(nationalities.astype('category'))) == expected
+
+    codes = pd.Series([code for code in CODES if code is not None] * 2)
+    assert values(map_country_names(codes)) == values(codes.apply(baseline_country_name))
+
+
+def test_table_is_stored_and_reused(country_table, monkeypatch):
+    alpha3_for('France')
+    assert country_table.exists()
+
+    monkeypatch.setattr(country_resolver, '_table', None)
+    monkeypatch.setattr(country_resolver, 'build_country_table', lambda: pytest.fail('table rebuilt'))
+    assert alpha3_for('Germany') == 'DEU'
@@ -0,0 +1,52 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from data_visualisation import dashboard_sections
+
+
+def run_sections():
+    import streamlit as st
+    from data_visualisation.dashboard_sections import begin_rerun, dashboard_section, end_rerun
+
+    @dashboard_section("Header")
+    def header():
+        st.write("header")
+
+    @dashboard_section("Late section")
+    def late_section():
+        st.write("late")
+
+    begin_rerun()
+    header()
+    end_rerun()
+    # Runs after end_rerun, as a fragment rerun does
+    late_section()
+
+
+def test_section_times_are_recorded_per_rerun():
+    app = AppTest.from_function(run_sections)
+    app.run()
+
+    assert not app.exception
+    timings = app.session_state['section_timings']
+    assert timings['Header']['rerun'] == 'full'
+    assert timings['Late section']['rerun'] == 'fragment'
+    assert all(entry['seconds'] >= 0 for entry in timings.values())
+
+
+@pytest.mark.parametrize('enabled', [True, False])
+def test_widget_sections_run_as_fragments(monkeypatch, enabled):
+    fragments = []
+    monkeypatch.setattr(dashboard_sections, 'FRAGMENTS_ENABLED', enabled)
+    monkeypatch.setattr(dashboard_sections.st, 'fragment', lambda section: fragments.append(section) or section)
+
+    @dashboard_sections.dashboard_section("Section", fragment=True)
+    def section():
+        return "shown"
+
+    @dashboard_sections.dashboard_section("Static section")
+    def static_section():
+        return "shown"
+
+    assert len(fragments) == (1 if enabled else 0)
+    assert section.__name__ == 'section'
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_visualisation import parallel_preprocessor
+from data_visualisation.data_preprocessor import DTYPE_PLAN, apply_dtype_plan, preprocess_data
+
+
+def baseline_preprocess_data(raw_clients, raw_memberships, raw_transactions):
+    """
+    preprocess_data as it was before the dtype plan, without the country codes.
+    """
+    clients = raw_clients.copy()
+    memberships = raw_memberships.copy()
+    transactions = raw_transactions.copy()
+
+    for df in [clients, memberships, transactions]:
+        if '_id' in df.columns:
+            df['_id'] = df['_id'].astype(str)
+
+    date_columns = {
+        'clients': ['date_joined', 'birthdate'],
+        'memberships': ['start_date', 'end_date'],
+        'transactions': ['date']
+    }
+    frames = {'clients': clients, 'memberships': memberships, 'transactions': transactions}
+    for df_name, cols in date_columns.items():
+        df = frames[df_name]
+        for col in cols:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], errors='coerce')
+
+    for df in [clients, memberships, transactions]:
+        if 'client_id' in df.columns:
+            df['client_id'] = (
+                df['client_id']
+                .astype(str)
+                .str.replace('[^0-9]', '', regex=True)
+                .replace('', '0')
+                .astype(int)
+            )
+
+    merged_data = pd.merge(clients, memberships, on='client_id', how='inner', validate='many_to_one')
+
+    if 'birthdate' in clients.columns:
+        clients['age'] = (
+            (pd.Timestamp.now() - clients['birthdate']).dt.days // 365.25
+        ).clip(0, 120)
+        clients['age'] = clients['age'].fillna(0).astype(int)
+
+    if 'amount' in transactions.columns:
+        transactions = transactions[transactions['amount'] > 0]
+
+    return clients, memberships, transactions, merged_data
+
+
+@pytest.fixture
+def raw_frames():
+    """
+    Raw frames as they come from MongoDB, with the messy values of the real data.
+    """
+    clients = pd.DataFrame({
+        '_id': ['c1', 'c2', 'c3', 'c4', 'c5'],
+        'client_id': ['C-001', '2', None, 'client 0004', 'no id'],
+        'name': ['Ann', 'Bob', 'Cy', 'Di', 'Ed'],
+        'birthdate': ['1980-02-29', 'not a date', '2001-12-31', None, '1950-06-15'],
+        'date_joined': ['2023-01-01', '2023-05-17T10:30:00', 'bad', '2024-02-29', '2022-11-30'],
+        'nationality': ['France', 'Germany', None, 'France', 'Japan'],
+    })
+    memberships = pd.DataFrame({
+        '_id': ['m1', 'm2', 'm3'],
+        'membership_id': ['a', 'b', 'c'],
+        'client_id': ['1', 'C-002', '4'],
+        'tier': ['Gold', 'Bronze', 'Gold'],
+        'status': ['ACTIVE', 'INACTIVE', 'ACTIVE'],
+        'start_date': ['2023-01-01', '2023-06-01', None],
+        'end_date': [None, '2024-06-01', '2025-01-01'],
+    })
+    transactions = pd.DataFrame({
+        '_id': [f't{i}' for i in range(6)],
+        'transaction_id': [f'x{i}' for i in range(6)],
+        'client_id': [1, 2, 2, 4, 7, 1],
+        'amount': [10.5, -3.0, 0.0, 99.99, 12.0, 1e6],
+        'date': ['2024-01-01', '2024-01-02', '2024-02-29', 'oops', '2024-03-01', '2024-12-31'],
+    })
+    return clients, memberships, transactions
+
+
+def test_preprocess_data_matches_baseline(raw_frames):
+    expected = baseline_preprocess_data(*raw_frames)
+    result = preprocess_data(*raw_frames)
+
+    for frame, baseline in zip(result, expected):
+        frame = frame.drop(columns=['country_code'], errors='ignore')
+        for column in frame.select_dtypes('category').columns:
+            # Categorical labels compared as the strings they were, missing as None
+            frame[column] = frame[column].astype(object).where(frame[column].notna(), None)
+        pd.testing.assert_frame_equal(frame, baseline, check_dtype=False)
+
+
+def test_parallel_preprocess_data_matches_preprocess_data(raw_frames, monkeypatch):
+    # Spread even these few rows over the workers
+    monkeypatch.setattr(parallel_preprocessor, 'PARALLEL_MIN_ROWS', 0)
+    try:
+        result = parallel_preprocessor.parallel_preprocess_data(*raw_frames, workers=2)
+    finally:
+        parallel_preprocessor.close_process_pool()
+
+    for frame, expected in zip(result, preprocess_data(*raw_frames)):
+        pd.testing.assert_frame_equal(frame, expected)
+
+
+def test_dtype_plan_sets_compact_dtypes(raw_frames):
+    for name, raw in zip(('clients', 'memberships', 'transactions'), raw_frames):
+        frame = apply_dtype_plan(raw.copy(), DTYPE_PLAN[name])
+        for column, kind in DTYPE_PLAN[name].items():
+            dtype = frame[column].dtype
+            if kind == 'id':
+                assert dtype == np.int32
+            elif kind == 'datetime':
+                assert pd.api.types.is_datetime64_dtype(dtype)
+            elif kind == 'category':
+                assert isinstance(dtype, pd.CategoricalDtype)
+            else:
+                assert dtype == np.dtype(kind)
+
+
+def test_integer_ids_take_the_fast_path():
+    ids = pd.Series([3, 1, 2], dtype='int64')
+    frame = apply_dtype_plan(pd.DataFrame({'client_id': ids}), {'client_id': 'id'})
+    assert frame['client_id'].tolist() == [3, 1, 2]
+    assert frame['client_id'].dtype == np.int32
@@ -0,0 +1,50 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from data_visualisation.date_index import DateIndex, day_end
+from data_visualisation.query_engine import QueryEngine
+
+
+@pytest.fixture
+def transactions():
+    return pd.DataFrame({
+        'client_id': [1, 2, 1, 2],
+        'name': ['Ann', 'Bob', 'Ann', 'Bob'],
+        'amount': [10.0, 20.0, 30.0, 40.0],
+        # The last transaction is late on the end date of the ranges below
+        'date': pd.to_datetime(['2024-02-28 00:00:00', '2024-03-01 00:00:00',
+                                '2024-03-10 12:00:00', '2024-03-31 23:59:59']),
+    })
+
+
+@pytest.mark.parametrize('date', [datetime.date(2024, 3, 31), pd.Timestamp('2024-03-31'),
+                                  pd.Timestamp('2024-03-31 08:15')])
+def test_day_end(date):
+    assert day_end(date) == pd.Timestamp('2024-03-31 23:59:59.999999999')
+
+
+def test_range_includes_the_whole_end_date(transactions):
+    index = DateIndex(transactions, 'date', value_column='amount')
+    start, end = pd.Timestamp('2024-03-01'), day_end(datetime.date(2024, 3, 31))
+
+    assert index.slice(start, end)['amount'].tolist() == [20.0, 30.0, 40.0]
+    assert index.count(start, end) == 3
+    assert index.total(start, end) == 90.0
+
+
+def test_query_engine_includes_the_end_date(transactions):
+    engine = QueryEngine({
+        'transactions_index': DateIndex(transactions, 'date', value_column='amount'),
+        'spender_index': None,
+        'clients': transactions[['client_id', 'name']],
+        'memberships': pd.DataFrame({'client_id': [1, 2], 'tier': ['Gold', 'Silver']}),
+    })
+    dates = {'start_date': '2024-03-01', 'end_date': '2024-03-31'}
+
+    total = engine.execute({'tool': 'total_spend', 'arguments': dates})
+    assert total['total_amount'].tolist() == [90.0]
+
+    top = engine.execute({'tool': 'top_spenders', 'arguments': {**dates, 'k': 1}})
+    assert top[['client_id', 'amount']].values.tolist() == [[2, 60.0]]
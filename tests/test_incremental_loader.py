@@ -0,0 +1,166 @@
+import mongomock
+import pytest
+
+import data_loader
+from data_loader import IncrementalMongoLoader
+
+
+class FakeChangeStream:
+    """
+    Replays the events recorded for a collection from a resume token, which is the
+    position in the event list.
+    """
+
+    def __init__(self, events, start):
+        self.events = events
+        self.position = start
+        self.alive = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    @property
+    def resume_token(self):
+        return self.position
+
+    def try_next(self):
+        if self.position >= len(self.events):
+            return None
+        self.position += 1
+        return self.events[self.position - 1]
+
+
+class Transactions:
+    """
+    A mongomock transactions collection that records change events when asked to.
+    """
+
+    def __init__(self, db, change_streams):
+        self.collection = db['transactions']
+        self.events = []
+        if change_streams:
+            events = self.events
+            self.watch = lambda *args, resume_after=None, **kwargs: FakeChangeStream(
+                events, len(events) if resume_after is None else resume_after
+            )
+
+    def insert(self, document):
+        self.collection.insert_one(document)
+        self.events.append({'operationType': 'insert', 'documentKey': {'_id': document['_id']},
+                            'fullDocument': dict(document)})
+
+    def update(self, key, **fields):
+        self.collection.update_one({'_id': key}, {'$set': fields})
+        self.events.append({'operationType': 'update', 'documentKey': {'_id': key},
+                            'fullDocument': self.collection.find_one({'_id': key})})
+
+    def delete(self, key):
+        self.collection.delete_one({'_id': key})
+        self.events.append({'operationType': 'delete', 'documentKey': {'_id': key}})
+
+
+def transaction(key, amount, version=1):
+    return {'_id': key, 'transaction_id': f't{key}', 'client_id': 1, 'amount': amount,
+            'date': '2024-01-01', 'version': version}
+
+
+@pytest.fixture(params=['change_stream', 'polling', 'polling_version'])
+def setup(request, monkeypatch):
+    db = mongomock.MongoClient().db
+    transactions = Transactions(db, request.param == 'change_stream')
+    if request.param == 'change_stream':
+        monkeypatch.setattr(mongomock.collection.Collection, 'watch',
+                            lambda collection, *args, **kwargs: transactions.watch(*args, **kwargs),
+                            raising=False)
+    for key in range(1, 4):
+        transactions.insert(transaction(key, 10.0 * key))
+
+    version_field = 'version' if request.param == 'polling_version' else None
+    loader = IncrementalMongoLoader(db, collections=('transactions',), workers=1, version_field=version_field)
+    loader.sync()
+    assert loader._state['transactions']['mode'] == ('change_stream' if request.param == 'change_stream' else 'polling')
+    return loader, transactions
+
+
+def detects_changes(loader):
+    """
+    Polling without a version field only picks up inserts above the `_id` high-water mark.
+    """
+    state = loader._state['transactions']
+    if state['mode'] == 'polling' and loader.version_field is None:
+        pytest.skip("Polling without a version field does not detect updates and deletes")
+
+
+def amounts(loader):
+    (frame,) = loader.sync()
+    return dict(zip(frame['_id'], frame['amount']))
+
+
+def test_insert(setup):
+    loader, transactions = setup
+    transactions.insert(transaction(4, 40.0))
+    assert amounts(loader) == {1: 10.0, 2: 20.0, 3: 30.0, 4: 40.0}
+
+
+def test_update(setup):
+    loader, transactions = setup
+    detects_changes(loader)
+    transactions.update(2, amount=500.0, version=2)
+    assert amounts(loader) == {1: 10.0, 2: 500.0, 3: 30.0}
+
+
+def test_delete(setup):
+    loader, transactions = setup
+    detects_changes(loader)
+    transactions.delete(3)
+    assert amounts(loader) == {1: 10.0, 2: 20.0}
+
+
+def test_delete_then_insert_lower_id(setup):
+    loader, transactions = setup
+    detects_changes(loader)
+    transactions.delete(1)
+    transactions.insert(transaction(0, 5.0))
+    assert amounts(loader) == {0: 5.0, 2: 20.0, 3: 30.0}
+
+
+def test_version_field_not_served(setup):
+    loader, _ = setup
+    (frame,) = loader.sync()
+    assert 'version' not in frame.columns
+
+
+def test_polling_without_version_reads_only_new_documents():
+    db = mongomock.MongoClient().db
+    transactions = Transactions(db, change_streams=False)
+    for key in range(1, 4):
+        transactions.insert(transaction(key, 10.0 * key))
+    loader = IncrementalMongoLoader(db, collections=('transactions',), workers=1)
+    loader.sync()
+
+    transactions.update(2, amount=500.0)
+    transactions.insert(transaction(4, 40.0))
+    # The update is below the high-water mark and is kept as it was
+    assert amounts(loader) == {1: 10.0, 2: 20.0, 3: 30.0, 4: 40.0}
+
+
+def test_pool_settings_are_read_when_connecting(monkeypatch):
+    # Set after data_loader was imported, as a .env loaded by the app later would be
+    monkeypatch.setenv('MONGO_MAX_POOL_SIZE', '7')
+    monkeypatch.setenv('MONGO_BATCH_SIZE', '123')
+    clients = []
+
+    def mongo_client(uri, **options):
+        clients.append(options)
+        return mongomock.MongoClient()
+
+    monkeypatch.setattr(data_loader, 'MongoClient', mongo_client)
+    try:
+        db = data_loader.get_mongo_client('mongodb://pool-settings')['test']
+    finally:
+        data_loader.close_mongo_clients()
+    assert clients == [{'maxPoolSize': 7}]
+    assert IncrementalMongoLoader(db).batch_size == 123
@@ -0,0 +1,163 @@
+import threading
+import time
+
+import pytest
+
+from data_visualisation.lazy_dataset import LazyDataset
+
+
+class Counting:
+    """
+    Item computations that record how often each item was computed.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.calls = {}
+
+    def register(self, name, compute, **kwargs):
+        def counted(data):
+            self.calls[name] = self.calls.get(name, 0) + 1
+            return compute(data)
+        self.data.register(name, counted, **kwargs)
+
+
+@pytest.fixture
+def items():
+    """
+    source -> doubled -> total, and source -> label; other is independent.
+    """
+    source = {'values': [1, 2, 3]}
+    items = Counting(LazyDataset())
+    items.register('source', lambda data: list(source['values']))
+    items.register('doubled', lambda data: [value * 2 for value in data['source']])
+    items.register('total', lambda data: sum(data['doubled']))
+    items.register('label', lambda data: f"{len(data['source'])} values")
+    items.register('other', lambda data: 'other')
+    items.source = source
+    return items
+
+
+def test_items_are_computed_once(items):
+    assert items.data['total'] == 12
+    assert items.data['total'] == 12
+    assert items.calls == {'source': 1, 'doubled': 1, 'total': 1}
+
+
+def test_invalidating_an_item_drops_everything_derived_from_it(items):
+    for name in ('total', 'label', 'other'):
+        items.data[name]
+    items.source['values'] = [5]
+
+    items.data.invalidate('source')
+    assert not any(items.data.is_computed(name) for name in ('source', 'doubled', 'total', 'label'))
+    assert items.data.is_computed('other')
+
+    assert items.data['total'] == 10
+    assert items.data['label'] == '1 values'
+    assert items.calls == {'source': 2, 'doubled': 2, 'total': 2, 'label': 2, 'other': 1}
+
+
+def test_invalidating_a_derived_item_keeps_its_sources(items):
+    items.data['total']
+    items.data.invalidate('doubled')
+    assert items.data.is_computed('source')
+    assert not items.data.is_computed('total')
+
+    assert items.data['total'] == 12
+    assert items.calls['source'] == 1
+
+
+def test_dependencies_follow_the_latest_computation():
+    switch = {'use_a': True}
+    items = LazyDataset()
+    items.register('a', lambda data: 'a')
+    items.register('b', lambda data: 'b')
+    items.register('chosen', lambda data: data['a'] if switch['use_a'] else data['b'])
+    assert items['chosen'] == 'a'
+
+    switch['use_a'] = False
+    items.refresh('chosen', wait=True)
+    assert items['chosen'] == 'b'
+
+    # `chosen` no longer reads `a`, so dropping `a` keeps it
+    items.invalidate('a')
+    assert items.is_computed('chosen')
+    items.invalidate('b')
+    assert not items.is_computed('chosen')
+
+
+def test_unknown_item():
+    with pytest.raises(KeyError, match='Unknown dataset item'):
+        LazyDataset()['missing']
+
+
+class SlowSource:
+    """
+    Stands in for the database: each sync returns the next version of the data, and
+    every sync after the first waits until `release` is set.
+    """
+
+    def __init__(self):
+        self.syncs = 0
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def sync(self):
+        with self._lock:
+            self.syncs += 1
+            version = self.syncs
+        if version > 1:
+            self.release.wait(timeout=10)
+        return {'version': version}
+
+
+def test_sessions_share_one_refresh_and_never_block():
+    source = SlowSource()
+    data = LazyDataset()
+    # The first version expires at once, the second never
+    data.register('source', lambda data: source.sync(), ttl=lambda value: 0 if value['version'] == 1 else None)
+    data.register('doubled', lambda data: {'version': data['source']['version']})
+    data.register('report', lambda data: (data['source']['version'], data['doubled']['version']))
+    assert data['report'] == (1, 1)
+
+    reports, waits = [], []
+    refreshed, stop = threading.Event(), threading.Event()
+
+    def session():
+        while not stop.is_set():
+            start = time.perf_counter()
+            data['source']
+            report = data['report']
+            waits.append(time.perf_counter() - start)
+            reports.append(report)
+            if report == (2, 2):
+                refreshed.set()
+            # Rendering the page, between reads
+            time.sleep(0.001)
+
+    sessions = [threading.Thread(target=session) for _ in range(20)]
+    for thread in sessions:
+        thread.start()
+    try:
+        # Every session finds the source expired while the new version is being read
+        time.sleep(0.3)
+        assert source.syncs == 2
+        assert set(reports) == {(1, 1)}
+        served_while_refreshing = len(reports)
+
+        source.release.set()
+        assert refreshed.wait(timeout=5)
+    finally:
+        stop.set()
+        source.release.set()
+        for thread in sessions:
+            thread.join(timeout=5)
+
+    assert served_while_refreshing > len(sessions)
+    assert max(waits) < 0.3
+    # One sync for the refresh, whatever the number of sessions
+    assert source.syncs == 2
+    # Each item was computed from one version of the data
+    assert set(reports) == {(1, 1), (2, 2)}
+    assert data['report'] == (2, 2)
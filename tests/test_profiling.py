@@ -0,0 +1,86 @@
+import json
+import threading
+import tracemalloc
+
+import pytest
+
+from data_visualisation import profiling
+from data_visualisation.profiling import profile_block, profile_history, profile_summary, set_profiling
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    """
+    Profiling turned on, logging to a temporary file with an empty history.
+    """
+    path = tmp_path / 'profile.jsonl'
+    monkeypatch.setattr(profiling, 'PROFILE_LOG_PATH', str(path))
+    monkeypatch.setattr(profiling, '_history', profiling.collections.deque(maxlen=profiling.PROFILE_HISTORY))
+    set_profiling(True)
+    yield path
+    set_profiling(False)
+
+
+def test_nested_blocks_record_their_parent_and_peak(log):
+    with profile_block('section', 'section') as outer:
+        outer['rows_in'] = 3
+        with profile_block('inner', 'dataset'):
+            data = bytearray(4 * 2 ** 20)
+        del data
+
+    records = [json.loads(line) for line in log.read_text().splitlines()]
+    assert [(record['name'], record['parent']) for record in records] == [('inner', 'section'), ('section', None)]
+    inner, section = records
+    assert inner['peak_memory_bytes'] >= 4 * 2 ** 20
+    # The parent's peak includes its child's even though the child reset it
+    assert section['peak_memory_bytes'] >= inner['peak_memory_bytes']
+    assert section['rows_in'] == 3
+    assert list(profile_history()['name']) == ['inner', 'section']
+    assert not tracemalloc.is_tracing()
+
+
+def test_caller_set_seconds_are_kept(log):
+    with profile_block('timed', 'section') as record:
+        record['seconds'] = 12.5
+    assert profile_history()['seconds'].tolist() == [12.5]
+
+
+def test_tracing_continues_until_the_last_open_block_closes(log):
+    opened, release = threading.Event(), threading.Event()
+
+    def other_block():
+        with profile_block('other', 'load'):
+            opened.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=other_block)
+    thread.start()
+    try:
+        assert opened.wait(5)
+        with profile_block('mine', 'section'):
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        release.set()
+        thread.join()
+    assert not tracemalloc.is_tracing()
+
+
+def test_turned_off_blocks_record_nothing(log):
+    set_profiling(False)
+    with profile_block('section', 'section') as record:
+        assert record is None
+    assert not log.exists()
+
+
+def test_summary_per_step(log):
+    for seconds in (0.1, 0.3):
+        with profile_block('slow', 'section') as record:
+            record['seconds'] = seconds
+    with profile_block('fast', 'section') as record:
+        record['seconds'] = 0.01
+
+    summary = profile_summary(profile_history())
+    assert summary['name'].tolist() == ['slow', 'fast']
+    assert summary['calls'].tolist() == [2, 1]
+    assert summary['mean_ms'].iloc[0] == pytest.approx(200.0)
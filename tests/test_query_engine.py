@@ -0,0 +1,27 @@
+import pytest
+
+from data_visualisation.query_engine import TOOLS, resolve_country
+
+
+@pytest.mark.parametrize('country, code', [
+    ('DEU', 'DEU'),
+    ('deu', 'DEU'),
+    ('Ger', 'DEU'),
+    ('Germany', 'DEU'),
+    ('gbr', 'GBR'),
+])
+def test_resolve_country(country, code):
+    assert resolve_country(country) == code
+
+
+@pytest.mark.parametrize('country', ['UAE', 'XYZ', 'Narnia'])
+def test_unknown_country(country):
+    with pytest.raises(ValueError, match="Unknown country"):
+        resolve_country(country)
+
+
+@pytest.mark.parametrize('tool, name', [('top_spenders', 'k'), ('clients_by', 'top')])
+@pytest.mark.parametrize('value', [0, -3, '-1'])
+def test_result_size_is_at_least_one(tool, name, value):
+    parameter = TOOLS[tool][1][name]
+    assert parameter.coerce(name, value) == 1
@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+from data_visualisation.read_only import ReadOnlyFrame, read_only
+
+
+@pytest.fixture
+def shared():
+    # As the app runs
+    with pd.option_context("mode.copy_on_write", True):
+        yield read_only(pd.DataFrame({'client_id': [3, 1, 2], 'amount': [10.0, None, 30.0]}))
+
+
+@pytest.mark.parametrize('modify', [
+    lambda frame: frame.__setitem__('amount', 0.0),
+    lambda frame: frame.__setitem__('new', 1),
+    lambda frame: frame.__delitem__('amount'),
+    lambda frame: setattr(frame, 'columns', ['a', 'b']),
+    lambda frame: setattr(frame, 'amount', 0.0),
+    lambda frame: frame.insert(0, 'new', 1),
+    lambda frame: frame.pop('amount'),
+    lambda frame: frame.loc.__setitem__((0, 'amount'), 0.0),
+    lambda frame: frame.iloc.__setitem__((0, 1), 0.0),
+    lambda frame: frame.at.__setitem__((0, 'amount'), 0.0),
+    lambda frame: frame.iat.__setitem__((0, 1), 0.0),
+    lambda frame: frame.fillna(0, inplace=True),
+    lambda frame: frame.sort_values('client_id', inplace=True),
+    lambda frame: frame.drop(columns='amount', inplace=True),
+    lambda frame: frame.reset_index(drop=True, inplace=True),
+    lambda frame: frame.rename(columns={'amount': 'spend'}, inplace=True),
+])
+def test_shared_frame_cannot_be_modified(shared, modify):
+    with pytest.raises(TypeError, match="shared dataset frame"):
+        modify(shared)
+    assert shared['amount'].tolist()[::2] == [10.0, 30.0]
+    assert shared.columns.tolist() == ['client_id', 'amount']
+
+
+def test_reads_work(shared):
+    assert shared.loc[1, 'client_id'] == 1
+    assert shared.iat[2, 1] == 30.0
+    assert shared.sort_values('client_id')['client_id'].tolist() == [1, 2, 3]
+    assert shared.fillna(0)['amount'].tolist() == [10.0, 0.0, 30.0]
+
+
+@pytest.mark.parametrize('derive', [
+    lambda frame: frame.copy(),
+    lambda frame: frame.copy(deep=False),
+    lambda frame: frame[['amount']],
+    lambda frame: frame[frame['client_id'] > 1],
+    lambda frame: frame.assign(doubled=frame['amount'] * 2),
+    lambda frame: frame.sort_values('client_id'),
+])
+def test_derived_frames_are_writable_copies(shared, derive):
+    derived = derive(shared)
+    assert type(derived) is pd.DataFrame
+
+    derived['amount'] = 0.0
+    derived.loc[derived.index[0], 'amount'] = -1.0
+    derived.fillna(0, inplace=True)
+
+    assert shared['amount'].tolist()[::2] == [10.0, 30.0]
+
+
+def test_column_changes_do_not_reach_the_shared_frame(shared):
+    amounts = shared['amount']
+    amounts.iloc[0] = -1.0
+    assert shared['amount'].iloc[0] == 10.0
+
+
+def test_read_only_wraps_nested_frames():
+    frame = pd.DataFrame({'a': [1]})
+    wrapped = read_only((frame, [frame], {'x': 1}))
+    assert isinstance(wrapped[0], ReadOnlyFrame) and isinstance(wrapped[1][0], ReadOnlyFrame)
+    assert wrapped[2] == {'x': 1}
+    assert read_only(wrapped[0]) is wrapped[0]
@@ -0,0 +1,102 @@
+import pytest
+
+from data_visualisation import response_cache
+from data_visualisation.llm_client import StubClient
+from data_visualisation.response_cache import ResponseCache, data_version
+
+CHUNKS = [("Geographic Analysis", "Canada: 61\nGermany: 58")]
+
+
+class Clock:
+    """
+    Stands in for the time module, moved forward by hand.
+    """
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache, 'time', clock)
+    return clock
+
+
+def ask(cache, client, question, chunks=CHUNKS, today='2025-01-01'):
+    """
+    Answers a question the way the chatbot does: from the cache, or from the model
+    and then cached.
+    """
+    key = ResponseCache.key(question, f"{data_version(chunks)}:{today}", client.name)
+    answer = cache.get(key)
+    if answer is None:
+        answer = client.generate(f"## {chunks[0][0]}\n{question}")
+        cache.set(key, answer)
+    return answer
+
+
+def test_repeated_question_is_answered_from_the_cache(clock):
+    cache, client = ResponseCache(directory=''), StubClient()
+    first = ask(cache, client, "Which country has the most clients?")
+    assert ask(cache, client, "  which country has the MOST clients ") == first
+    assert client.calls == 1
+
+
+def test_least_recently_used_answer_is_evicted(clock):
+    cache, client = ResponseCache(max_entries=2, directory=''), StubClient()
+    ask(cache, client, "first")
+    ask(cache, client, "second")
+    ask(cache, client, "first")
+    ask(cache, client, "third")
+    assert len(cache) == 2
+
+    ask(cache, client, "first")
+    assert client.calls == 3
+    ask(cache, client, "second")
+    assert client.calls == 4
+
+
+def test_answers_expire(clock):
+    cache, client = ResponseCache(ttl=60, directory=''), StubClient()
+    ask(cache, client, "question")
+    clock.now += 59
+    ask(cache, client, "question")
+    assert client.calls == 1
+
+    clock.now += 2
+    ask(cache, client, "question")
+    assert client.calls == 2
+
+
+def test_new_data_or_a_new_day_asks_again(clock):
+    cache, client = ResponseCache(directory=''), StubClient()
+    ask(cache, client, "question")
+    ask(cache, client, "question", chunks=[("Geographic Analysis", "Canada: 62\nGermany: 58")])
+    assert client.calls == 2
+    ask(cache, client, "question", today='2025-01-02')
+    assert client.calls == 3
+
+
+def test_answers_survive_a_restart(clock, tmp_path):
+    client = StubClient()
+    first = ask(ResponseCache(directory=str(tmp_path)), client, "question")
+
+    restarted = ResponseCache(directory=str(tmp_path))
+    assert ask(restarted, client, "question") == first
+    assert client.calls == 1
+
+    # Expired files are ignored and removed
+    clock.now += ResponseCache().ttl + 1
+    assert ask(ResponseCache(directory=str(tmp_path)), client, "question") == first
+    assert client.calls == 2
+
+
+def test_disk_keeps_the_newest_entries(clock, tmp_path):
+    cache, client = ResponseCache(max_entries=3, directory=str(tmp_path)), StubClient()
+    for question in ("a", "b", "c", "d", "e"):
+        ask(cache, client, question)
+    assert len(list(tmp_path.glob('*.json'))) == 3
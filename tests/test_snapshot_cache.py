@@ -0,0 +1,94 @@
+import json
+import os
+import time
+
+import pandas as pd
+import pytest
+
+import dataset
+from data_visualisation.lazy_dataset import LazyDataset
+from snapshot_cache import SNAPSHOT_MAX_AGE, SNAPSHOT_TABLES, load_snapshot, read_manifest, save_snapshot
+
+
+def frames():
+    clients = pd.DataFrame({
+        '_id': ['c1', 'c2', 'c3'],
+        'client_id': [1, 2, 3],
+        'country_code': pd.Categorical(['GBR', 'FRA', 'GBR']),
+        'date_joined': pd.to_datetime(['2024-01-05', '2024-02-10', '2024-02-11']),
+    })
+    memberships = pd.DataFrame({
+        '_id': ['m1', 'm2'],
+        'client_id': [1, 3],
+        'tier': pd.Categorical(['Gold', 'Bronze'], categories=['Bronze', 'Silver', 'Gold'], ordered=True),
+    })
+    transactions = pd.DataFrame({
+        '_id': ['t1', 't2', 't3'],
+        'client_id': [1, 2, 3],
+        'amount': [10.0, 20.5, 7.25],
+        'date': pd.to_datetime(['2024-01-31', '2024-02-01', '2024-03-15']),
+    })
+    merged_data = pd.merge(clients, memberships, on='client_id')
+    return clients, memberships, transactions, merged_data
+
+
+def test_round_trip_keeps_categoricals(tmp_path):
+    data = frames()
+    save_snapshot(data, str(tmp_path / 'snapshot'))
+
+    loaded, manifest = load_snapshot(str(tmp_path / 'snapshot'))
+    assert len(manifest['tables']['transactions']) == 3  # one file per month
+    for original, frame in zip(data, loaded):
+        frame = frame.sort_values('client_id', ignore_index=True)
+        expected = original.sort_values('client_id', ignore_index=True)
+        pd.testing.assert_frame_equal(frame, expected, check_dtype=False)
+        assert list(frame.dtypes.astype(str)) == list(original.dtypes.astype(str))
+    assert loaded[1]['tier'].cat.ordered
+
+
+def tamper_schema_hash(directory, name):
+    path = os.path.join(directory, 'manifest.json')
+    with open(path, encoding='utf-8') as file:
+        manifest = json.load(file)
+    manifest['table_schema_hashes'][name] = '0' * 64
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file)
+
+
+def test_schema_hash_mismatch_is_not_loaded(tmp_path):
+    directory = str(tmp_path / 'snapshot')
+    save_snapshot(frames(), directory)
+    tamper_schema_hash(directory, 'transactions')
+    assert load_snapshot(directory) is None
+
+
+def test_schema_hash_mismatch_falls_back_to_rebuild(tmp_path, monkeypatch):
+    directory = str(tmp_path / 'snapshot')
+    data = frames()
+    save_snapshot(data, directory)
+    tamper_schema_hash(directory, 'transactions')
+    monkeypatch.setenv('SNAPSHOT_DIR', directory)
+
+    rebuilds = []
+    monkeypatch.setattr(dataset, '_rebuild_snapshot', rebuilds.append)
+    fresh = dict(zip(SNAPSHOT_TABLES, data))
+    items = LazyDataset()
+    items.register('snapshot_manifest', lambda items: read_manifest(directory))
+    for name in ('clients', 'transactions'):
+        items.register(f'fresh_{name}', lambda items, name=name: fresh[name].assign(fresh=True))
+        items.register(name, dataset._served_frame(name))
+
+    # The intact table is served from the snapshot, the other one from the source
+    assert 'fresh' not in items['clients'].columns
+    assert items['transactions']['fresh'].all()
+    assert rebuilds == [items]
+
+
+@pytest.mark.parametrize('age, expected', [
+    (0, SNAPSHOT_MAX_AGE),
+    (SNAPSHOT_MAX_AGE - 600, 600),
+    (SNAPSHOT_MAX_AGE + 600, dataset.SNAPSHOT_RECHECK_INTERVAL),
+])
+def test_manifest_expires_with_the_snapshot_age(age, expected):
+    ttl = dataset._manifest_ttl({'created_at': time.time() - age})
+    assert ttl == pytest.approx(expected, abs=1)
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_visualisation.date_index import DateIndex, day_end
+from data_visualisation.query_engine import QueryEngine
+from data_visualisation.spender_index import SpenderIndex
+
+RANGES = [
+    ('2024-01-01', '2024-12-31'),
+    ('2024-03-05', '2024-03-05'),
+    ('2024-06-30', '2024-07-01'),
+    ('2023-01-01', '2024-01-10'),
+    ('2024-12-20', '2025-06-01'),
+    ('2025-01-01', '2025-02-01'),
+]
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.default_rng(3)
+    clients = pd.DataFrame({
+        'client_id': np.arange(1, 201),
+        'name': [f'client {i}' for i in range(1, 201)],
+        'country_code': rng.choice(['GBR', 'FRA', 'DEU'], 200),
+    })
+    clients = pd.concat([clients, clients.iloc[::9]], ignore_index=True)
+    memberships = pd.DataFrame({
+        'client_id': np.arange(1, 151),
+        'tier': rng.choice(['Bronze', 'Silver', 'Gold'], 150),
+    })
+    # Times of day throughout, and clients 201-220 missing from the clients data
+    transactions = pd.DataFrame({
+        'client_id': rng.integers(1, 221, 4000),
+        'amount': rng.gamma(2.0, 50.0, 4000).round(2),
+        'date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 366 * 24 * 60, 4000), unit='min'),
+    })
+    transactions.loc[::97, 'date'] = pd.NaT
+    return clients, memberships, transactions
+
+
+def expected_top(clients, memberships, transactions, start, end, k, tiers=None, countries=None):
+    """
+    Top spenders summed straight from the transactions of the range.
+    """
+    dates = transactions['date']
+    in_range = transactions[(dates >= pd.Timestamp(start)) & (dates <= day_end(end))]
+    totals = in_range.groupby('client_id')['amount'].sum()
+    attributes = clients.drop_duplicates('client_id').set_index('client_id')
+    totals = totals[totals.index.isin(attributes.index) & (totals > 0)]
+    if tiers:
+        tier = memberships.drop_duplicates('client_id').set_index('client_id')['tier']
+        totals = totals[tier.reindex(totals.index).isin(tiers).to_numpy()]
+    if countries:
+        totals = totals[attributes['country_code'].reindex(totals.index).isin(countries).to_numpy()]
+    return totals.sort_values(ascending=False, kind='stable').head(k)
+
+
+@pytest.mark.parametrize('start, end', RANGES)
+def test_totals_match_the_transactions(frames, start, end):
+    clients, memberships, transactions = frames
+    index = SpenderIndex(clients, memberships, transactions)
+
+    dates = transactions['date']
+    in_range = transactions[(dates >= pd.Timestamp(start)) & (dates <= day_end(end))]
+    expected = in_range.groupby('client_id')['amount'].sum().reindex(index.client_ids, fill_value=0.0)
+    np.testing.assert_allclose(index.totals(pd.Timestamp(start), pd.Timestamp(end)), expected.to_numpy())
+
+
+@pytest.mark.parametrize('start, end', RANGES)
+@pytest.mark.parametrize('k, tiers, countries', [
+    (5, None, None),
+    (12, ['Gold'], None),
+    (3, None, ['FRA', 'DEU']),
+    (50, ['Bronze', 'Silver'], ['GBR']),
+])
+def test_top_k_matches_the_transactions(frames, start, end, k, tiers, countries):
+    clients, memberships, transactions = frames
+    index = SpenderIndex(clients, memberships, transactions)
+
+    top = index.top_k(pd.Timestamp(start), pd.Timestamp(end), k=k, tiers=tiers, countries=countries)
+    expected = expected_top(clients, memberships, transactions, start, end, k, tiers, countries)
+    np.testing.assert_allclose(top['amount'], expected.to_numpy())
+    assert set(top['client_id']) == set(expected.index)
+
+
+def test_index_size_follows_the_transactions(frames):
+    clients, memberships, transactions = frames
+    index = SpenderIndex(clients, memberships, transactions)
+    assert len(index.keys) <= len(transactions)
+    assert len(index.cumulative) == len(index.keys) + 1
+
+
+def test_empty_transactions(frames):
+    clients, memberships, transactions = frames
+    index = SpenderIndex(clients, memberships, transactions.iloc[:0])
+    assert not index.totals(pd.Timestamp('2024-01-01'), pd.Timestamp('2024-12-31')).any()
+    assert index.top_k(pd.Timestamp('2024-01-01'), pd.Timestamp('2024-12-31')).empty
+
+
+@pytest.mark.parametrize('start, end', RANGES)
+def test_query_engine_answers_the_same_without_the_index(frames, start, end):
+    clients, memberships, transactions = frames
+    data = {
+        'clients': clients,
+        'memberships': memberships,
+        'transactions_index': DateIndex(transactions, 'date', value_column='amount'),
+    }
+    with_index = QueryEngine({**data, 'spender_index': SpenderIndex(clients, memberships, transactions)})
+    without_index = QueryEngine({**data, 'spender_index': None})
+
+    for arguments in ({'k': 7}, {'k': 4, 'tier': 'Silver'}, {'k': 10, 'country': 'GBR'}):
+        call = {'tool': 'top_spenders', 'arguments': {'start_date': start, 'end_date': end, **arguments}}
+        pd.testing.assert_frame_equal(with_index.execute(call), without_index.execute(call))
@@ -0,0 +1,83 @@
+import mongomock
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from data_visualisation.streaming_preprocessor import (BUDGET_SHARE, PROBE_ROWS, SPLIT_TOLERANCE, bounded_chunks,
+                                                       frame_bytes, iter_mongo_chunks, iter_parquet_chunks, read_partitions,
+                                                       stream_preprocess_transactions)
+
+
+def raw_chunk(client_ids, transaction_ids, month):
+    return pd.DataFrame({
+        'transaction_id': transaction_ids,
+        'client_id': client_ids,
+        'amount': [10.0] * len(client_ids),
+        'date': [f'2024-{month:02d}-15'] * len(client_ids),
+    })
+
+
+def test_partitions_take_ids_wider_than_the_first_chunk(tmp_path):
+    chunks = [
+        raw_chunk([1, 2], ['t1', 't2'], 1),            # int32 client ids
+        raw_chunk([3_000_000_000, 4], ['t3', 't4'], 2),  # int64 client ids
+        raw_chunk([5], [None], 2),                       # all-null transaction ids
+    ]
+    aggregates, writer = stream_preprocess_transactions(chunks, directory=str(tmp_path))
+
+    frame = read_partitions(str(tmp_path)).sort_values('client_id').reset_index(drop=True)
+    assert frame['client_id'].tolist() == [1, 2, 4, 5, 3_000_000_000]
+    assert frame['client_id'].dtype == 'int64'
+    assert aggregates.transactions == 5
+    assert len(read_partitions(str(tmp_path), start_date='2024-02-01')) == 3
+
+
+def test_partitions_take_a_column_typed_only_by_a_later_chunk(tmp_path):
+    chunks = [
+        raw_chunk([1], [None], 1),
+        raw_chunk([2], ['t2'], 1),
+    ]
+    stream_preprocess_transactions(chunks, directory=str(tmp_path))
+
+    frame = read_partitions(str(tmp_path)).sort_values('client_id')
+    assert frame['transaction_id'].tolist() == [None, 't2']
+
+
+@pytest.fixture
+def transactions():
+    rows = 20_000
+    return pd.DataFrame({
+        'transaction_id': [f't{i}' for i in range(rows)],
+        'client_id': [i % 500 for i in range(rows)],
+        'amount': [float(i % 90) for i in range(rows)],
+        'date': pd.Timestamp('2024-01-01') + pd.to_timedelta([i % 365 for i in range(rows)], unit='D'),
+    })
+
+
+def test_mongo_chunks_are_sized_from_the_budget(transactions):
+    collection = mongomock.MongoClient().db.transactions
+    collection.insert_many(transactions.to_dict('records'))
+    budget = 2**20
+
+    chunks = list(iter_mongo_chunks(collection, {'_id': 0}, memory_budget=budget))
+    assert len(chunks[0]) == PROBE_ROWS
+    assert len(chunks) > 2
+    # Later documents may be a little larger than the ones measured
+    assert all(frame_bytes(chunk) <= budget * BUDGET_SHARE * (1 + SPLIT_TOLERANCE) for chunk in chunks[1:])
+    assert all(len(chunk) > PROBE_ROWS for chunk in chunks[1:-1])
+    assert sum(len(chunk) for chunk in chunks) == len(transactions)
+
+
+def test_parquet_chunks_are_sized_from_the_budget(transactions, tmp_path):
+    path = str(tmp_path / 'transactions.parquet')
+    pq.write_table(pa.Table.from_pandas(transactions, preserve_index=False), path)
+    budget = 2**20
+
+    chunks = list(iter_parquet_chunks(path, memory_budget=budget))
+    assert len(chunks) > 2
+    assert all(frame_bytes(chunk) <= budget * BUDGET_SHARE * (1 + SPLIT_TOLERANCE) for chunk in chunks)
+    assert pd.concat(chunks, ignore_index=True).equals(transactions)
+
+    # Chunks already sized from the budget are not split again
+    assert [len(chunk) for chunk in bounded_chunks(iter(chunks), budget)] == [len(chunk) for chunk in chunks]
@@ -0,0 +1,101 @@
+import threading
+
+import pandas as pd
+
+from data_visualisation import time_series
+from data_visualisation.time_series import ROLLING_WINDOWS, TransactionTimeSeries
+
+
+def transactions(rows):
+    return pd.DataFrame(rows, columns=['_id', 'amount', 'date']).assign(
+        date=lambda frame: pd.to_datetime(frame['date'])
+    )
+
+
+BASE = [
+    ('a1', 20.0, '2024-01-01'),
+    ('a2', 30.0, '2024-01-01'),
+    ('a3', 40.0, '2024-01-02'),
+]
+
+
+def assert_same_as_fresh(series, frame):
+    fresh = TransactionTimeSeries()
+    fresh.update(frame)
+    for granularity in ('Daily', 'Weekly', 'Monthly'):
+        pd.testing.assert_frame_equal(series.totals(granularity), fresh.totals(granularity))
+    for window in ROLLING_WINDOWS:
+        pd.testing.assert_frame_equal(series.rolling_totals(window), fresh.rolling_totals(window))
+
+
+def daily(series):
+    totals = series.totals('Daily')
+    return dict(zip(totals['period'].astype(str), totals['total_amount']))
+
+
+def test_append():
+    series = TransactionTimeSeries()
+    series.update(transactions(BASE))
+    updated = transactions(BASE + [('a4', 5.0, '2024-01-02')])
+    series.update(updated)
+
+    assert daily(series) == {'2024-01-01': 50.0, '2024-01-02': 45.0}
+    assert_same_as_fresh(series, updated)
+
+
+def test_amount_changed_in_place():
+    series = TransactionTimeSeries()
+    series.update(transactions(BASE))
+    updated = transactions([('a1', 500.0, '2024-01-01')] + BASE[1:])
+    series.update(updated)
+
+    assert daily(series) == {'2024-01-01': 530.0, '2024-01-02': 40.0}
+    assert_same_as_fresh(series, updated)
+
+
+def test_date_changed_in_place():
+    series = TransactionTimeSeries()
+    series.update(transactions(BASE))
+    updated = transactions(BASE[:2] + [('a3', 40.0, '2024-01-01')])
+    series.update(updated)
+
+    assert daily(series) == {'2024-01-01': 90.0}
+    assert_same_as_fresh(series, updated)
+
+
+def test_delete_then_insert_with_lower_id():
+    series = TransactionTimeSeries()
+    series.update(transactions(BASE))
+    # Same row count, and no _id above the last one seen
+    updated = transactions([('a0', 7.0, '2024-01-02')] + BASE[:2])
+    series.update(updated)
+
+    assert daily(series) == {'2024-01-01': 50.0, '2024-01-02': 7.0}
+    assert_same_as_fresh(series, updated)
+
+
+def test_readers_see_the_previous_series_during_an_update(monkeypatch):
+    series = TransactionTimeSeries()
+    series.update(transactions(BASE))
+
+    adding, release = threading.Event(), threading.Event()
+    add = time_series._add
+
+    def slow_add(*args):
+        adding.set()
+        release.wait(5)
+        return add(*args)
+
+    monkeypatch.setattr(time_series, '_add', slow_add)
+    updater = threading.Thread(target=series.update, args=(transactions(BASE + [('a4', 5.0, '2024-01-02')]),))
+    updater.start()
+    try:
+        assert adding.wait(5)
+        # Read without waiting for the update, and all from the same series
+        assert daily(series) == {'2024-01-01': 50.0, '2024-01-02': 40.0}
+        assert series.totals('Monthly')['total_amount'].tolist() == [90.0]
+    finally:
+        release.set()
+        updater.join()
+
+    assert daily(series) == {'2024-01-01': 50.0, '2024-01-02': 45.0}